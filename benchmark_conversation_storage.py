@@ -0,0 +1,268 @@
+"""
+Conversation storage query plans and timings on a synthetic database.
+
+Builds a database with --rows conversations (default 2,000,000) in the old
+layout (CURRENT_TIMESTAMP text only, single-column indexes), opens it with
+ConversationStorage to time the migration to epoch columns and composite
+indexes, then runs each time-ordered query in its current form and in the
+datetime(timestamp) / text-ordered form it replaced. For both forms it
+prints the EXPLAIN QUERY PLAN and the median time over --repeat runs.
+
+Usage:
+    python benchmark_conversation_storage.py [--rows 2000000] [--users 20000] [--days 365]
+    python benchmark_conversation_storage.py --cloud        # cloud/ storage (threads too)
+    python benchmark_conversation_storage.py --db big.db    # reuse/keep a database file
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+LEGACY_SCHEMA = """
+CREATE TABLE conversation_threads (
+    thread_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    title TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    message_count INTEGER DEFAULT 0,
+    last_message_preview TEXT
+);
+CREATE TABLE conversations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    thread_id TEXT,
+    username TEXT,
+    chat_id TEXT NOT NULL,
+    chat_type TEXT,
+    platform TEXT NOT NULL,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    model TEXT,
+    tokens_used INTEGER,
+    context_length INTEGER,
+    system_prompt TEXT
+);
+CREATE TABLE users (
+    user_id TEXT PRIMARY KEY,
+    username TEXT,
+    platform TEXT,
+    first_seen DATETIME,
+    last_seen DATETIME,
+    total_questions INTEGER DEFAULT 0,
+    total_tokens INTEGER DEFAULT 0
+);
+CREATE INDEX idx_user_id ON conversations(user_id);
+CREATE INDEX idx_thread_id ON conversations(thread_id);
+CREATE INDEX idx_user_threads ON conversation_threads(user_id);
+CREATE INDEX idx_timestamp ON conversations(timestamp);
+CREATE INDEX idx_platform ON conversations(platform);
+"""
+
+# Deterministic spread: row i belongs to user (i * 7919) % users, one of that
+# user's 5 threads, one of 3 platforms, and is asked at start + i * step.
+GENERATE_CONVERSATIONS = """
+WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < :rows - 1)
+INSERT INTO conversations
+    (user_id, thread_id, username, chat_id, chat_type, platform, timestamp, question, answer, model, tokens_used)
+SELECT 'user' || ((i * 7919) % :users),
+       'user' || ((i * 7919) % :users) || '-t' || ((i / :users) % 5),
+       'User ' || ((i * 7919) % :users),
+       'chat' || ((i * 7919) % :users),
+       'private',
+       CASE i % 3 WHEN 0 THEN 'telegram' WHEN 1 THEN 'web' ELSE 'discord' END,
+       datetime(:start + i * :step, 'unixepoch'),
+       'How does feature ' || ((i * 104729) % 5000) || ' work?',
+       'Feature ' || ((i * 104729) % 5000) || ' works like this, answer ' || i,
+       CASE i % 2 WHEN 0 THEN 'gpt-4o' ELSE 'claude' END,
+       (i * 31) % 2000
+FROM n
+"""
+
+GENERATE_THREADS = """
+INSERT INTO conversation_threads (thread_id, user_id, title, created_at, updated_at, message_count, last_message_preview)
+SELECT thread_id, MIN(user_id), 'Thread', MIN(timestamp), MAX(timestamp), COUNT(*), ''
+FROM conversations GROUP BY thread_id
+"""
+
+GENERATE_USERS = """
+INSERT INTO users (user_id, username, platform, first_seen, last_seen, total_questions, total_tokens)
+SELECT user_id, MIN(username), MIN(platform), MIN(timestamp), MAX(timestamp), COUNT(*), SUM(tokens_used)
+FROM conversations GROUP BY user_id
+"""
+
+
+@dataclass
+class QueryCase:
+    name: str
+    current: str
+    legacy: str
+    params: Callable[[], Tuple]
+    legacy_params: Optional[Callable[[], Tuple]] = None
+    cloud_only: bool = False
+
+
+def build_legacy_database(path: Path, rows: int, users: int, days: int) -> None:
+    started = time.perf_counter()
+    end = int(time.time())
+    start = end - days * 86400
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.execute(
+        GENERATE_CONVERSATIONS,
+        {"rows": rows, "users": users, "start": start, "step": (end - start) / rows},
+    )
+    conn.execute(GENERATE_THREADS)
+    conn.execute(GENERATE_USERS)
+    conn.commit()
+    conn.close()
+    print(
+        f"Built {rows:,} conversations for {users:,} users over {days} days "
+        f"in {time.perf_counter() - started:.1f}s",
+        flush=True,
+    )
+
+
+def query_cases(users: int, days: int) -> List[QueryCase]:
+    now = int(time.time())
+
+    def user() -> Tuple:
+        return (f"user{random.randrange(users)}",)
+
+    def thread() -> Tuple:
+        return (f"user{random.randrange(users)}-t{random.randrange(5)}",)
+
+    def week() -> Tuple:
+        start = now - random.randrange(7, days) * 86400
+        return random.choice(["telegram", "web", "discord"]), start, start + 7 * 86400
+
+    def week_text() -> Tuple:
+        platform, start, end = week()
+        return platform, time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(start)), time.strftime(
+            "%Y-%m-%d %H:%M:%S", time.gmtime(end)
+        )
+
+    return [
+        QueryCase(
+            "user history (get_user_conversations)",
+            "SELECT timestamp, chat_type, question, answer, model, tokens_used FROM conversations "
+            "WHERE user_id = ? ORDER BY ts DESC, id DESC LIMIT 50",
+            "SELECT timestamp, chat_type, question, answer, model, tokens_used FROM conversations "
+            "WHERE user_id = ? ORDER BY timestamp DESC LIMIT 50",
+            user,
+        ),
+        QueryCase(
+            "last 24 hours",
+            "SELECT COUNT(*) FROM conversations WHERE ts >= CAST(strftime('%s', 'now') AS INTEGER) - 86400",
+            "SELECT COUNT(*) FROM conversations WHERE datetime(timestamp) > datetime('now', '-1 day')",
+            lambda: (),
+        ),
+        QueryCase(
+            "platform, one week",
+            "SELECT COUNT(*), SUM(tokens_used) FROM conversations "
+            "WHERE platform = ? AND ts >= ? AND ts < ?",
+            "SELECT COUNT(*), SUM(tokens_used) FROM conversations "
+            "WHERE platform = ? AND datetime(timestamp) >= datetime(?) AND datetime(timestamp) < datetime(?)",
+            week,
+            legacy_params=week_text,
+        ),
+        QueryCase(
+            "user threads (get_user_threads)",
+            "SELECT thread_id, title, created_at, updated_at, message_count, last_message_preview "
+            "FROM conversation_threads WHERE user_id = ? ORDER BY updated_ts DESC LIMIT 50",
+            "SELECT thread_id, title, created_at, updated_at, message_count, last_message_preview "
+            "FROM conversation_threads WHERE user_id = ? ORDER BY updated_at DESC LIMIT 50",
+            user,
+            cloud_only=True,
+        ),
+        QueryCase(
+            "thread messages (get_thread_messages)",
+            "SELECT id, timestamp, question, answer, model, system_prompt FROM conversations "
+            "WHERE thread_id = ? ORDER BY ts ASC, id ASC LIMIT 100",
+            "SELECT id, timestamp, question, answer, model, system_prompt FROM conversations "
+            "WHERE thread_id = ? ORDER BY timestamp ASC LIMIT 100",
+            thread,
+            cloud_only=True,
+        ),
+    ]
+
+
+def query_plan(conn: sqlite3.Connection, sql: str, params: Tuple) -> List[str]:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def time_query(conn: sqlite3.Connection, sql: str, params: Callable[[], Tuple], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        args = params()
+        started = time.perf_counter()
+        conn.execute(sql, args).fetchall()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def uses_index_only(plan: List[str]) -> bool:
+    return not any(line.startswith("SCAN") or "TEMP B-TREE" in line for line in plan)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=20, help="runs per query (median reported)")
+    parser.add_argument("--cloud", action="store_true", help="benchmark cloud/conversation_storage.py")
+    parser.add_argument("--db", type=Path, default=None, help="database file (kept; built if missing)")
+    args = parser.parse_args()
+
+    if args.cloud:
+        sys.path.insert(0, str(Path(__file__).resolve().parent / "cloud"))
+    from conversation_storage import ConversationStorage
+
+    workdir = None
+    db_path = args.db
+    if db_path is None:
+        workdir = tempfile.TemporaryDirectory(prefix="storage-bench-")
+        db_path = Path(workdir.name) / "conversations.db"
+    if not db_path.exists():
+        build_legacy_database(db_path, args.rows, args.users, args.days)
+
+    started = time.perf_counter()
+    storage = ConversationStorage(str(db_path))
+    print(f"Opened (migrating if needed) in {time.perf_counter() - started:.1f}s\n", flush=True)
+
+    cases = query_cases(args.users, args.days)
+    random.seed(0)
+    try:
+        with storage.db.read() as conn:
+            for case in cases:
+                if case.cloud_only and not args.cloud:
+                    continue
+                print(case.name)
+                for label, sql, params in (
+                    ("current", case.current, case.params),
+                    ("legacy", case.legacy, case.legacy_params or case.params),
+                ):
+                    plan = query_plan(conn, sql, params())
+                    elapsed = time_query(conn, sql, params, args.repeat)
+                    marker = "index" if uses_index_only(plan) else "SCAN/SORT"
+                    print(f"  {label:8} {elapsed:9.2f} ms  [{marker}]  {' | '.join(plan)}")
+                print()
+    finally:
+        storage.close()
+        if workdir is not None:
+            workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
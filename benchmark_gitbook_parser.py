@@ -0,0 +1,149 @@
+"""
+Benchmark GitBook page parsing: BeautifulSoup/html.parser vs single-pass lxml.
+
+Runs both GitBookScraper parse paths over saved docs HTML and reports the
+per-page parse time of each, plus whether they extracted the same content
+and headings.
+
+Usage:
+    python benchmark_gitbook_parser.py --fetch 40     # save docs pages first
+    python benchmark_gitbook_parser.py [HTML_DIR] [--repeat 5]
+
+Saved pages live in HTML_DIR (default scraped_data/html_samples) alongside
+urls.json, which maps each file to the URL it was fetched from.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import requests
+
+from gitbook_html import LXML_AVAILABLE
+from scrape_gitbook import GitBookScraper
+
+DOCS_URL = "https://docs.auto.finance"
+DEFAULT_HTML_DIR = Path("scraped_data/html_samples")
+
+
+def fetch_samples(scraper: GitBookScraper, html_dir: Path, count: int) -> None:
+    """Save up to `count` docs pages (sitemap order) into html_dir."""
+    html_dir.mkdir(parents=True, exist_ok=True)
+    urls = [scraper.base_url] + scraper.discover_urls()
+    mapping: Dict[str, str] = {}
+    for url in urls[:count]:
+        try:
+            response = scraper.session.get(url, timeout=60)
+        except requests.RequestException as exc:
+            print(f"  [SKIP] {url}: {exc}", flush=True)
+            continue
+        if response.status_code != 200:
+            print(f"  [SKIP] {url}: HTTP {response.status_code}", flush=True)
+            continue
+        name = re.sub(r"[^A-Za-z0-9_-]+", "_", url.split("://", 1)[-1]).strip("_")[:100]
+        (html_dir / f"{name}.html").write_bytes(response.content)
+        mapping[f"{name}.html"] = url
+        print(f"  Saved {url}", flush=True)
+    with (html_dir / "urls.json").open("w", encoding="utf-8") as handle:
+        json.dump(mapping, handle, indent=2)
+
+
+def time_parse(scraper: GitBookScraper, url: str, html: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scraper.parse_page(url, html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(scraper: GitBookScraper, html_dir: Path, repeat: int) -> None:
+    mapping_path = html_dir / "urls.json"
+    mapping: Dict[str, str] = {}
+    if mapping_path.exists():
+        with mapping_path.open("r", encoding="utf-8") as handle:
+            mapping = json.load(handle)
+
+    files = sorted(html_dir.glob("*.html"))
+    if not files:
+        print(f"No .html files in {html_dir}; run with --fetch N first.", flush=True)
+        return
+
+    bs4_times: List[float] = []
+    lxml_times: List[float] = []
+    same_content = same_headings = 0
+    extra_links = 0
+
+    print(f"{'page':50} {'bs4 ms':>9} {'lxml ms':>9} {'speedup':>8}", flush=True)
+    for path in files:
+        html = path.read_bytes()
+        url = mapping.get(path.name, f"{scraper.base_url}/{path.stem}")
+
+        scraper.use_lxml = False
+        bs4_doc, bs4_links = scraper.parse_page(url, html)
+        bs4_time = time_parse(scraper, url, html, repeat)
+
+        scraper.use_lxml = True
+        lxml_doc, lxml_links = scraper.parse_page(url, html)
+        lxml_time = time_parse(scraper, url, html, repeat)
+
+        bs4_times.append(bs4_time)
+        lxml_times.append(lxml_time)
+        if (bs4_doc and bs4_doc.content) == (lxml_doc and lxml_doc.content):
+            same_content += 1
+        if (bs4_doc and bs4_doc.metadata.get("headings")) == (
+            lxml_doc and lxml_doc.metadata.get("headings")
+        ):
+            same_headings += 1
+        extra_links += len(set(lxml_links) - set(bs4_links))
+
+        print(
+            f"{path.name[:50]:50} {bs4_time * 1000:9.2f} {lxml_time * 1000:9.2f} "
+            f"{bs4_time / lxml_time:7.1f}x",
+            flush=True,
+        )
+
+    pages = len(files)
+    print("\n" + "=" * 60)
+    print(f"Pages: {pages} (best of {repeat} runs each)")
+    print(
+        f"bs4/html.parser: mean {statistics.mean(bs4_times) * 1000:.2f} ms, "
+        f"median {statistics.median(bs4_times) * 1000:.2f} ms per page"
+    )
+    print(
+        f"lxml single-pass: mean {statistics.mean(lxml_times) * 1000:.2f} ms, "
+        f"median {statistics.median(lxml_times) * 1000:.2f} ms per page"
+    )
+    print(f"Speedup (total): {sum(bs4_times) / sum(lxml_times):.1f}x")
+    print(f"Identical content: {same_content}/{pages}, identical headings: {same_headings}/{pages}")
+    print(f"Links only found by lxml (navigation inside content): {extra_links}")
+    print("=" * 60)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("html_dir", nargs="?", type=Path, default=DEFAULT_HTML_DIR)
+    parser.add_argument("--fetch", type=int, default=0, help="save N docs pages first")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per page")
+    parser.add_argument("--base-url", default=DOCS_URL)
+    args = parser.parse_args()
+
+    if not LXML_AVAILABLE:
+        print("lxml is not installed; pip install lxml", flush=True)
+        sys.exit(1)
+
+    scraper = GitBookScraper(args.base_url, output_dir="scraped_data", use_cache=False)
+    if args.fetch:
+        fetch_samples(scraper, args.html_dir, args.fetch)
+    run_benchmark(scraper, args.html_dir, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Scraper throughput benchmark against recorded fixtures (no network needed).
+
+`record` runs each scraper live once and saves its traffic (see
+replay_harness.py). `bench` replays those fixtures and reports, per
+scraper, pages/sec for the whole crawl and the time spent in extraction
+(the parse/extract methods, excluding fetches). Scrapers run with their
+politeness delays set to 0 and a fresh output directory, so every run
+crawls the same pages.
+
+Usage:
+    python benchmark_scrapers.py record [--scrapers docs,app,blog] [--max-pages 50]
+    python benchmark_scrapers.py bench [--replay server|har] [--latency-ms 50] [--repeat 3]
+
+Fixtures live in --fixtures (default scraped_data/fixtures), one directory
+per scraper.
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from browser_manager import browser_manager_enabled, shared_browser
+from replay_harness import DEFAULT_FIXTURES_DIR, REPLAY_MODES, Recorder, Replayer
+
+
+@dataclass
+class ScraperSpec:
+    """How to build, run and measure one scraper."""
+
+    create: Callable[[str], Any]
+    run: Callable[[Any, Optional[int]], None]
+    documents: Callable[[Any], List[Any]]
+    extract_methods: List[str]
+
+
+def _create_docs(output_dir: str):
+    from scrape_gitbook import GitBookScraper
+
+    return GitBookScraper(
+        "https://docs.auto.finance", output_dir=output_dir, request_delay=0, use_cache=False
+    )
+
+
+def _create_app(output_dir: str):
+    from scrape_website import WebsiteScraper
+
+    scraper = WebsiteScraper(output_dir=output_dir)
+    scraper.page_delay = 0
+    return scraper
+
+
+def _create_blog(output_dir: str):
+    from scrape_blog import BlogScraper
+
+    scraper = BlogScraper(output_dir=output_dir)
+    scraper.page_delay = 0
+    return scraper
+
+
+SCRAPERS: Dict[str, ScraperSpec] = {
+    "docs": ScraperSpec(
+        create=_create_docs,
+        run=lambda scraper, max_pages: scraper.scrape_all(max_pages=max_pages),
+        documents=lambda scraper: scraper.scraped_content,
+        extract_methods=["parse_page"],
+    ),
+    "app": ScraperSpec(
+        create=_create_app,
+        run=lambda scraper, max_pages: scraper.scrape_all(max_pages=max_pages or 50),
+        documents=lambda scraper: scraper.scraped_pages,
+        extract_methods=["parse_http_page", "extract_page_data"],
+    ),
+    "blog": ScraperSpec(
+        create=_create_blog,
+        run=lambda scraper, max_pages: scraper.scrape_all(full=True),
+        documents=lambda scraper: scraper.blog_posts,
+        extract_methods=["parse_post_html", "extract_blog_post"],
+    ),
+}
+
+
+@dataclass
+class RunResult:
+    scraper: str
+    pages: int
+    seconds: float
+    extract_times: List[float] = field(default_factory=list)
+    misses: int = 0
+    missed_urls: List[str] = field(default_factory=list)
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+
+def _time_methods(scraper: Any, names: List[str], sink: List[float]) -> None:
+    """Wrap extraction methods on the instance to record their durations."""
+    for name in names:
+        original = getattr(scraper, name)
+
+        def timed(*args, _original=original, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _original(*args, **kwargs)
+            finally:
+                sink.append(time.perf_counter() - start)
+
+        setattr(scraper, name, timed)
+
+
+def _warm_browser() -> None:
+    """Start the shared Chromium up front so launch time is not benchmarked."""
+    if not browser_manager_enabled():
+        return
+    try:
+        shared_browser().endpoint()
+    except Exception as exc:
+        print(f"[WARN] Could not start the shared browser: {exc}", flush=True)
+
+
+def record(names: List[str], fixtures_dir: Path, max_pages: Optional[int]) -> None:
+    for name in names:
+        spec = SCRAPERS[name]
+        target = fixtures_dir / name
+        shutil.rmtree(target, ignore_errors=True)
+        print(f"\n[RECORD] {name} -> {target}", flush=True)
+        with tempfile.TemporaryDirectory(prefix=f"record-{name}-") as output_dir:
+            scraper = spec.create(output_dir)
+            recorder = Recorder(target)
+            recorder.install(scraper)
+            spec.run(scraper, max_pages)
+        summary = recorder.finish()
+        print(
+            f"[RECORD] {name}: {len(spec.documents(scraper))} documents, "
+            f"{summary['http_responses']} HTTP and {summary['browser_responses']} browser responses, "
+            f"{summary['pages']} HTML pages, {summary['xhr']} JSON responses",
+            flush=True,
+        )
+
+
+def bench_once(
+    name: str, fixtures_dir: Path, mode: str, latency_ms: float, max_pages: Optional[int]
+) -> RunResult:
+    spec = SCRAPERS[name]
+    with Replayer(fixtures_dir / name, mode, latency_ms) as replayer:
+        with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as output_dir:
+            scraper = spec.create(output_dir)
+            replayer.install(scraper)
+            extract_times: List[float] = []
+            _time_methods(scraper, spec.extract_methods, extract_times)
+            start = time.perf_counter()
+            spec.run(scraper, max_pages)
+            seconds = time.perf_counter() - start
+        return RunResult(
+            scraper=name,
+            pages=len(spec.documents(scraper)),
+            seconds=seconds,
+            extract_times=extract_times,
+            misses=replayer.stats.misses,
+            missed_urls=sorted(replayer.stats.missed_urls),
+        )
+
+
+def bench(
+    names: List[str],
+    fixtures_dir: Path,
+    mode: str,
+    latency_ms: float,
+    repeat: int,
+    max_pages: Optional[int],
+) -> None:
+    _warm_browser()
+    results: Dict[str, List[RunResult]] = {}
+    for name in names:
+        if not (fixtures_dir / name).exists():
+            print(f"[SKIP] No fixtures for {name}; run `record` first.", flush=True)
+            continue
+        results[name] = [
+            bench_once(name, fixtures_dir, mode, latency_ms, max_pages) for _ in range(repeat)
+        ]
+
+    print("\n" + "=" * 78)
+    print(f"Replay: {mode}, latency {latency_ms:g} ms/request, best of {repeat} runs")
+    print(
+        f"{'scraper':8} {'pages':>6} {'seconds':>8} {'pages/s':>8} "
+        f"{'extract mean':>13} {'extract med':>12} {'extract %':>10} {'misses':>7}"
+    )
+    for name, runs in results.items():
+        best = min(runs, key=lambda run: run.seconds)
+        times = best.extract_times or [0.0]
+        share = sum(best.extract_times) / best.seconds * 100 if best.seconds else 0.0
+        print(
+            f"{name:8} {best.pages:6d} {best.seconds:8.2f} {best.pages_per_second:8.1f} "
+            f"{statistics.mean(times) * 1000:10.2f} ms {statistics.median(times) * 1000:9.2f} ms "
+            f"{share:9.0f}% {best.misses:7d}"
+        )
+    for name, runs in results.items():
+        missed = runs[0].missed_urls
+        if missed:
+            print(f"Not recorded ({name}): {', '.join(missed[:5])}{' ...' if len(missed) > 5 else ''}")
+    print("=" * 78)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=("record", "bench"))
+    parser.add_argument("--scrapers", default=",".join(SCRAPERS), help="comma-separated subset")
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES_DIR)
+    parser.add_argument("--max-pages", type=int, default=None, help="page cap for docs and app")
+    parser.add_argument("--replay", choices=REPLAY_MODES, default="server")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added to every replayed request")
+    parser.add_argument("--repeat", type=int, default=3, help="replay runs per scraper")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scrapers.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCRAPERS]
+    if unknown:
+        parser.error(f"unknown scrapers {unknown}; choose from {list(SCRAPERS)}")
+
+    if args.command == "record":
+        record(names, args.fixtures, args.max_pages)
+    else:
+        bench(names, args.fixtures, args.replay, args.latency_ms, args.repeat, args.max_pages)
+
+
+if __name__ == "__main__":
+    main()
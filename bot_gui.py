@@ -19,6 +19,9 @@ from conversation_storage import ConversationStorage
 
 load_dotenv()
 
+# Users loaded per "load more" in the conversations view
+USERS_PAGE_SIZE = 200
+
 
 class DarkModernGUI:
     """Modern dark theme bot manager"""
@@ -924,12 +927,22 @@ class DarkModernGUI:
         """Refresh conversation list"""
         if hasattr(self, 'users_listbox'):
             self.users_listbox.delete(0, tk.END)
-            users = self.conversation_storage.get_all_users()
-            for user in users:
-                self.users_listbox.insert(tk.END, f"{user['username']} ({user['total_questions']})")
-            if not hasattr(self.users_listbox, 'user_data'):
-                self.users_listbox.user_data = {}
-            self.users_listbox.user_data = users
+            self.users_listbox.user_data = []
+            self.users_listbox.next_cursor = None
+            self.load_more_users()
+    
+    def load_more_users(self):
+        """Append the next page of users; a trailing entry loads the one after"""
+        listbox = self.users_listbox
+        if listbox.next_cursor:
+            listbox.delete(tk.END)  # the "load more" entry
+        page = self.conversation_storage.get_all_users_page(USERS_PAGE_SIZE, listbox.next_cursor)
+        for user in page['items']:
+            listbox.insert(tk.END, f"{user['username']} ({user['total_questions']})")
+        listbox.user_data.extend(page['items'])
+        listbox.next_cursor = page['next_cursor']
+        if listbox.next_cursor:
+            listbox.insert(tk.END, "... load more users")
     
     def on_user_selected(self, event):
         """Load user conversations"""
@@ -940,6 +953,8 @@ class DarkModernGUI:
         idx = selection[0]
         users = getattr(self.users_listbox, 'user_data', [])
         if idx >= len(users):
+            if getattr(self.users_listbox, 'next_cursor', None):
+                self.load_more_users()
             return
         
         user = users[idx]
@@ -967,8 +982,8 @@ class DarkModernGUI:
         
         for r in results:
             self.convos_text.insert(tk.END, f"[{r['timestamp']}] {r['username']}\n")
-            self.convos_text.insert(tk.END, f"Q: {r['question']}\n")
-            self.convos_text.insert(tk.END, f"A: {r['answer'][:200]}...\n\n")
+            self.convos_text.insert(tk.END, f"Q: {r['question_snippet']}\n")
+            self.convos_text.insert(tk.END, f"A: {r['answer_snippet']}\n\n")
     
     def refresh_analytics(self):
         """Refresh analytics"""
@@ -19,6 +19,9 @@ from conversation_storage import ConversationStorage
 
 load_dotenv()
 
+# Users loaded per "load more" in the conversations view
+USERS_PAGE_SIZE = 200
+
 
 class ModernGUI:
     """Clean, professional bot manager interface"""
@@ -516,14 +519,25 @@ class ModernGUI:
             self.load_conversations()
     
     def load_conversations(self):
-        """Load users list"""
+        """Load users list (first page)"""
         self.users_listbox.delete(0, tk.END)
-        
-        users = self.conversation_storage.get_all_users()
-        for user in users:
+        self.users_listbox.user_data = []  # Store full data
+        self.users_listbox.next_cursor = None
+        self.load_more_users()
+    
+    def load_more_users(self):
+        """Append the next page of users; a trailing entry loads the one after"""
+        listbox = self.users_listbox
+        if listbox.next_cursor:
+            listbox.delete(tk.END)  # the "load more" entry
+        page = self.conversation_storage.get_all_users_page(USERS_PAGE_SIZE, listbox.next_cursor)
+        for user in page['items']:
             display = f"{user['username']} ({user['total_questions']} msgs)"
-            self.users_listbox.insert(tk.END, display)
-            self.users_listbox.user_data = users  # Store full data
+            listbox.insert(tk.END, display)
+        listbox.user_data.extend(page['items'])
+        listbox.next_cursor = page['next_cursor']
+        if listbox.next_cursor:
+            listbox.insert(tk.END, "... load more users")
     
     def on_user_selected(self, event):
         """Load selected user's conversations"""
@@ -534,6 +548,10 @@ class ModernGUI:
         idx = selection[0]
         if not hasattr(self.users_listbox, 'user_data'):
             return
+        if idx >= len(self.users_listbox.user_data):
+            if self.users_listbox.next_cursor:
+                self.load_more_users()
+            return
         
         user = self.users_listbox.user_data[idx]
         convos = self.conversation_storage.get_user_conversations(user['user_id'], limit=100)
@@ -567,8 +585,8 @@ class ModernGUI:
         
         for result in results:
             self.convos_text.insert(tk.END, f"\n[{result['timestamp']}] {result['username']} ({result['platform']})\n")
-            self.convos_text.insert(tk.END, f"Q: {result['question']}\n")
-            self.convos_text.insert(tk.END, f"A: {result['answer'][:200]}...\n")
+            self.convos_text.insert(tk.END, f"Q: {result['question_snippet']}\n")
+            self.convos_text.insert(tk.END, f"A: {result['answer_snippet']}\n")
             self.convos_text.insert(tk.END, "-" * 80 + "\n")
     
     def export_all_conversations(self):
@@ -2,18 +2,28 @@
 Build complete index merging docs + website + blog.
 Creates new collection: "auto_finance_complete".
 Keeps original "auto_finance_docs" untouched.
+
+With --incremental, only the URLs listed in each scraper's change feed
+(<source>_changes.jsonl) since the last update are re-embedded.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import chromadb
 from chromadb.utils import embedding_functions
 
+from change_feed import ChangeFeed
+from scraper_common import iter_documents_jsonl, stream_path
+
+SOURCES = ("gitbook", "website", "blog")
+
 
 class CompleteIndexBuilder:
     """Builds complete index with all data sources."""
@@ -41,18 +51,33 @@ class CompleteIndexBuilder:
     # Loading helpers
     # ------------------------------------------------------------------#
 
-    def _load_source_file(self, path: Path, expected_source: str) -> List[Dict[str, Any]]:
+    def _read_records(self, path: Path, expected_source: str) -> List[Any]:
+        """Read the source's JSONL stream, or its JSON array if that is newer."""
+        stream = stream_path(path.parent, expected_source)
+        if stream and (not path.exists() or stream.stat().st_mtime >= path.stat().st_mtime):
+            print(f"[INFO] Reading {expected_source} stream {stream}", flush=True)
+            by_url: Dict[str, Dict[str, Any]] = {}
+            for index, record in enumerate(iter_documents_jsonl(stream)):
+                by_url[record.get("url") or f"{expected_source}_{index}"] = record
+            return list(by_url.values())
+
         if not path.exists():
             print(f"[WARN] No data found for {expected_source} at {path}", flush=True)
             return []
 
         with path.open("r", encoding="utf-8") as handle:
             try:
-                records = json.load(handle)
+                return json.load(handle)
             except json.JSONDecodeError as exc:
                 print(f"[ERROR] Failed to parse {path}: {exc}", flush=True)
                 return []
 
+    def _load_source_file(self, path: Path, expected_source: str) -> List[Dict[str, Any]]:
+        normalized = self._normalize_records(self._read_records(path, expected_source), expected_source)
+        print(f"[INFO] Loaded {len(normalized)} {expected_source} records", flush=True)
+        return normalized
+
+    def _normalize_records(self, records: List[Any], expected_source: str) -> List[Dict[str, Any]]:
         normalized: List[Dict[str, Any]] = []
         for index, record in enumerate(records):
             if not isinstance(record, dict):
@@ -80,7 +105,6 @@ class CompleteIndexBuilder:
                 }
             )
 
-        print(f"[INFO] Loaded {len(normalized)} {expected_source} records", flush=True)
         return normalized
 
     def load_docs_data(self) -> List[Dict[str, Any]]:
@@ -205,53 +229,39 @@ class CompleteIndexBuilder:
 
         return chunks
 
+    def _chunk_records(self, source: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        chunks: List[Dict[str, Any]] = []
+        for record in records:
+            metadata = self._build_chunk_metadata(record, source)
+            content = record["content"]
+            if source == "website":
+                pool_summary = self._render_pool_summary(record["url"], metadata.get("pool_data"))
+                content = f"{pool_summary}\n\n{content}".strip() if pool_summary else content
+            chunks.extend(self.chunk_content(content, record["title"], record["url"], metadata))
+        return chunks
+
+    def chunk_source(self, source: str) -> List[Dict[str, Any]]:
+        """Load and chunk one source ("gitbook", "website" or "blog")."""
+        if source == "gitbook":
+            print("\n[STEP] Chunking documentation...", flush=True)
+            chunks = self._chunk_records(source, self.load_docs_data())
+            print(f"  Created {len(chunks)} doc chunks", flush=True)
+        elif source == "website":
+            print("\n[STEP] Chunking website pages...", flush=True)
+            chunks = self._chunk_records(source, self.load_website_data())
+            print(f"  Created {len(chunks)} website chunks", flush=True)
+        elif source == "blog":
+            print("\n[STEP] Chunking blog posts...", flush=True)
+            chunks = self._chunk_records(source, self.load_blog_data())
+            print(f"  Created {len(chunks)} blog chunks", flush=True)
+        else:
+            raise ValueError(f"Unknown source: {source}")
+        return chunks
+
     def prepare_all_chunks(self) -> List[Dict[str, Any]]:
         all_chunks: List[Dict[str, Any]] = []
-
-        docs = self.load_docs_data()
-        website = self.load_website_data()
-        blog = self.load_blog_data()
-
-        print("\n[STEP] Chunking documentation...", flush=True)
-        for doc in docs:
-            metadata = self._build_chunk_metadata(doc, "gitbook")
-            chunks = self.chunk_content(
-                doc["content"],
-                doc["title"],
-                doc["url"],
-                metadata,
-            )
-            all_chunks.extend(chunks)
-        print(f"  Created {len(all_chunks)} doc chunks", flush=True)
-
-        print("\n[STEP] Chunking website pages...", flush=True)
-        website_chunk_start = len(all_chunks)
-        for page in website:
-            metadata = self._build_chunk_metadata(page, "website")
-            pool_summary = self._render_pool_summary(page["url"], metadata.get("pool_data"))
-            content = f"{pool_summary}\n\n{page['content']}".strip() if pool_summary else page["content"]
-
-            chunks = self.chunk_content(
-                content,
-                page["title"],
-                page["url"],
-                metadata,
-            )
-            all_chunks.extend(chunks)
-        print(f"  Created {len(all_chunks) - website_chunk_start} website chunks", flush=True)
-
-        print("\n[STEP] Chunking blog posts...", flush=True)
-        blog_chunk_start = len(all_chunks)
-        for post in blog:
-            metadata = self._build_chunk_metadata(post, "blog")
-            chunks = self.chunk_content(
-                post["content"],
-                post["title"],
-                post["url"],
-                metadata,
-            )
-            all_chunks.extend(chunks)
-        print(f"  Created {len(all_chunks) - blog_chunk_start} blog chunks", flush=True)
+        for source in SOURCES:
+            all_chunks.extend(self.chunk_source(source))
 
         print(f"\n[INFO] Total chunks prepared: {len(all_chunks)}", flush=True)
         return all_chunks
@@ -265,6 +275,10 @@ class CompleteIndexBuilder:
         print("Building Complete Index", flush=True)
         print("=" * 60, flush=True)
 
+        # Read feed positions first: the data loaded below is at least this new.
+        positions = {
+            f"feed_seq_{source}": self._feed(source).latest_seq() for source in SOURCES
+        }
         all_chunks = self.prepare_all_chunks()
 
         if not all_chunks:
@@ -280,13 +294,41 @@ class CompleteIndexBuilder:
         collection = self.client.create_collection(
             name="auto_finance_complete",
             embedding_function=self.embedding_function,
-            metadata={"description": "Complete Auto Finance data: docs + website + blog"},
+            metadata={
+                "description": "Complete Auto Finance data: docs + website + blog",
+                **positions,
+            },
         )
 
         print("\n[STEP] Indexing chunks...", flush=True)
+        self._add_chunks(
+            collection, all_chunks, [f"chunk_{index}" for index in range(len(all_chunks))]
+        )
+
+        print(f"\n[OK] Index built successfully with {len(all_chunks)} chunks.", flush=True)
+
+    def _get_or_create_collection(self):
+        return self.client.get_or_create_collection(
+            name="auto_finance_complete",
+            embedding_function=self.embedding_function,
+            metadata={"description": "Complete Auto Finance data: docs + website + blog"},
+        )
+
+    @staticmethod
+    def _chunk_ids(source: str, chunks: List[Dict[str, Any]]) -> List[str]:
+        """Stable ids per URL: <source>_<url hash>_<n>."""
+        seen: Dict[str, int] = {}
+        ids = []
+        for chunk in chunks:
+            key = hashlib.sha1(chunk["url"].encode("utf-8")).hexdigest()[:16]
+            ids.append(f"{source}_{key}_{seen.get(key, 0)}")
+            seen[key] = seen.get(key, 0) + 1
+        return ids
+
+    def _add_chunks(self, collection, chunks: List[Dict[str, Any]], ids: List[str]) -> None:
         batch_size = 100
-        for index in range(0, len(all_chunks), batch_size):
-            batch = all_chunks[index : index + batch_size]
+        for index in range(0, len(chunks), batch_size):
+            batch = chunks[index : index + batch_size]
             metadatas = []
             for chunk in batch:
                 chunk_meta = dict(chunk["metadata"] or {})
@@ -306,15 +348,91 @@ class CompleteIndexBuilder:
             collection.add(
                 documents=[chunk["text"] for chunk in batch],
                 metadatas=metadatas,
-                ids=[f"chunk_{index + offset}" for offset in range(len(batch))],
+                ids=ids[index : index + batch_size],
             )
 
             print(
-                f"  Batch {index // batch_size + 1}/{(len(all_chunks) - 1) // batch_size + 1}",
+                f"  Batch {index // batch_size + 1}/{(len(chunks) - 1) // batch_size + 1}",
                 flush=True,
             )
 
-        print(f"\n[OK] Index built successfully with {len(all_chunks)} chunks.", flush=True)
+    def source_chunk_count(self, source: str) -> int:
+        """Chunks currently indexed for one source (0 if there is no collection)."""
+        try:
+            collection = self.client.get_collection(name="auto_finance_complete")
+        except Exception:
+            return 0
+        return len(collection.get(where={"source": source}, include=[])["ids"])
+
+    def index_source(self, source: str) -> int:
+        """Replace one source's chunks in the collection, leaving the others alone.
+
+        Lets the master scraper index each source as soon as its scrape ends
+        instead of waiting for all of them.
+        """
+        chunks = self.chunk_source(source)
+        if not chunks:
+            print(f"[WARN] No {source} chunks; keeping the indexed ones", flush=True)
+            return 0
+
+        position = self._feed(source).latest_seq()
+        collection = self._get_or_create_collection()
+        collection.delete(where={"source": source})
+        print(f"\n[STEP] Indexing {len(chunks)} {source} chunks...", flush=True)
+        self._add_chunks(collection, chunks, self._chunk_ids(source, chunks))
+        self._save_feed_position(collection, source, position)
+        print(f"[OK] Indexed {source}: {len(chunks)} chunks", flush=True)
+        return len(chunks)
+
+    # ------------------------------------------------------------------#
+    # Incremental updates from the scrapers' change feeds
+    # ------------------------------------------------------------------#
+
+    def _feed(self, source: str) -> ChangeFeed:
+        paths = {"gitbook": self.docs_path, "website": self.website_path, "blog": self.blog_path}
+        return ChangeFeed(paths[source].parent, source)
+
+    @staticmethod
+    def _save_feed_position(collection, source: str, seq: int) -> None:
+        metadata = dict(collection.metadata or {})
+        metadata[f"feed_seq_{source}"] = seq
+        collection.modify(metadata=metadata)
+
+    def update_source(self, source: str) -> int:
+        """Re-embed only the URLs the source's change feed reports since the last update.
+
+        Falls back to `index_source` when the collection has no usable feed
+        position. Returns the number of chunks added.
+        """
+        feed = self._feed(source)
+        collection = self._get_or_create_collection()
+        changes = feed.changes_since((collection.metadata or {}).get(f"feed_seq_{source}"))
+        if changes is None:
+            print(f"[FEED] No usable {source} feed position; reindexing {source} fully", flush=True)
+            return self.index_source(source)
+        if not changes:
+            print(f"[FEED] {source} index is up to date", flush=True)
+            return 0
+
+        urls = sorted(changes.urls)
+        for index in range(0, len(urls), 100):
+            collection.delete(where={"url": {"$in": urls[index : index + 100]}})
+        records = self._normalize_records(list(changes.upserts.values()), source)
+        chunks = self._chunk_records(source, records)
+        if chunks:
+            self._add_chunks(collection, chunks, self._chunk_ids(source, chunks))
+        self._save_feed_position(collection, source, changes.seq)
+        print(
+            f"[OK] {source}: {len(changes.upserts)} URLs re-embedded ({len(chunks)} chunks), "
+            f"{len(changes.removed)} removed",
+            flush=True,
+        )
+        return len(chunks)
+
+    def update_index(self) -> None:
+        """Apply every source's change feed (incremental counterpart of build_index)."""
+        for source in SOURCES:
+            self.update_source(source)
 
     def verify_index(self) -> bool:
         try:
@@ -339,7 +457,10 @@ class CompleteIndexBuilder:
 
 def main() -> None:
     builder = CompleteIndexBuilder()
-    builder.build_index()
+    if "--incremental" in sys.argv:
+        builder.update_index()
+    else:
+        builder.build_index()
 
     print("\n" + "=" * 60, flush=True)
     print("Verifying Index", flush=True)
@@ -0,0 +1,163 @@
+"""
+Per-URL change feed between the scrapers and the index builder.
+
+When a scraper publishes its output, the per-URL content hashes of the run
+are compared with the previous run and one entry is appended to
+`<source>_changes.jsonl` next to the data:
+
+  {"seq": 1760000000000, "prev_seq": 1759990000000, "source": "website",
+   "generated_at": "...", "added": [...], "modified": [...], "removed": [...],
+   "documents": [{...}, ...]}        # new versions of added + modified URLs
+
+Consumers (the index builder, anything caching answers per URL) remember the
+last `seq` they applied and call `changes_since(seq)`. Only the newest
+SCRAPER_CHANGE_FEED_KEEP entries (default 50) are kept; a consumer with no
+position, one that fell behind the retained entries, or one reading a feed
+that was recreated gets None and must rebuild from the full data instead.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from scraper_common import utc_now_iso
+
+
+def diff_hashes(
+    previous: Dict[str, str], current: Dict[str, str]
+) -> Tuple[List[str], List[str], List[str]]:
+    """(added, modified, removed) URLs between two url -> hash maps."""
+    added = sorted(url for url in current if url not in previous)
+    modified = sorted(url for url in current if url in previous and previous[url] != current[url])
+    removed = sorted(url for url in previous if url not in current)
+    return added, modified, removed
+
+
+@dataclass
+class FeedChanges:
+    """Net effect of the feed entries after a consumer's position."""
+
+    seq: int
+    upserts: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    removed: Set[str] = field(default_factory=set)
+
+    @property
+    def urls(self) -> Set[str]:
+        return set(self.upserts) | self.removed
+
+    def __bool__(self) -> bool:
+        return bool(self.upserts or self.removed)
+
+
+class ChangeFeed:
+    """Append-only (bounded) JSONL log of per-URL changes for one source."""
+
+    def __init__(self, output_dir: Path, source: str, keep: Optional[int] = None):
+        self.source = source
+        self.path = Path(output_dir) / f"{source}_changes.jsonl"
+        if keep is None:
+            keep = int(os.getenv("SCRAPER_CHANGE_FEED_KEEP", "50"))
+        self.keep = max(keep, 1)
+
+    def _read_entries(self) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        entries = []
+        with self.path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(entry, dict) and "seq" in entry:
+                    entries.append(entry)
+        return entries
+
+    def latest_seq(self) -> int:
+        entries = self._read_entries()
+        return entries[-1]["seq"] if entries else 0
+
+    def append(
+        self,
+        previous_hashes: Dict[str, str],
+        current_hashes: Dict[str, str],
+        documents: Iterable[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        """Record the difference between two runs. Returns the new entry, if any.
+
+        Nothing is recorded when the run produced no documents (a failed
+        scrape must not read as "every page was removed") or changed nothing.
+        """
+        if not current_hashes:
+            print(f"[FEED] {self.source}: no documents, change feed left as is", flush=True)
+            return None
+        added, modified, removed = diff_hashes(previous_hashes, current_hashes)
+        if not (added or modified or removed):
+            print(f"[FEED] {self.source}: no changes", flush=True)
+            return None
+
+        entries = self._read_entries()
+        prev_seq = entries[-1]["seq"] if entries else 0
+        # Millisecond timestamps stay increasing even if the file is recreated,
+        # so an old consumer position can never look newer than the feed.
+        seq = max(prev_seq + 1, int(time.time() * 1000))
+        wanted = set(added) | set(modified)
+        entry = {
+            "seq": seq,
+            "prev_seq": prev_seq,
+            "source": self.source,
+            "generated_at": utc_now_iso(),
+            "added": added,
+            "modified": modified,
+            "removed": removed,
+            "documents": [doc for doc in documents if doc.get("url") in wanted],
+        }
+        entries.append(entry)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            for item in entries[-self.keep :]:
+                handle.write(json.dumps(item, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp_path, self.path)
+        print(
+            f"[FEED] {self.source}: +{len(added)} added, ~{len(modified)} modified, "
+            f"-{len(removed)} removed (seq {seq})",
+            flush=True,
+        )
+        return entry
+
+    def entries_since(self, seq: Optional[int]) -> Optional[List[Dict[str, Any]]]:
+        """Entries after `seq`, or None when they cannot be replayed completely.
+
+        Position 0 means "indexed while the feed was still empty".
+        """
+        if seq is None:
+            return None
+        entries = self._read_entries()
+        newer = [entry for entry in entries if entry["seq"] > seq]
+        if not newer:
+            return []
+        if newer[0].get("prev_seq") != seq:
+            return None
+        return newer
+
+    def changes_since(self, seq: Optional[int]) -> Optional[FeedChanges]:
+        """Net upserts/removals after `seq` (latest version per URL wins)."""
+        entries = self.entries_since(seq)
+        if entries is None:
+            return None
+        changes = FeedChanges(seq=entries[-1]["seq"] if entries else int(seq))
+        for entry in entries:
+            for url in entry.get("removed", []):
+                changes.upserts.pop(url, None)
+                changes.removed.add(url)
+            for document in entry.get("documents", []):
+                changes.upserts[document["url"]] = document
+                changes.removed.discard(document["url"])
+        return changes
@@ -5,6 +5,7 @@ Provides REST API for web-based Q&A interface
 
 import os
 import sys
+import uuid
 from typing import Optional, Dict, List
 from datetime import datetime
 from fastapi import FastAPI, HTTPException, Depends, Header, Response, Query
@@ -55,6 +56,10 @@ except ImportError as e:
     gcs_storage = None
     logger.warning(f"GCS storage not available: {e}")
 
+# Pool APY/TVL history recorded by the scraper service after each website scrape
+from pool_metrics import DEFAULT_DB_PATH as POOL_METRICS_DEFAULT_DB
+POOL_METRICS_DB = os.getenv("POOL_METRICS_DB") or POOL_METRICS_DEFAULT_DB
+
 # Initialize FastAPI
 app = FastAPI(
     title="Auto Finance Bot API",
@@ -73,6 +78,7 @@ async def startup_event():
         logger.info("Restoring data from GCS...")
         gcs_storage.load_sqlite_db('conversations.db', 'conversations.db')
         gcs_storage.load_sqlite_db('bot_configs.db', 'bot_configs.db')
+        gcs_storage.load_sqlite_db('pool_metrics.db', POOL_METRICS_DB)
         logger.info("✅ Data restored from GCS")
     
     # ChromaDB is pre-built and baked into the Docker image
@@ -100,12 +106,16 @@ async def shutdown_event():
     if scraper_service:
         scraper_service.stop()
         logger.info("✅ Data scraper service stopped")
-    
+
+    # Commit queued conversations and checkpoint the WAL so the .db file is complete
+    storage.close()
+
     # Backup persistent data to GCS
     if gcs_storage and gcs_storage.use_gcs:
         logger.info("Backing up data to GCS...")
         gcs_storage.save_sqlite_db('conversations.db', 'conversations.db')
         gcs_storage.save_sqlite_db('bot_configs.db', 'bot_configs.db')
+        gcs_storage.save_sqlite_db(POOL_METRICS_DB, 'pool_metrics.db')
         
         # Backup ChromaDB (the main knowledge base)
         chroma_path = "/app/chroma_db" if os.path.exists("/app") else "./chroma_db"
@@ -354,8 +364,8 @@ async def ask_question(request: AskRequest):
         # Create or use thread
         thread_id = request.thread_id
         if not thread_id:
-            # Create new thread for this conversation
-            thread_id = storage.create_thread(request.user_id)
+            # New thread: queue_conversation creates its row before returning, titled from this question
+            thread_id = str(uuid.uuid4())
         
         # Add to conversation manager (use thread_id hash as chat_id for context)
         user_id_int = int(request.user_id.replace('google_', '').encode().hex(), 16) % (10**10)
@@ -363,8 +373,8 @@ async def ask_question(request: AskRequest):
         conversation_manager.add_message(user_id_int, 'user', request.question, chat_id_int)
         conversation_manager.add_message(user_id_int, 'assistant', answer, chat_id_int)
         
-        # Save to persistent storage with thread
-        storage.save_conversation(
+        # Save to persistent storage: the thread row now, the message in the background
+        storage.queue_conversation(
             user_id=request.user_id,
             username=request.user_name or 'User',
             platform='web',
@@ -443,21 +453,27 @@ async def create_thread(request: CreateThreadRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/threads/{user_id}")
-async def get_user_threads(user_id: str):
-    """Get all conversation threads for a user"""
+async def get_user_threads(user_id: str, limit: int = Query(50, ge=1, le=200),
+                           cursor: Optional[str] = Query(None, description="next_cursor of the previous page")):
+    """Get a user's conversation threads, most recently updated first (paginated)"""
     try:
-        threads = storage.get_user_threads(user_id)
-        return {"threads": threads}
+        page = storage.get_user_threads_page(user_id, limit, cursor)
+        return {"threads": page['items'], "next_cursor": page['next_cursor']}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting threads: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/threads/{thread_id}/messages")
-async def get_thread_messages(thread_id: str):
-    """Get all messages in a conversation thread"""
+async def get_thread_messages(thread_id: str, limit: int = Query(100, ge=1, le=500),
+                              cursor: Optional[str] = Query(None, description="next_cursor of the previous page")):
+    """Get the messages in a conversation thread, oldest first (paginated)"""
     try:
-        messages = storage.get_thread_messages(thread_id)
-        return {"messages": messages}
+        page = storage.get_thread_messages_page(thread_id, limit, cursor)
+        return {"messages": page['items'], "next_cursor": page['next_cursor']}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting thread messages: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -529,8 +545,11 @@ async def get_stats():
         return {
             "total_conversations": analytics.get("total_conversations", 0),
             "unique_users": analytics.get("unique_users", 0),
-            "total_tokens": analytics.get("total_tokens", 0),
-            "platforms": analytics.get("platform_breakdown", {})
+            "total_tokens": analytics.get("total_tokens_used", 0),
+            "platforms": analytics.get("by_platform", {}),
+            "models": analytics.get("by_model", {}),
+            "conversations_24h": analytics.get("conversations_24h", 0),
+            "write_queue": storage.write_queue_stats()
         }
     except Exception as e:
         logger.error(f"Error getting stats: {e}")
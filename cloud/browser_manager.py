@@ -0,0 +1,332 @@
+"""
+One warm headless Chromium shared by the scrapers.
+
+Launching Chromium is the slowest part of a small scrape, and the cloud
+service scrapes every 10 minutes. Instead of `chromium.launch()` per run,
+the manager starts Chromium once as a child process with a DevTools port and
+scrapers attach to it with `connect_over_cdp`, each in its own browser
+context. Attaching works from any thread or event loop, so the browser
+outlives the Playwright instance of a single run.
+
+With PLAYWRIGHT_REMOTE_BROWSER_ENDPOINT set, nothing is launched and the
+scrapers connect to that endpoint instead. Parents that run scrapers in
+child processes hand their own endpoint down, so every process shares the
+parent's Chromium; they hold a `lease()` while those children are attached.
+
+Recycling: after BROWSER_MAX_PAGES pages (default 500), or when the Chromium
+process group uses more than BROWSER_MAX_RSS_MB (default 1500, Linux only),
+the browser is restarted the next time it is requested with no scraper
+attached. A failed health check also triggers a restart.
+
+BROWSER_MANAGER=0 restores the old launch-per-run behaviour.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+import requests
+
+CHROMIUM_ARGS = [
+    "--headless=new",
+    "--remote-debugging-port=0",
+    "--no-sandbox",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-extensions",
+    "--mute-audio",
+    "--hide-scrollbars",
+]
+
+
+def browser_manager_enabled() -> bool:
+    return os.getenv("BROWSER_MANAGER", "1").lower() not in ("0", "false", "no")
+
+
+def _process_group_rss_mb(pgid: int) -> Optional[float]:
+    """Resident memory of every process in a process group (Linux /proc only)."""
+    proc = Path("/proc")
+    if not proc.exists():
+        return None
+    page_kb = os.sysconf("SC_PAGE_SIZE") / 1024
+    total_kb = 0.0
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            fields = (entry / "stat").read_text().rsplit(")", 1)[1].split()
+            if int(fields[2]) != pgid:
+                continue
+            total_kb += int((entry / "statm").read_text().split()[1]) * page_kb
+        except (OSError, IndexError, ValueError):
+            continue
+    return total_kb / 1024
+
+
+class BrowserSession:
+    """One scraper run attached to the shared browser.
+
+    Each caller creates its own context(s) with `new_context()`, so cookies
+    and storage never leak between scrapers. Closing the session only
+    disconnects; Chromium keeps running.
+    """
+
+    def __init__(self) -> None:
+        self.browser: Any = None
+        self.pages = 0
+
+    def new_context(self, **options: Any) -> Any:
+        return self.browser.new_context(**options)
+
+    def count_page(self, count: int = 1) -> None:
+        """Count pages loaded in this session (drives recycling)."""
+        self.pages += count
+
+
+class BrowserManager:
+    """Launches (or points at) one Chromium and hands out CDP endpoints."""
+
+    def __init__(
+        self,
+        remote_endpoint: Optional[str] = None,
+        max_pages: Optional[int] = None,
+        max_rss_mb: Optional[float] = None,
+        launch_timeout: Optional[float] = None,
+    ):
+        self.remote_endpoint = (
+            remote_endpoint
+            if remote_endpoint is not None
+            else os.getenv("PLAYWRIGHT_REMOTE_BROWSER_ENDPOINT", "")
+        )
+        self.max_pages = max_pages if max_pages is not None else int(os.getenv("BROWSER_MAX_PAGES", "500"))
+        self.max_rss_mb = (
+            max_rss_mb if max_rss_mb is not None else float(os.getenv("BROWSER_MAX_RSS_MB", "1500"))
+        )
+        self.launch_timeout = (
+            launch_timeout
+            if launch_timeout is not None
+            else int(os.getenv("PLAYWRIGHT_LAUNCH_TIMEOUT_MS", "60000")) / 1000
+        )
+        self.executable_path: Optional[str] = os.getenv("BROWSER_EXECUTABLE_PATH") or None
+
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+        self._profile_dir: Optional[str] = None
+        self._http_endpoint: Optional[str] = None
+        self.active_sessions = 0
+        self.pages_served = 0
+        self.launches = 0
+
+    # ------------------------------------------------------------------#
+    # Lifecycle
+    # ------------------------------------------------------------------#
+
+    def _find_executable(self) -> str:
+        if not self.executable_path:
+            from playwright.sync_api import sync_playwright
+
+            with sync_playwright() as playwright:
+                self.executable_path = playwright.chromium.executable_path
+        return self.executable_path
+
+    def _launch(self) -> None:
+        executable = self._find_executable()
+        self._profile_dir = tempfile.mkdtemp(prefix="scraper-chromium-")
+        started = time.time()
+        self._process = subprocess.Popen(
+            [executable, *CHROMIUM_ARGS, f"--user-data-dir={self._profile_dir}", "about:blank"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        port_file = Path(self._profile_dir) / "DevToolsActivePort"
+        while time.time() - started < self.launch_timeout:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"Chromium exited during launch (code {self._process.returncode})")
+            if port_file.exists():
+                lines = port_file.read_text().split()
+                if lines:
+                    self._http_endpoint = f"http://127.0.0.1:{lines[0]}"
+                    if self._healthy():
+                        break
+            time.sleep(0.1)
+        else:
+            self._terminate()
+            raise RuntimeError(f"Chromium did not start within {self.launch_timeout:.0f}s")
+        self.pages_served = 0
+        self.launches += 1
+        print(
+            f"[BROWSER] Chromium started (pid {self._process.pid}) in {time.time() - started:.1f}s",
+            flush=True,
+        )
+
+    def _signal(self, sig: int) -> None:
+        # Chromium runs in its own session; signal the whole group (renderers too).
+        if hasattr(os, "killpg"):
+            os.killpg(self._process.pid, sig)
+        elif sig == signal.SIGTERM:
+            self._process.terminate()
+        else:
+            self._process.kill()
+
+    def _terminate(self) -> None:
+        if self._process is not None:
+            try:
+                self._signal(signal.SIGTERM)
+                self._process.wait(timeout=10)
+            except (ProcessLookupError, PermissionError):
+                pass
+            except subprocess.TimeoutExpired:
+                self._signal(getattr(signal, "SIGKILL", signal.SIGTERM))
+                self._process.wait()
+        if self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+        self._process = None
+        self._profile_dir = None
+        self._http_endpoint = None
+
+    def _healthy(self) -> bool:
+        if self._process is None or self._process.poll() is not None or not self._http_endpoint:
+            return False
+        try:
+            response = requests.get(f"{self._http_endpoint}/json/version", timeout=5)
+            return response.status_code == 200
+        except requests.RequestException:
+            return False
+
+    def memory_mb(self) -> Optional[float]:
+        if self._process is None:
+            return None
+        return _process_group_rss_mb(self._process.pid)
+
+    def _recycle_reason(self) -> Optional[str]:
+        if self.max_pages and self.pages_served >= self.max_pages:
+            return f"{self.pages_served} pages served"
+        memory = self.memory_mb()
+        if self.max_rss_mb and memory is not None and memory > self.max_rss_mb:
+            return f"using {memory:.0f} MB"
+        return None
+
+    def endpoint(self) -> str:
+        """CDP endpoint of a healthy browser, launching or recycling it if needed."""
+        if self.remote_endpoint:
+            return self.remote_endpoint
+        with self._lock:
+            if self._process is not None:
+                reason = None if self.active_sessions else self._recycle_reason()
+                if reason is None and not self._healthy():
+                    reason = "failed health check"
+                if reason:
+                    print(f"[BROWSER] Restarting Chromium: {reason}", flush=True)
+                    self._terminate()
+            if self._process is None:
+                self._launch()
+            return self._http_endpoint
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._process is not None:
+                print("[BROWSER] Stopping Chromium", flush=True)
+            self._terminate()
+
+    # ------------------------------------------------------------------#
+    # Sessions
+    # ------------------------------------------------------------------#
+
+    def _open_session(self, playwright) -> str:
+        if not self.executable_path and not self.remote_endpoint:
+            self.executable_path = playwright.chromium.executable_path
+        return self.lease()
+
+    def _close_session(self, pages: int) -> None:
+        self.release(pages)
+
+    def lease(self) -> str:
+        """Endpoint for callers that attach on their own, such as child processes.
+
+        Counts as an active session, so Chromium is not recycled, until the
+        matching `release()`.
+        """
+        endpoint = self.endpoint()
+        with self._lock:
+            self.active_sessions += 1
+        return endpoint
+
+    def release(self, pages: int = 0) -> None:
+        """End a `lease()`, counting the pages loaded under it."""
+        with self._lock:
+            self.active_sessions -= 1
+        self.record_pages(pages)
+
+    def record_pages(self, count: int) -> None:
+        """Count pages loaded by callers that attached via `endpoint()` directly."""
+        with self._lock:
+            self.pages_served += count
+
+    @contextmanager
+    def session(self, playwright, timeout: Optional[float] = None) -> Iterator[BrowserSession]:
+        """Attach a sync Playwright instance to the shared Chromium."""
+        endpoint = self._open_session(playwright)
+        session = BrowserSession()
+        try:
+            session.browser = playwright.chromium.connect_over_cdp(
+                endpoint, timeout=timeout or self.launch_timeout * 1000
+            )
+            yield session
+        finally:
+            try:
+                if session.browser is not None:
+                    session.browser.close()
+            finally:
+                self._close_session(session.pages)
+
+    @asynccontextmanager
+    async def async_session(self, playwright, timeout: Optional[float] = None):
+        """Async counterpart of `session()`; new_context() must be awaited."""
+        endpoint = await asyncio.to_thread(self._open_session, playwright)
+        session = BrowserSession()
+        try:
+            session.browser = await playwright.chromium.connect_over_cdp(
+                endpoint, timeout=timeout or self.launch_timeout * 1000
+            )
+            yield session
+        finally:
+            try:
+                if session.browser is not None:
+                    await session.browser.close()
+            finally:
+                self._close_session(session.pages)
+
+
+_shared: Optional[BrowserManager] = None
+_shared_lock = threading.Lock()
+
+
+def shared_browser() -> BrowserManager:
+    """The process-wide BrowserManager, stopped at interpreter exit."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = BrowserManager()
+            atexit.register(_shared.shutdown)
+        return _shared
+
+
+def shutdown_shared_browser() -> None:
+    """Stop the shared browser now (child processes skip atexit handlers)."""
+    with _shared_lock:
+        if _shared is not None:
+            _shared.shutdown()
@@ -15,6 +15,10 @@ from typing import Any, Dict, List, Optional
 import chromadb
 from chromadb.utils import embedding_functions
 
+from change_feed import ChangeFeed, FeedChanges
+
+SOURCES = ("gitbook", "website", "blog")
+
 
 class CompleteIndexBuilder:
     """Builds complete index with all data sources."""
@@ -56,6 +60,11 @@ class CompleteIndexBuilder:
                 print(f"[ERROR] Failed to parse {path}: {exc}", flush=True)
                 return []
 
+        normalized = self._normalize_records(records, expected_source)
+        print(f"[INFO] Loaded {len(normalized)} {expected_source} records", flush=True)
+        return normalized
+
+    def _normalize_records(self, records: List[Any], expected_source: str) -> List[Dict[str, Any]]:
         normalized: List[Dict[str, Any]] = []
         for index, record in enumerate(records):
             if not isinstance(record, dict):
@@ -83,7 +92,6 @@ class CompleteIndexBuilder:
                 }
             )
 
-        print(f"[INFO] Loaded {len(normalized)} {expected_source} records", flush=True)
         return normalized
 
     def load_docs_data(self) -> List[Dict[str, Any]]:
@@ -208,53 +216,39 @@ class CompleteIndexBuilder:
 
         return chunks
 
+    def _chunk_records(self, source: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        chunks: List[Dict[str, Any]] = []
+        for record in records:
+            metadata = self._build_chunk_metadata(record, source)
+            content = record["content"]
+            if source == "website":
+                pool_summary = self._render_pool_summary(record["url"], metadata.get("pool_data"))
+                content = f"{pool_summary}\n\n{content}".strip() if pool_summary else content
+            chunks.extend(self.chunk_content(content, record["title"], record["url"], metadata))
+        return chunks
+
+    def chunk_source(self, source: str) -> List[Dict[str, Any]]:
+        """Load and chunk one source ("gitbook", "website" or "blog")."""
+        if source == "gitbook":
+            print("\n[STEP] Chunking documentation...", flush=True)
+            chunks = self._chunk_records(source, self.load_docs_data())
+            print(f"  Created {len(chunks)} doc chunks", flush=True)
+        elif source == "website":
+            print("\n[STEP] Chunking website pages...", flush=True)
+            chunks = self._chunk_records(source, self.load_website_data())
+            print(f"  Created {len(chunks)} website chunks", flush=True)
+        elif source == "blog":
+            print("\n[STEP] Chunking blog posts...", flush=True)
+            chunks = self._chunk_records(source, self.load_blog_data())
+            print(f"  Created {len(chunks)} blog chunks", flush=True)
+        else:
+            raise ValueError(f"Unknown source: {source}")
+        return chunks
+
     def prepare_all_chunks(self) -> List[Dict[str, Any]]:
         all_chunks: List[Dict[str, Any]] = []
-
-        docs = self.load_docs_data()
-        website = self.load_website_data()
-        blog = self.load_blog_data()
-
-        print("\n[STEP] Chunking documentation...", flush=True)
-        for doc in docs:
-            metadata = self._build_chunk_metadata(doc, "gitbook")
-            chunks = self.chunk_content(
-                doc["content"],
-                doc["title"],
-                doc["url"],
-                metadata,
-            )
-            all_chunks.extend(chunks)
-        print(f"  Created {len(all_chunks)} doc chunks", flush=True)
-
-        print("\n[STEP] Chunking website pages...", flush=True)
-        website_chunk_start = len(all_chunks)
-        for page in website:
-            metadata = self._build_chunk_metadata(page, "website")
-            pool_summary = self._render_pool_summary(page["url"], metadata.get("pool_data"))
-            content = f"{pool_summary}\n\n{page['content']}".strip() if pool_summary else page["content"]
-
-            chunks = self.chunk_content(
-                content,
-                page["title"],
-                page["url"],
-                metadata,
-            )
-            all_chunks.extend(chunks)
-        print(f"  Created {len(all_chunks) - website_chunk_start} website chunks", flush=True)
-
-        print("\n[STEP] Chunking blog posts...", flush=True)
-        blog_chunk_start = len(all_chunks)
-        for post in blog:
-            metadata = self._build_chunk_metadata(post, "blog")
-            chunks = self.chunk_content(
-                post["content"],
-                post["title"],
-                post["url"],
-                metadata,
-            )
-            all_chunks.extend(chunks)
-        print(f"  Created {len(all_chunks) - blog_chunk_start} blog chunks", flush=True)
+        for source in SOURCES:
+            all_chunks.extend(self.chunk_source(source))
 
         print(f"\n[INFO] Total chunks prepared: {len(all_chunks)}", flush=True)
         return all_chunks
@@ -263,53 +257,68 @@ class CompleteIndexBuilder:
     # Build / verify
     # ------------------------------------------------------------------#
 
-    def _calculate_data_hash(self) -> str:
-        """Calculate hash of all data files to detect changes."""
-        hasher = hashlib.md5()
-        for path in [self.docs_path, self.website_path, self.blog_path]:
-            if path.exists():
-                with open(path, 'rb') as f:
-                    hasher.update(f.read())
-        return hasher.hexdigest()
-    
-    def _should_rebuild(self) -> bool:
-        """Check if index needs rebuilding based on data changes."""
-        data_hash = self._calculate_data_hash()
-        
-        # Check if collection exists and has matching hash
+    def _feed(self, source: str) -> ChangeFeed:
+        paths = {"gitbook": self.docs_path, "website": self.website_path, "blog": self.blog_path}
+        return ChangeFeed(paths[source].parent, source)
+
+    def _pending_changes(self) -> Optional[Dict[str, FeedChanges]]:
+        """Per-source feed changes since the collection was last updated.
+
+        None when there is no collection or a source has no usable feed
+        position (never indexed from the feed, or fell behind), in which case
+        only a full rebuild is safe.
+        """
         try:
             collection = self.client.get_collection("auto_finance_complete")
-            metadata = collection.metadata or {}
-            stored_hash = metadata.get("data_hash")
-            
-            if stored_hash == data_hash:
-                print(f"[SKIP] Index is up-to-date (hash: {data_hash[:8]}...)", flush=True)
-                return False
-            else:
-                print(f"[REBUILD] Data changed (old: {stored_hash[:8] if stored_hash else 'none'}..., new: {data_hash[:8]}...)", flush=True)
-                return True
         except Exception:
-            # Collection doesn't exist, need to build
             print("[BUILD] No existing index found", flush=True)
+            return None
+
+        metadata = collection.metadata or {}
+        pending: Dict[str, FeedChanges] = {}
+        for source in SOURCES:
+            changes = self._feed(source).changes_since(metadata.get(f"feed_seq_{source}"))
+            if changes is None:
+                print(f"[REBUILD] No usable {source} change feed position", flush=True)
+                return None
+            pending[source] = changes
+        return pending
+
+    def _should_rebuild(self) -> bool:
+        """Check if the index is behind the scrapers' change feeds."""
+        pending = self._pending_changes()
+        if pending is None:
             return True
+        changed = {source: len(changes.urls) for source, changes in pending.items() if changes}
+        if not changed:
+            print("[SKIP] Index is up-to-date with the change feeds", flush=True)
+            return False
+        print(f"[UPDATE] Changed URLs per source: {changed}", flush=True)
+        return True
 
     def build_index(self, progress_callback=None, force: bool = False) -> None:
         print("\n" + "=" * 60, flush=True)
         print("Building Complete Index", flush=True)
         print("=" * 60, flush=True)
 
-        # Check if rebuild is needed (unless forced)
-        if not force and not self._should_rebuild():
-            if progress_callback:
-                # Get existing collection count
-                try:
-                    collection = self.client.get_collection("auto_finance_complete")
-                    count = collection.count()
-                    progress_callback(count, count, "Index already up-to-date")
-                except:
-                    pass
+        # Apply the change feeds when possible; rebuild everything otherwise (or when forced)
+        pending = None if force else self._pending_changes()
+        if pending is not None:
+            collection = self.client.get_collection(
+                "auto_finance_complete", embedding_function=self.embedding_function
+            )
+            for source, changes in pending.items():
+                if changes:
+                    self._apply_changes(collection, source, changes, progress_callback)
+            if progress_callback and not any(pending.values()):
+                count = collection.count()
+                progress_callback(count, count, "Index already up-to-date")
             return
 
+        # Read feed positions first: the data loaded below is at least this new.
+        positions = {
+            f"feed_seq_{source}": self._feed(source).latest_seq() for source in SOURCES
+        }
         all_chunks = self.prepare_all_chunks()
 
         if not all_chunks:
@@ -318,8 +327,6 @@ class CompleteIndexBuilder:
                 progress_callback(0, 0, "No chunks to index")
             return
 
-        data_hash = self._calculate_data_hash()
-
         try:
             self.client.delete_collection(name="auto_finance_complete")
             print("[INFO] Deleted existing 'auto_finance_complete' collection", flush=True)
@@ -331,18 +338,67 @@ class CompleteIndexBuilder:
             embedding_function=self.embedding_function,
             metadata={
                 "description": "Complete Auto Finance data: docs + website + blog",
-                "data_hash": data_hash,
+                **positions,
             },
         )
 
         print("\n[STEP] Indexing chunks...", flush=True)
+        self._add_chunks(
+            collection,
+            all_chunks,
+            [f"chunk_{index}" for index in range(len(all_chunks))],
+            progress_callback,
+        )
+
+        print(f"\n[OK] Index built successfully with {len(all_chunks)} chunks.", flush=True)
+
+    def _apply_changes(self, collection, source: str, changes: FeedChanges, progress_callback=None) -> None:
+        """Re-embed the changed URLs of one source and drop removed ones."""
+        urls = sorted(changes.urls)
+        for index in range(0, len(urls), 100):
+            collection.delete(where={"url": {"$in": urls[index : index + 100]}})
+        records = self._normalize_records(list(changes.upserts.values()), source)
+        chunks = self._chunk_records(source, records)
+        if chunks:
+            self._add_chunks(collection, chunks, self._chunk_ids(source, chunks), progress_callback)
+        self._save_feed_position(collection, source, changes.seq)
+        print(
+            f"[OK] {source}: {len(changes.upserts)} URLs re-embedded ({len(chunks)} chunks), "
+            f"{len(changes.removed)} removed",
+            flush=True,
+        )
+
+    @staticmethod
+    def _save_feed_position(collection, source: str, seq: int) -> None:
+        metadata = dict(collection.metadata or {})
+        metadata[f"feed_seq_{source}"] = seq
+        collection.modify(metadata=metadata)
+
+    @staticmethod
+    def _chunk_ids(source: str, chunks: List[Dict[str, Any]]) -> List[str]:
+        """Stable ids per URL: <source>_<url hash>_<n>."""
+        seen: Dict[str, int] = {}
+        ids = []
+        for chunk in chunks:
+            key = hashlib.sha1(chunk["url"].encode("utf-8")).hexdigest()[:16]
+            ids.append(f"{source}_{key}_{seen.get(key, 0)}")
+            seen[key] = seen.get(key, 0) + 1
+        return ids
+
+    def _add_chunks(
+        self,
+        collection,
+        chunks: List[Dict[str, Any]],
+        ids: List[str],
+        progress_callback=None,
+    ) -> None:
         if progress_callback:
-            progress_callback(0, len(all_chunks), "Starting index build...")
-        
+            progress_callback(0, len(chunks), "Starting index build...")
+
         batch_size = 100
-        total_batches = (len(all_chunks) - 1) // batch_size + 1
-        for index in range(0, len(all_chunks), batch_size):
-            batch = all_chunks[index : index + batch_size]
+        total_batches = (len(chunks) - 1) // batch_size + 1
+        for index in range(0, len(chunks), batch_size):
+            batch = chunks[index : index + batch_size]
             metadatas = []
             for chunk in batch:
                 chunk_meta = dict(chunk["metadata"] or {})
@@ -362,18 +418,64 @@ class CompleteIndexBuilder:
             collection.add(
                 documents=[chunk["text"] for chunk in batch],
                 metadatas=metadatas,
-                ids=[f"chunk_{index + offset}" for offset in range(len(batch))],
+                ids=ids[index : index + batch_size],
             )
 
             batch_num = index // batch_size + 1
-            chunks_indexed = min(index + len(batch), len(all_chunks))
-            step_msg = f"Indexed batch {batch_num}/{total_batches} ({chunks_indexed}/{len(all_chunks)} chunks)"
+            chunks_indexed = min(index + len(batch), len(chunks))
+            step_msg = f"Indexed batch {batch_num}/{total_batches} ({chunks_indexed}/{len(chunks)} chunks)"
             print(f"  {step_msg}", flush=True)
-            
+
             if progress_callback:
-                progress_callback(chunks_indexed, len(all_chunks), step_msg)
+                progress_callback(chunks_indexed, len(chunks), step_msg)
 
-        print(f"\n[OK] Index built successfully with {len(all_chunks)} chunks.", flush=True)
+    def source_chunk_count(self, source: str) -> int:
+        """Chunks currently indexed for one source (0 if there is no collection)."""
+        try:
+            collection = self.client.get_collection(name="auto_finance_complete")
+        except Exception:
+            return 0
+        return len(collection.get(where={"source": source}, include=[])["ids"])
+
+    def index_source(self, source: str, progress_callback=None) -> int:
+        """Replace one source's chunks in the collection, leaving the others alone.
+
+        Used by the full scrape to index each source as soon as it finishes.
+        The source's feed position is stored so later updates can be
+        incremental.
+        """
+        chunks = self.chunk_source(source)
+        if not chunks:
+            print(f"[WARN] No {source} chunks; keeping the indexed ones", flush=True)
+            return 0
+
+        position = self._feed(source).latest_seq()
+        collection = self.client.get_or_create_collection(
+            name="auto_finance_complete",
+            embedding_function=self.embedding_function,
+            metadata={"description": "Complete Auto Finance data: docs + website + blog"},
+        )
+        collection.delete(where={"source": source})
+        print(f"\n[STEP] Indexing {len(chunks)} {source} chunks...", flush=True)
+        self._add_chunks(collection, chunks, self._chunk_ids(source, chunks), progress_callback)
+        self._save_feed_position(collection, source, position)
+        print(f"[OK] Indexed {source}: {len(chunks)} chunks", flush=True)
+        return len(chunks)
+
+    def update_source(self, source: str, progress_callback=None) -> None:
+        """Apply one source's change feed, or reindex it fully without a usable position."""
+        collection = self.client.get_or_create_collection(
+            name="auto_finance_complete",
+            embedding_function=self.embedding_function,
+            metadata={"description": "Complete Auto Finance data: docs + website + blog"},
+        )
+        changes = self._feed(source).changes_since((collection.metadata or {}).get(f"feed_seq_{source}"))
+        if changes is None:
+            self.index_source(source, progress_callback)
+        elif changes:
+            self._apply_changes(collection, source, changes, progress_callback)
+        else:
+            print(f"[SKIP] {source} index is up-to-date", flush=True)
 
     def verify_index(self) -> bool:
         try:
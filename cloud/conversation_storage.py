@@ -3,121 +3,668 @@ Conversation Storage & Analytics System
 Stores, indexes, and analyzes all bot conversations
 """
 
+import atexit
+import base64
+import hashlib
 import json
+import os
+import queue
 import sqlite3
-from datetime import datetime
+import threading
+import time
+import unicodedata
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import List, Dict, Optional
 import re
 
+import conversation_export
+from sqlite_connections import SQLiteConnectionManager
+
+
+# Rollup periods and their bucket formats (strftime, same codes in SQLite)
+ROLLUP_PERIODS = {
+    'hour': '%Y-%m-%d %H:00:00',
+    'day': '%Y-%m-%d',
+    'all': None,
+}
+# Bucket/platform/model value meaning "all of them"
+ROLLUP_ALL = '*'
+
+
+def encode_cursor(values: list) -> str:
+    """Opaque page token: the sort key of the last row on a page"""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, size: int) -> list:
+    """Sort key from encode_cursor(); ValueError if the token is not one"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {token!r}") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError(f"Invalid cursor: {token!r}")
+    return values
+
+
+def normalize_question(question: str) -> str:
+    """Casefold, drop punctuation and collapse whitespace"""
+    text = unicodedata.normalize('NFKC', question).casefold()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+
+def question_fingerprint(question: str) -> str:
+    """Key shared by trivial variants of a question ('' if it has no words)"""
+    normalized = normalize_question(question)
+    if not normalized:
+        return ''
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+class ConversationWriter:
+    """Background writer that batches conversation inserts
+
+    Bots hand records to `submit()` and return straight away. A daemon thread
+    commits them in one transaction per batch: CONVERSATION_FLUSH_MS (default
+    200) after the first waiting record, or as soon as CONVERSATION_BATCH_SIZE
+    (default 100) records are waiting. The queue holds at most
+    CONVERSATION_QUEUE_SIZE (default 1000) records; when it is full the caller
+    writes synchronously instead, so nothing is dropped. `stop()` commits
+    whatever is still queued and also runs at interpreter exit.
+    """
+
+    _STOP = object()
+
+    def __init__(self, storage, flush_ms: int = None, batch_size: int = None, max_queue: int = None):
+        self.storage = storage
+        if flush_ms is None:
+            flush_ms = int(os.getenv("CONVERSATION_FLUSH_MS", "200"))
+        if batch_size is None:
+            batch_size = int(os.getenv("CONVERSATION_BATCH_SIZE", "100"))
+        if max_queue is None:
+            max_queue = int(os.getenv("CONVERSATION_QUEUE_SIZE", "1000"))
+        self.flush_interval = flush_ms / 1000
+        self.batch_size = max(1, batch_size)
+        self.queue = queue.Queue(maxsize=max_queue)
+        
+        self._lock = threading.Lock()
+        self._stopped = False
+        self.committed = 0
+        self.failed = 0
+        self.batches = 0
+        self.overflow_writes = 0
+        self.max_depth = 0
+        self.last_commit_ms = 0.0
+        self.max_commit_ms = 0.0
+        self._total_commit_ms = 0.0
+        
+        self._thread = threading.Thread(target=self._run, name="conversation-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+    
+    def submit(self, record: Dict):
+        """Queue one save_conversation(**record) call"""
+        if not self._stopped:
+            try:
+                self.queue.put_nowait(record)
+                depth = self.queue.qsize()
+                with self._lock:
+                    self.max_depth = max(self.max_depth, depth)
+                return
+            except queue.Full:
+                with self._lock:
+                    self.overflow_writes += 1
+        self.storage.save_conversation(**record)
+    
+    def _run(self):
+        while True:
+            record = self.queue.get()
+            if record is self._STOP:
+                self.queue.task_done()
+                return
+            
+            batch = [record]
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    record = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if record is self._STOP:
+                    stop = True
+                    break
+                batch.append(record)
+            
+            self._commit(batch)
+            for _ in range(len(batch) + stop):
+                self.queue.task_done()
+            if stop:
+                return
+    
+    def _commit(self, batch: List[Dict]):
+        started = time.perf_counter()
+        try:
+            with self.storage.db.write() as conn:
+                cursor = conn.cursor()
+                for record in batch:
+                    self.storage._insert_conversation(cursor, **record)
+            committed, failed = len(batch), 0
+        except Exception as e:
+            # One bad record must not lose the rest: retry them one by one
+            print(f"[WARN] Batched conversation write failed ({e}); retrying individually", flush=True)
+            committed = failed = 0
+            for record in batch:
+                try:
+                    self.storage.save_conversation(**record)
+                    committed += 1
+                except Exception as e:
+                    failed += 1
+                    print(f"[ERROR] Could not save conversation for {record.get('user_id')}: {e}", flush=True)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        with self._lock:
+            self.committed += committed
+            self.failed += failed
+            self.batches += 1
+            self.last_commit_ms = elapsed_ms
+            self.max_commit_ms = max(self.max_commit_ms, elapsed_ms)
+            self._total_commit_ms += elapsed_ms
+    
+    def flush(self):
+        """Block until everything queued so far is committed"""
+        self.queue.join()
+    
+    def stop(self):
+        """Commit what is queued and stop the thread. Idempotent."""
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+        self.queue.put(self._STOP)
+        self._thread.join()
+        # Records that raced in behind the sentinel
+        leftovers = []
+        while True:
+            try:
+                leftovers.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if leftovers:
+            self._commit(leftovers)
+    
+    def stats(self) -> Dict:
+        """Queue depth and commit latency metrics"""
+        with self._lock:
+            return {
+                'queue_depth': self.queue.qsize(),
+                'max_depth': self.max_depth,
+                'committed': self.committed,
+                'failed': self.failed,
+                'batches': self.batches,
+                'overflow_writes': self.overflow_writes,
+                'last_commit_ms': round(self.last_commit_ms, 2),
+                'avg_commit_ms': round(self._total_commit_ms / self.batches, 2) if self.batches else 0.0,
+                'max_commit_ms': round(self.max_commit_ms, 2),
+            }
+
 
 class ConversationStorage:
-    """Persistent storage for all bot conversations"""
+    """Persistent storage for all bot conversations
+
+    Connections are long-lived (see sqlite_connections.py): writes share one
+    WAL-mode writer connection, reads use a small pool of read-only ones.
+    The bots save through queue_conversation(), which batches inserts on a
+    background ConversationWriter.
+    """
     
     def __init__(self, db_path="bot_conversations.db"):
         self.db_path = db_path
+        self.db = SQLiteConnectionManager(db_path)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._rollup_hour = None
         self.init_database()
     
+    @property
+    def writer(self) -> ConversationWriter:
+        """Background writer behind queue_conversation(), started on first use"""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = ConversationWriter(self)
+            return self._writer
+    
+    def write_queue_stats(self) -> Dict:
+        """Queue depth and commit latency of the background writer"""
+        return self.writer.stats()
+    
+    def close(self):
+        """Commit queued conversations, checkpoint the WAL and close all connections"""
+        if self._writer is not None:
+            self._writer.stop()
+        self.db.close()
+    
     def init_database(self):
         """Initialize SQLite database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.db.write() as conn:
+            cursor = conn.cursor()
+            
+            # Conversation threads (like ChatGPT conversations)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS conversation_threads (
+                    thread_id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    title TEXT,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    message_count INTEGER DEFAULT 0,
+                    last_message_preview TEXT,
+                    created_ts INTEGER,
+                    updated_ts INTEGER
+                )
+            ''')
+            
+            # Conversations table (individual messages in threads)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS conversations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    thread_id TEXT,
+                    username TEXT,
+                    chat_id TEXT NOT NULL,
+                    chat_type TEXT,
+                    platform TEXT NOT NULL,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    question TEXT NOT NULL,
+                    answer TEXT NOT NULL,
+                    model TEXT,
+                    tokens_used INTEGER,
+                    context_length INTEGER,
+                    system_prompt TEXT,
+                    ts INTEGER,
+                    FOREIGN KEY (thread_id) REFERENCES conversation_threads(thread_id) ON DELETE CASCADE
+                )
+            ''')
+            
+            # User index
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id TEXT PRIMARY KEY,
+                    username TEXT,
+                    platform TEXT,
+                    first_seen DATETIME,
+                    last_seen DATETIME,
+                    total_questions INTEGER DEFAULT 0,
+                    total_tokens INTEGER DEFAULT 0
+                )
+            ''')
+            
+            self._migrate_epoch_columns(cursor)
+            
+            # Create indexes for faster searching (time-ordered per user/thread)
+            for old_index in ('idx_user_id', 'idx_thread_id', 'idx_user_threads', 'idx_timestamp', 'idx_platform',
+                              'idx_threads_user_updated', 'idx_users_questions'):
+                cursor.execute(f'DROP INDEX IF EXISTS {old_index}')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversations_user_ts ON conversations(user_id, ts)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversations_thread_ts ON conversations(thread_id, ts)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversations_platform_ts ON conversations(platform, ts)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_conversations_ts ON conversations(ts)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_threads_user_updated_id ON conversation_threads(user_id, updated_ts, thread_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_questions_id ON users(total_questions, user_id)')
+            
+            self.fts_enabled = self._init_search_index(cursor)
+            self._init_question_stats(cursor)
+            self._init_analytics_rollups(cursor)
+    
+    @staticmethod
+    def _add_column(cursor, table: str, column: str, definition: str) -> bool:
+        """ALTER TABLE ADD COLUMN unless it exists; True if it was added"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        if any(row[1] == column for row in cursor.fetchall()):
+            return False
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+        return True
+    
+    def _migrate_epoch_columns(self, cursor):
+        """Add integer epoch columns next to the CURRENT_TIMESTAMP text ones
+        
+        Text timestamps only sort and range-filter through an index when they
+        are compared bare; epoch seconds (ts, created_ts, updated_ts) are
+        compact, unambiguous and what every time-ordered query and index
+        uses. The text columns stay for display and older readers.
+        """
+        if self._add_column(cursor, 'conversations', 'ts', 'INTEGER'):
+            print("[INFO] Adding epoch timestamps to existing conversations...", flush=True)
+            cursor.execute("UPDATE conversations SET ts = CAST(strftime('%s', timestamp) AS INTEGER)")
+        if self._add_column(cursor, 'conversation_threads', 'created_ts', 'INTEGER'):
+            cursor.execute("UPDATE conversation_threads SET created_ts = CAST(strftime('%s', created_at) AS INTEGER)")
+        if self._add_column(cursor, 'conversation_threads', 'updated_ts', 'INTEGER'):
+            cursor.execute("UPDATE conversation_threads SET updated_ts = CAST(strftime('%s', updated_at) AS INTEGER)")
+    
+    def _init_search_index(self, cursor) -> bool:
+        """Create the FTS5 index over question/answer; backfill it on first run
+        
+        conversations_fts is an external-content table (it stores only the
+        index, the text stays in conversations) kept in sync by triggers.
+        Returns False when this SQLite build has no FTS5; search then falls
+        back to LIKE.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'conversations_fts'")
+        exists = cursor.fetchone() is not None
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(
+                    question, answer,
+                    content='conversations', content_rowid='id',
+                    tokenize='porter unicode61'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            print(f"[WARN] FTS5 unavailable, conversation search uses LIKE: {e}", flush=True)
+            return False
         
-        # Conversation threads (like ChatGPT conversations)
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS conversation_threads (
-                thread_id TEXT PRIMARY KEY,
-                user_id TEXT NOT NULL,
-                title TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                message_count INTEGER DEFAULT 0,
-                last_message_preview TEXT
-            )
+            CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+                INSERT INTO conversations_fts(rowid, question, answer)
+                VALUES (new.id, new.question, new.answer);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS conversations_fts_delete AFTER DELETE ON conversations BEGIN
+                INSERT INTO conversations_fts(conversations_fts, rowid, question, answer)
+                VALUES ('delete', old.id, old.question, old.answer);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS conversations_fts_update AFTER UPDATE OF question, answer ON conversations BEGIN
+                INSERT INTO conversations_fts(conversations_fts, rowid, question, answer)
+                VALUES ('delete', old.id, old.question, old.answer);
+                INSERT INTO conversations_fts(rowid, question, answer)
+                VALUES (new.id, new.question, new.answer);
+            END
         ''')
         
-        # Conversations table (individual messages in threads)
+        if not exists:
+            # Migration: index conversations saved before the FTS table existed
+            cursor.execute("INSERT INTO conversations_fts(conversations_fts) VALUES ('rebuild')")
+            cursor.execute('SELECT COUNT(*) FROM conversations')
+            count = cursor.fetchone()[0]
+            if count:
+                print(f"[INFO] Indexed {count} existing conversations for full-text search", flush=True)
+        return True
+    
+    def _init_question_stats(self, cursor):
+        """Create the question_stats tables; backfill them on first run
+        
+        question_stats holds one row per question fingerprint (see
+        question_fingerprint), so top-N is an index read instead of a GROUP BY
+        over every conversation. The write path keeps it current.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'question_stats'")
+        exists = cursor.fetchone() is not None
+        
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS conversations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                thread_id TEXT,
-                username TEXT,
-                chat_id TEXT NOT NULL,
-                chat_type TEXT,
-                platform TEXT NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            CREATE TABLE IF NOT EXISTS question_stats (
+                fingerprint TEXT PRIMARY KEY,
                 question TEXT NOT NULL,
-                answer TEXT NOT NULL,
-                model TEXT,
-                tokens_used INTEGER,
-                context_length INTEGER,
-                system_prompt TEXT,
-                FOREIGN KEY (thread_id) REFERENCES conversation_threads(thread_id) ON DELETE CASCADE
+                count INTEGER NOT NULL DEFAULT 0,
+                first_asked DATETIME,
+                last_asked DATETIME
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS question_platform_stats (
+                fingerprint TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (fingerprint, platform)
             )
         ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_question_stats_count ON question_stats(count DESC)')
+        
+        if exists:
+            return
+        
+        # Migration: count conversations saved before question_stats existed
+        questions = {}
+        platforms = Counter()
+        cursor.execute('SELECT question, platform, timestamp FROM conversations ORDER BY id')
+        for question, platform, timestamp in cursor.fetchall():
+            fingerprint = question_fingerprint(question)
+            if not fingerprint:
+                continue
+            stats = questions.get(fingerprint)
+            if stats is None:
+                questions[fingerprint] = [question, 1, timestamp, timestamp]
+            else:
+                stats[1] += 1
+                stats[3] = timestamp
+            platforms[(fingerprint, platform)] += 1
+        
+        cursor.executemany('''
+            INSERT INTO question_stats (fingerprint, question, count, first_asked, last_asked)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(fingerprint, *stats) for fingerprint, stats in questions.items()])
+        cursor.executemany('''
+            INSERT INTO question_platform_stats (fingerprint, platform, count)
+            VALUES (?, ?, ?)
+        ''', [(fingerprint, platform, count) for (fingerprint, platform), count in platforms.items()])
+        if questions:
+            print(f"[INFO] Counted {len(questions)} distinct questions into question_stats", flush=True)
+    
+    def _count_question(self, cursor, question: str, platform: str):
+        """Add one ask to question_stats (part of the insert transaction)"""
+        fingerprint = question_fingerprint(question)
+        if not fingerprint:
+            return
+        cursor.execute('''
+            INSERT INTO question_stats (fingerprint, question, count, first_asked, last_asked)
+            VALUES (?, ?, 1, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            ON CONFLICT(fingerprint) DO UPDATE SET
+                count = count + 1,
+                last_asked = CURRENT_TIMESTAMP
+        ''', (fingerprint, question))
+        cursor.execute('''
+            INSERT INTO question_platform_stats (fingerprint, platform, count)
+            VALUES (?, ?, 1)
+            ON CONFLICT(fingerprint, platform) DO UPDATE SET count = count + 1
+        ''', (fingerprint, platform))
+    
+    def _uncount_questions(self, cursor, rows: List[tuple]):
+        """Remove deleted (question, platform) rows from question_stats"""
+        platforms = Counter((question_fingerprint(question), platform) for question, platform in rows)
+        totals = Counter()
+        for (fingerprint, platform), count in platforms.items():
+            totals[fingerprint] += count
+            cursor.execute('''
+                UPDATE question_platform_stats SET count = count - ?
+                WHERE fingerprint = ? AND platform = ?
+            ''', (count, fingerprint, platform))
+        cursor.executemany('UPDATE question_stats SET count = count - ? WHERE fingerprint = ?',
+                           [(count, fingerprint) for fingerprint, count in totals.items()])
+        cursor.execute('DELETE FROM question_stats WHERE count <= 0')
+        cursor.execute('DELETE FROM question_platform_stats WHERE count <= 0')
+    
+    def _init_analytics_rollups(self, cursor):
+        """Create the hourly/daily/all-time rollup tables; backfill them on first run
+        
+        analytics_rollups has one row per (period, bucket, platform, model)
+        with conversation, unique-user and token counts. ROLLUP_ALL ('*')
+        in platform or model sums over that dimension, and period 'all' has
+        the single bucket '*'. analytics_bucket_users remembers which users
+        a bucket has already counted; rows for past hours and days are
+        pruned as soon as the write path moves to a new hour.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'analytics_rollups'")
+        exists = cursor.fetchone() is not None
         
-        # User index
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id TEXT PRIMARY KEY,
-                username TEXT,
-                platform TEXT,
-                first_seen DATETIME,
-                last_seen DATETIME,
-                total_questions INTEGER DEFAULT 0,
-                total_tokens INTEGER DEFAULT 0
+            CREATE TABLE IF NOT EXISTS analytics_rollups (
+                period TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                model TEXT NOT NULL,
+                conversations INTEGER NOT NULL DEFAULT 0,
+                users INTEGER NOT NULL DEFAULT 0,
+                tokens INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (period, bucket, platform, model)
             )
         ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analytics_bucket_users (
+                period TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                model TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                PRIMARY KEY (period, bucket, platform, model, user_id)
+            ) WITHOUT ROWID
+        ''')
         
-        # Create indexes for faster searching
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_id ON conversations(user_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_thread_id ON conversations(thread_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_threads ON conversation_threads(user_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON conversations(timestamp)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_platform ON conversations(platform)')
+        if not exists:
+            # Migration: roll up conversations saved before the rollups existed.
+            # Only still-open hour/day buckets need their user sets.
+            now = datetime.now(timezone.utc)
+            for period, bucket_sql, bucket_arg, platform_sql, model_sql in self._rollup_groupings():
+                open_since = 0
+                if ROLLUP_PERIODS[period]:
+                    bucket_start = datetime.strptime(now.strftime(bucket_arg), bucket_arg)
+                    open_since = int(bucket_start.replace(tzinfo=timezone.utc).timestamp())
+                cursor.execute(f'''
+                    INSERT INTO analytics_rollups (period, bucket, platform, model, conversations, users, tokens)
+                    SELECT ?, {bucket_sql} AS b, {platform_sql} AS p, {model_sql} AS m,
+                           COUNT(*), COUNT(DISTINCT user_id), COALESCE(SUM(tokens_used), 0)
+                    FROM conversations
+                    GROUP BY b, p, m
+                ''', (period, bucket_arg))
+                cursor.execute(f'''
+                    INSERT INTO analytics_bucket_users (period, bucket, platform, model, user_id)
+                    SELECT DISTINCT ?, {bucket_sql}, {platform_sql}, {model_sql}, user_id
+                    FROM conversations
+                    WHERE ts >= ?
+                ''', (period, bucket_arg, open_since))
+        self._compact_rollups(cursor, datetime.now(timezone.utc))
+    
+    @staticmethod
+    def _rollup_groupings():
+        """(period, bucket SQL, bucket arg, platform SQL, model SQL) per rollup level"""
+        model = "COALESCE(model, 'unknown')"
+        for period, fmt in ROLLUP_PERIODS.items():
+            bucket_sql, bucket_arg = ("strftime(?, ts, 'unixepoch')", fmt) if fmt else ('?', ROLLUP_ALL)
+            for platform_sql, model_sql in (('platform', model), ('platform', "'*'"),
+                                            ("'*'", model), ("'*'", "'*'")):
+                yield period, bucket_sql, bucket_arg, platform_sql, model_sql
+    
+    def _record_rollups(self, cursor, user_id: str, platform: str, model: str, tokens_used: int):
+        """Add one conversation to every rollup level (part of the insert transaction)"""
+        now = datetime.now(timezone.utc)
+        if now.strftime(ROLLUP_PERIODS['hour']) != self._rollup_hour:
+            self._compact_rollups(cursor, now)
         
-        conn.commit()
-        conn.close()
+        model = model or 'unknown'
+        dimensions = {(platform, model), (platform, ROLLUP_ALL), (ROLLUP_ALL, model), (ROLLUP_ALL, ROLLUP_ALL)}
+        for period, fmt in ROLLUP_PERIODS.items():
+            bucket = now.strftime(fmt) if fmt else ROLLUP_ALL
+            for dim_platform, dim_model in dimensions:
+                key = (period, bucket, dim_platform, dim_model)
+                cursor.execute('''
+                    INSERT OR IGNORE INTO analytics_bucket_users (period, bucket, platform, model, user_id)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', key + (user_id,))
+                new_user = cursor.rowcount
+                cursor.execute('''
+                    INSERT INTO analytics_rollups (period, bucket, platform, model, conversations, users, tokens)
+                    VALUES (?, ?, ?, ?, 1, ?, ?)
+                    ON CONFLICT(period, bucket, platform, model) DO UPDATE SET
+                        conversations = conversations + 1,
+                        users = users + excluded.users,
+                        tokens = tokens + excluded.tokens
+                ''', key + (new_user, tokens_used or 0))
+    
+    def _compact_rollups(self, cursor, now: datetime):
+        """Drop user sets of closed hour/day buckets (their counts are final)"""
+        hour = now.strftime(ROLLUP_PERIODS['hour'])
+        cursor.execute('''
+            DELETE FROM analytics_bucket_users
+            WHERE (period = 'hour' AND bucket < ?) OR (period = 'day' AND bucket < ?)
+        ''', (hour, now.strftime(ROLLUP_PERIODS['day'])))
+        self._rollup_hour = hour
+    
+    def _uncount_rollups(self, cursor, user_id: str):
+        """Remove a user's conversations from every rollup level"""
+        for period, bucket_sql, bucket_arg, platform_sql, model_sql in self._rollup_groupings():
+            cursor.execute(f'''
+                SELECT {bucket_sql} AS b, {platform_sql} AS p, {model_sql} AS m,
+                       COUNT(*), COALESCE(SUM(tokens_used), 0)
+                FROM conversations
+                WHERE user_id = ?
+                GROUP BY b, p, m
+            ''', (bucket_arg, user_id))
+            for bucket, platform, model, conversations, tokens in cursor.fetchall():
+                cursor.execute('''
+                    UPDATE analytics_rollups
+                    SET conversations = conversations - ?, users = users - 1, tokens = tokens - ?
+                    WHERE period = ? AND bucket = ? AND platform = ? AND model = ?
+                ''', (conversations, tokens, period, bucket, platform, model))
+        cursor.execute('DELETE FROM analytics_bucket_users WHERE user_id = ?', (user_id,))
+        cursor.execute('DELETE FROM analytics_rollups WHERE conversations <= 0')
+    
+    def rebuild_search_index(self):
+        """Rebuild the full-text index from the conversations table"""
+        if self.fts_enabled:
+            with self.db.write() as conn:
+                conn.execute("INSERT INTO conversations_fts(conversations_fts) VALUES ('rebuild')")
     
     def save_conversation(self, user_id: str, username: str, chat_id: str, 
                          question: str, answer: str, platform: str = 'telegram',
                          chat_type: str = 'private', model: str = None,
                          tokens_used: int = None, thread_id: str = None,
-                         system_prompt: str = None):
+                         system_prompt: str = None, thread_saved: bool = False):
         """Save a conversation exchange"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.db.write() as conn:
+            self._insert_conversation(conn.cursor(), user_id, username, chat_id,
+                                      question, answer, platform, chat_type, model, tokens_used, thread_id, system_prompt,
+                                      thread_saved)
+    
+    def queue_conversation(self, **record):
+        """Save a conversation exchange without waiting for the message insert
         
+        Takes the same arguments as save_conversation. The thread row is
+        written before returning, so thread lists, renames and deletes see a
+        new thread straight away; the message, user and stats rows are
+        committed by the background ConversationWriter in a batched transaction.
+        """
+        if record.get('thread_id'):
+            with self.db.write() as conn:
+                self._touch_thread(conn.cursor(), record['thread_id'], record['user_id'], record['question'])
+            record['thread_saved'] = True
+        self.writer.submit(record)
+    
+    def _insert_conversation(self, cursor, user_id: str, username: str, chat_id: str, 
+                             question: str, answer: str, platform: str = 'telegram',
+                             chat_type: str = 'private', model: str = None,
+                             tokens_used: int = None, thread_id: str = None,
+                             system_prompt: str = None, thread_saved: bool = False):
+        """INSERT one exchange and update the user (and thread) rows
+        
+        thread_saved means queue_conversation already updated the thread row.
+        """
         # Save conversation
         cursor.execute('''
             INSERT INTO conversations 
-            (user_id, thread_id, username, chat_id, chat_type, platform, question, answer, model, tokens_used, system_prompt)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            (user_id, thread_id, username, chat_id, chat_type, platform, question, answer, model, tokens_used, system_prompt, ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CAST(strftime('%s', 'now') AS INTEGER))
         ''', (user_id, thread_id, username, chat_id, chat_type, platform, question, answer, model, tokens_used, system_prompt))
         
-        # Update thread if it exists
-        if thread_id:
-            # Generate title from first question if thread is new
-            cursor.execute('SELECT message_count FROM conversation_threads WHERE thread_id = ?', (thread_id,))
-            thread_exists = cursor.fetchone()
-            
-            if not thread_exists:
-                # Create new thread with title from first question
-                title = question[:50] + ('...' if len(question) > 50 else '')
-                cursor.execute('''
-                    INSERT INTO conversation_threads (thread_id, user_id, title, message_count, last_message_preview)
-                    VALUES (?, ?, ?, 1, ?)
-                ''', (thread_id, user_id, title, question[:100]))
-            else:
-                # Update existing thread
-                cursor.execute('''
-                    UPDATE conversation_threads 
-                    SET message_count = message_count + 1,
-                        updated_at = CURRENT_TIMESTAMP,
-                        last_message_preview = ?
-                    WHERE thread_id = ?
-                ''', (question[:100], thread_id))
+        if thread_id and not thread_saved:
+            self._touch_thread(cursor, thread_id, user_id, question)
         
         # Update user index
         cursor.execute('''
@@ -130,343 +677,470 @@ class ConversationStorage:
                 total_tokens = total_tokens + COALESCE(excluded.total_tokens, 0)
         ''', (user_id, username, platform, tokens_used or 0))
         
-        conn.commit()
-        conn.close()
+        # Update question stats and analytics rollups
+        self._count_question(cursor, question, platform)
+        self._record_rollups(cursor, user_id, platform, model, tokens_used)
+    
+    def _touch_thread(self, cursor, thread_id: str, user_id: str, question: str):
+        """Create the thread (titled from its first question) or bump its count and preview"""
+        cursor.execute('SELECT message_count FROM conversation_threads WHERE thread_id = ?', (thread_id,))
+        thread_exists = cursor.fetchone()
+        
+        if not thread_exists:
+            # Create new thread with title from first question
+            title = question[:50] + ('...' if len(question) > 50 else '')
+            cursor.execute('''
+                INSERT INTO conversation_threads
+                (thread_id, user_id, title, message_count, last_message_preview, created_ts, updated_ts)
+                VALUES (?, ?, ?, 1, ?, CAST(strftime('%s', 'now') AS INTEGER), CAST(strftime('%s', 'now') AS INTEGER))
+            ''', (thread_id, user_id, title, question[:100]))
+        else:
+            # Update existing thread
+            cursor.execute('''
+                UPDATE conversation_threads 
+                SET message_count = message_count + 1,
+                    updated_at = CURRENT_TIMESTAMP,
+                    updated_ts = CAST(strftime('%s', 'now') AS INTEGER),
+                    last_message_preview = ?
+                WHERE thread_id = ?
+            ''', (question[:100], thread_id))
     
     def create_thread(self, user_id: str, title: str = None) -> str:
         """Create a new conversation thread"""
         import uuid
         thread_id = str(uuid.uuid4())
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO conversation_threads (thread_id, user_id, title)
-            VALUES (?, ?, ?)
-        ''', (thread_id, user_id, title or 'New Conversation'))
-        
-        conn.commit()
-        conn.close()
+        with self.db.write() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                INSERT INTO conversation_threads (thread_id, user_id, title, created_ts, updated_ts)
+                VALUES (?, ?, ?, CAST(strftime('%s', 'now') AS INTEGER), CAST(strftime('%s', 'now') AS INTEGER))
+            ''', (thread_id, user_id, title or 'New Conversation'))
         
         return thread_id
     
     def get_user_threads(self, user_id: str, limit: int = 50) -> List[Dict]:
-        """Get all conversation threads for a user"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Get a user's most recently updated conversation threads"""
+        return self.get_user_threads_page(user_id, limit)['items']
+    
+    def get_user_threads_page(self, user_id: str, limit: int = 50, cursor: str = None) -> Dict:
+        """One page of a user's threads, most recently updated first
+        (keyset-paginated like get_user_conversations_page)"""
+        after = decode_cursor(cursor, 2) if cursor else None
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(f'''
+                SELECT thread_id, title, created_at, updated_at, message_count, last_message_preview, updated_ts
+                FROM conversation_threads
+                WHERE user_id = ? {'AND (updated_ts, thread_id) < (?, ?)' if after else ''}
+                ORDER BY updated_ts DESC, thread_id DESC
+                LIMIT ?
+            ''', (user_id, *(after or ()), limit + 1))
+            rows = cursor.fetchall()
         
-        cursor.execute('''
-            SELECT thread_id, title, created_at, updated_at, message_count, last_message_preview
-            FROM conversation_threads
-            WHERE user_id = ?
-            ORDER BY updated_at DESC
-            LIMIT ?
-        ''', (user_id, limit))
-        
-        threads = []
-        for row in cursor.fetchall():
-            threads.append({
-                'thread_id': row[0],
-                'title': row[1],
-                'created_at': row[2],
-                'updated_at': row[3],
-                'message_count': row[4],
-                'last_message_preview': row[5]
-            })
-        
-        conn.close()
-        return threads
+        return self._page(rows, limit, lambda row: [row[6], row[0]], lambda row: {
+            'thread_id': row[0],
+            'title': row[1],
+            'created_at': row[2],
+            'updated_at': row[3],
+            'message_count': row[4],
+            'last_message_preview': row[5]
+        })
     
     def get_thread_messages(self, thread_id: str, limit: int = 100) -> List[Dict]:
-        """Get all messages in a conversation thread"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Get the first messages of a conversation thread"""
+        return self.get_thread_messages_page(thread_id, limit)['items']
+    
+    def get_thread_messages_page(self, thread_id: str, limit: int = 100, cursor: str = None) -> Dict:
+        """One page of a thread's messages, oldest first
+        (keyset-paginated like get_user_conversations_page)"""
+        after = decode_cursor(cursor, 2) if cursor else None
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(f'''
+                SELECT id, timestamp, question, answer, model, system_prompt, ts
+                FROM conversations
+                WHERE thread_id = ? {'AND (ts, id) > (?, ?)' if after else ''}
+                ORDER BY ts ASC, id ASC
+                LIMIT ?
+            ''', (thread_id, *(after or ()), limit + 1))
+            rows = cursor.fetchall()
         
-        cursor.execute('''
-            SELECT id, timestamp, question, answer, model, system_prompt
-            FROM conversations
-            WHERE thread_id = ?
-            ORDER BY timestamp ASC
-            LIMIT ?
-        ''', (thread_id, limit))
-        
-        messages = []
-        for row in cursor.fetchall():
-            messages.append({
-                'id': row[0],
-                'timestamp': row[1],
-                'question': row[2],
-                'answer': row[3],
-                'model': row[4],
-                'system_prompt': row[5]
-            })
-        
-        conn.close()
-        return messages
+        return self._page(rows, limit, lambda row: [row[6], row[0]], lambda row: {
+            'id': row[0],
+            'timestamp': row[1],
+            'question': row[2],
+            'answer': row[3],
+            'model': row[4],
+            'system_prompt': row[5]
+        })
     
     def delete_thread(self, thread_id: str, user_id: str) -> bool:
         """Delete a conversation thread (cascade deletes messages)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Verify ownership
-        cursor.execute('SELECT user_id FROM conversation_threads WHERE thread_id = ?', (thread_id,))
-        result = cursor.fetchone()
-        
-        if not result or result[0] != user_id:
-            conn.close()
-            return False
-        
-        cursor.execute('DELETE FROM conversation_threads WHERE thread_id = ?', (thread_id,))
-        # Messages are cascade deleted by foreign key
-        
-        conn.commit()
-        conn.close()
+        # Commit queued messages first so none lands after the thread is gone
+        self.writer.flush()
+        with self.db.write() as conn:
+            cursor = conn.cursor()
+            
+            # Verify ownership
+            cursor.execute('SELECT user_id FROM conversation_threads WHERE thread_id = ?', (thread_id,))
+            result = cursor.fetchone()
+            
+            if not result or result[0] != user_id:
+                return False
+            
+            cursor.execute('DELETE FROM conversation_threads WHERE thread_id = ?', (thread_id,))
+            # Messages are cascade deleted by foreign key
         return True
     
     def update_thread_title(self, thread_id: str, user_id: str, title: str) -> bool:
         """Update a thread's title"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE conversation_threads 
-            SET title = ?
-            WHERE thread_id = ? AND user_id = ?
-        ''', (title, thread_id, user_id))
-        
-        updated = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
+        with self.db.write() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                UPDATE conversation_threads 
+                SET title = ?
+                WHERE thread_id = ? AND user_id = ?
+            ''', (title, thread_id, user_id))
+            
+            updated = cursor.rowcount > 0
         return updated
     
+    @staticmethod
+    def _page(rows: list, limit: int, key, item) -> Dict:
+        """{'items', 'next_cursor'} from limit + 1 keyset-ordered rows"""
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            'items': [item(row) for row in rows],
+            'next_cursor': encode_cursor(key(rows[-1])) if more else None
+        }
+    
     def get_user_conversations(self, user_id: str, limit: int = 50) -> List[Dict]:
-        """Get all conversations for a user"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Get a user's most recent conversations"""
+        return self.get_user_conversations_page(user_id, limit)['items']
+    
+    def get_user_conversations_page(self, user_id: str, limit: int = 50, cursor: str = None) -> Dict:
+        """One page of a user's conversations, newest first
         
-        cursor.execute('''
-            SELECT timestamp, chat_type, question, answer, model, tokens_used
-            FROM conversations
-            WHERE user_id = ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-        ''', (user_id, limit))
-        
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'timestamp': row[0],
-                'chat_type': row[1],
-                'question': row[2],
-                'answer': row[3],
-                'model': row[4],
-                'tokens_used': row[5]
-            })
-        
-        conn.close()
-        return results
+        Pass the returned next_cursor back to get the following page; each
+        page is an index seek past the cursor, however deep it is.
+        """
+        after = decode_cursor(cursor, 2) if cursor else None
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(f'''
+                SELECT id, ts, timestamp, chat_type, question, answer, model, tokens_used
+                FROM conversations
+                WHERE user_id = ? {'AND (ts, id) < (?, ?)' if after else ''}
+                ORDER BY ts DESC, id DESC
+                LIMIT ?
+            ''', (user_id, *(after or ()), limit + 1))
+            rows = cursor.fetchall()
+        
+        return self._page(rows, limit, lambda row: [row[1], row[0]], lambda row: {
+            'id': row[0],
+            'timestamp': row[2],
+            'chat_type': row[3],
+            'question': row[4],
+            'answer': row[5],
+            'model': row[6],
+            'tokens_used': row[7]
+        })
+    
+    @staticmethod
+    def _user_item(row) -> Dict:
+        return {
+            'user_id': row[0],
+            'username': row[1] or 'Unknown',
+            'platform': row[2],
+            'first_seen': row[3],
+            'last_seen': row[4],
+            'total_questions': row[5],
+            'total_tokens': row[6]
+        }
     
     def get_all_users(self) -> List[Dict]:
-        """Get all users with stats"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Get all users with stats, most active first (see get_all_users_page for large tables)"""
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT user_id, username, platform, first_seen, last_seen, total_questions, total_tokens
+                FROM users
+                ORDER BY total_questions DESC, user_id DESC
+            ''')
+            rows = cursor.fetchall()
         
-        cursor.execute('''
-            SELECT user_id, username, platform, first_seen, last_seen, total_questions, total_tokens
-            FROM users
-            ORDER BY total_questions DESC
-        ''')
+        return [self._user_item(row) for row in rows]
+    
+    def get_all_users_page(self, limit: int = 100, cursor: str = None) -> Dict:
+        """One page of users, most active first (keyset-paginated like
+        get_user_conversations_page)"""
+        after = decode_cursor(cursor, 2) if cursor else None
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(f'''
+                SELECT user_id, username, platform, first_seen, last_seen, total_questions, total_tokens
+                FROM users
+                {'WHERE (total_questions, user_id) < (?, ?)' if after else ''}
+                ORDER BY total_questions DESC, user_id DESC
+                LIMIT ?
+            ''', (*(after or ()), limit + 1))
+            rows = cursor.fetchall()
         
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'user_id': row[0],
-                'username': row[1] or 'Unknown',
-                'platform': row[2],
-                'first_seen': row[3],
-                'last_seen': row[4],
-                'total_questions': row[5],
-                'total_tokens': row[6]
-            })
-        
-        conn.close()
-        return results
+        return self._page(rows, limit, lambda row: [row[5], row[0]], self._user_item)
     
-    def search_conversations(self, keyword: str, limit: int = 100) -> List[Dict]:
-        """Search conversations by keyword"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    @staticmethod
+    def _fts_query(keyword: str, prefix: bool = False) -> str:
+        """Turn free text into an FTS5 query: every word must match
         
-        cursor.execute('''
-            SELECT user_id, username, timestamp, question, answer, platform
-            FROM conversations
-            WHERE question LIKE ? OR answer LIKE ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-        ''', (f'%{keyword}%', f'%{keyword}%', limit))
-        
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'user_id': row[0],
-                'username': row[1] or 'Unknown',
-                'timestamp': row[2],
-                'question': row[3],
-                'answer': row[4],
-                'platform': row[5]
-            })
-        
-        conn.close()
+        Words are quoted so FTS syntax in user input is treated as text. In
+        prefix mode (or when the keyword ends in '*') each word also matches
+        longer words, e.g. 'liq' finds 'liquidity'.
+        """
+        prefix = prefix or keyword.rstrip().endswith('*')
+        terms = re.findall(r'\w+', keyword)
+        return ' '.join(f'"{term}"' + ('*' if prefix else '') for term in terms)
+    
+    def search_conversations(self, keyword: str, limit: int = 100, prefix: bool = False) -> List[Dict]:
+        """Search conversations by keyword, best matches first
+        
+        Matches are ranked by BM25 (question hits weigh double) and carry
+        question_snippet/answer_snippet with the matched words in [brackets].
+        """
+        if not self.fts_enabled:
+            return self._search_conversations_like(keyword, limit)
+        
+        query = self._fts_query(keyword, prefix)
+        if not query:
+            return []
+        
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT c.user_id, c.username, c.timestamp, c.question, c.answer, c.platform,
+                       snippet(conversations_fts, 0, '[', ']', '...', 16),
+                       snippet(conversations_fts, 1, '[', ']', '...', 32),
+                       bm25(conversations_fts, 2.0, 1.0) AS score
+                FROM conversations_fts
+                JOIN conversations c ON c.id = conversations_fts.rowid
+                WHERE conversations_fts MATCH ?
+                ORDER BY score
+                LIMIT ?
+            ''', (query, limit))
+            
+            results = []
+            for row in cursor.fetchall():
+                results.append({
+                    'user_id': row[0],
+                    'username': row[1] or 'Unknown',
+                    'timestamp': row[2],
+                    'question': row[3],
+                    'answer': row[4],
+                    'platform': row[5],
+                    'question_snippet': row[6],
+                    'answer_snippet': row[7],
+                    'score': row[8]
+                })
+        return results
+    
+    def _search_conversations_like(self, keyword: str, limit: int) -> List[Dict]:
+        """Substring search for SQLite builds without FTS5 (full table scan)"""
+        keyword = keyword.rstrip('*')
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT user_id, username, timestamp, question, answer, platform
+                FROM conversations
+                WHERE question LIKE ? OR answer LIKE ?
+                ORDER BY ts DESC
+                LIMIT ?
+            ''', (f'%{keyword}%', f'%{keyword}%', limit))
+            
+            results = []
+            for row in cursor.fetchall():
+                results.append({
+                    'user_id': row[0],
+                    'username': row[1] or 'Unknown',
+                    'timestamp': row[2],
+                    'question': row[3],
+                    'answer': row[4],
+                    'platform': row[5],
+                    'question_snippet': row[3],
+                    'answer_snippet': row[4][:200],
+                    'score': None
+                })
         return results
     
     def get_top_questions(self, limit: int = 20) -> List[Dict]:
-        """Get most common questions"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Get the most common questions of all time
         
-        cursor.execute('''
-            SELECT question, COUNT(*) as count, platform
-            FROM conversations
-            GROUP BY LOWER(question)
-            ORDER BY count DESC
-            LIMIT ?
-        ''', (limit,))
-        
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'question': row[0],
-                'count': row[1],
-                'platform': row[2]
-            })
-        
-        conn.close()
+        Variants that differ only in case, punctuation or spacing count as one
+        question. Each result has the total count, per-platform counts, the
+        platform it is asked on most, last_asked and its fingerprint, so an
+        answer cache can pre-warm the hot questions.
+        """
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT fingerprint, question, count, last_asked
+                FROM question_stats
+                ORDER BY count DESC
+                LIMIT ?
+            ''', (limit,))
+            rows = cursor.fetchall()
+            
+            platforms = {row[0]: {} for row in rows}
+            if rows:
+                cursor.execute(f'''
+                    SELECT fingerprint, platform, count
+                    FROM question_platform_stats
+                    WHERE fingerprint IN ({','.join('?' * len(rows))})
+                ''', list(platforms))
+                for fingerprint, platform, count in cursor.fetchall():
+                    platforms[fingerprint][platform] = count
+            
+            results = []
+            for row in rows:
+                by_platform = platforms[row[0]]
+                results.append({
+                    'question': row[1],
+                    'count': row[2],
+                    'platform': max(by_platform, key=by_platform.get) if by_platform else None,
+                    'platforms': by_platform,
+                    'last_asked': row[3],
+                    'fingerprint': row[0]
+                })
         return results
     
     def get_analytics(self) -> Dict:
-        """Get overall analytics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Total conversations
-        cursor.execute('SELECT COUNT(*) FROM conversations')
-        total_convos = cursor.fetchone()[0]
-        
-        # Unique users
-        cursor.execute('SELECT COUNT(DISTINCT user_id) FROM users')
-        unique_users = cursor.fetchone()[0]
-        
-        # By platform
-        cursor.execute('''
-            SELECT platform, COUNT(*) 
-            FROM conversations 
-            GROUP BY platform
-        ''')
-        by_platform = dict(cursor.fetchall())
-        
-        # Most active user
-        cursor.execute('''
-            SELECT username, total_questions 
-            FROM users 
-            ORDER BY total_questions DESC 
-            LIMIT 1
-        ''')
-        most_active = cursor.fetchone()
-        
-        # Total tokens used
-        cursor.execute('SELECT SUM(total_tokens) FROM users')
-        total_tokens = cursor.fetchone()[0] or 0
-        
-        # Recent activity (last 24h)
-        cursor.execute('''
-            SELECT COUNT(*) 
-            FROM conversations 
-            WHERE datetime(timestamp) > datetime('now', '-1 day')
-        ''')
-        recent_24h = cursor.fetchone()[0]
-        
-        conn.close()
+        """Get overall analytics (read from the rollup tables)"""
+        now = datetime.now(timezone.utc)
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            
+            # All-time totals, per platform and per model
+            cursor.execute('''
+                SELECT platform, model, conversations, users, tokens
+                FROM analytics_rollups
+                WHERE period = 'all' AND bucket = ? AND (platform = ? OR model = ?)
+            ''', (ROLLUP_ALL, ROLLUP_ALL, ROLLUP_ALL))
+            totals = (0, 0, 0)
+            by_platform = {}
+            by_model = {}
+            for platform, model, conversations, users, tokens in cursor.fetchall():
+                if platform == ROLLUP_ALL and model == ROLLUP_ALL:
+                    totals = (conversations, users, tokens)
+                elif model == ROLLUP_ALL:
+                    by_platform[platform] = conversations
+                else:
+                    by_model[model] = conversations
+            
+            # Most active user
+            cursor.execute('''
+                SELECT username, total_questions 
+                FROM users 
+                ORDER BY total_questions DESC 
+                LIMIT 1
+            ''')
+            most_active = cursor.fetchone()
+            
+            # Recent activity (the last 24 hourly buckets)
+            cursor.execute('''
+                SELECT COALESCE(SUM(conversations), 0)
+                FROM analytics_rollups
+                WHERE period = 'hour' AND bucket >= ? AND platform = ? AND model = ?
+            ''', ((now - timedelta(hours=23)).strftime(ROLLUP_PERIODS['hour']), ROLLUP_ALL, ROLLUP_ALL))
+            recent_24h = cursor.fetchone()[0]
         
         return {
-            'total_conversations': total_convos,
-            'unique_users': unique_users,
+            'total_conversations': totals[0],
+            'unique_users': totals[1],
             'by_platform': by_platform,
+            'by_model': by_model,
             'most_active_user': most_active[0] if most_active else None,
             'most_active_count': most_active[1] if most_active else 0,
-            'total_tokens_used': total_tokens,
+            'total_tokens_used': totals[2],
             'conversations_24h': recent_24h
         }
     
-    def export_to_json(self, output_file: str = "conversations_export.json"):
-        """Export all conversations to JSON"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT user_id, username, chat_id, chat_type, platform, 
-                   timestamp, question, answer, model, tokens_used
-            FROM conversations
-            ORDER BY timestamp
-        ''')
-        
-        conversations = []
-        for row in cursor.fetchall():
-            conversations.append({
-                'user_id': row[0],
-                'username': row[1],
-                'chat_id': row[2],
-                'chat_type': row[3],
-                'platform': row[4],
-                'timestamp': row[5],
-                'question': row[6],
-                'answer': row[7],
-                'model': row[8],
-                'tokens_used': row[9]
-            })
+    def get_activity(self, period: str = 'day', start=None, end=None,
+                     platform: str = ROLLUP_ALL, model: str = ROLLUP_ALL) -> List[Dict]:
+        """Conversations, unique users and tokens per hour or day bucket
         
-        conn.close()
+        start/end (inclusive) are datetimes (UTC) or bucket strings such as
+        '2025-01-31' or '2025-01-31 14:00:00'. platform/model narrow the
+        breakdown; the default '*' sums over all of them.
+        """
+        fmt = ROLLUP_PERIODS.get(period)
+        if not fmt:
+            raise ValueError(f"period must be 'hour' or 'day', not {period!r}")
+        start = start.strftime(fmt) if isinstance(start, datetime) else start
+        end = end.strftime(fmt) if isinstance(end, datetime) else end
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(conversations, f, indent=2, ensure_ascii=False)
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT bucket, conversations, users, tokens
+                FROM analytics_rollups
+                WHERE period = ? AND platform = ? AND model = ?
+                  AND bucket >= COALESCE(?, '') AND bucket <= COALESCE(?, '9999')
+                ORDER BY bucket
+            ''', (period, platform, model or 'unknown', start, end))
+            
+            results = []
+            for row in cursor.fetchall():
+                results.append({
+                    'bucket': row[0],
+                    'conversations': row[1],
+                    'unique_users': row[2],
+                    'tokens': row[3]
+                })
+        return results
+    
+    def export_conversations(self, output_file: str, fmt: str = None, since=None, until=None,
+                             platform: str = None, compress: bool = None, chunk_size: int = 5000,
+                             progress=None) -> Dict:
+        """Stream conversations to JSONL (optionally .gz), JSON, fine-tuning JSONL or Parquet
         
-        return output_file
+        Memory use is bounded by chunk_size whatever the table size; see
+        conversation_export.py for formats and filters. Returns the path,
+        format, row count, size and duration.
+        """
+        with self.db.read() as conn:
+            return conversation_export.export_conversations(
+                conn, output_file, fmt, since, until, platform, compress, chunk_size, progress
+            )
+    
+    def export_to_json(self, output_file: str = "conversations_export.json"):
+        """Export all conversations to JSON"""
+        return self.export_conversations(output_file, fmt='json')['path']
     
     def export_for_finetuning(self, output_file: str = "finetuning_data.jsonl"):
         """Export in OpenAI fine-tuning format"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT question, answer
-            FROM conversations
-            ORDER BY timestamp
-        ''')
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for row in cursor.fetchall():
-                entry = {
-                    "messages": [
-                        {"role": "user", "content": row[0]},
-                        {"role": "assistant", "content": row[1]}
-                    ]
-                }
-                f.write(json.dumps(entry) + '\n')
-        
-        conn.close()
-        return output_file
+        return self.export_conversations(output_file, fmt='finetune')['path']
     
     def clear_user_data(self, user_id: str):
         """Delete all data for a user (GDPR compliance)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('DELETE FROM conversations WHERE user_id = ?', (user_id,))
-        cursor.execute('DELETE FROM users WHERE user_id = ?', (user_id,))
-        
-        conn.commit()
-        conn.close()
+        with self.db.write() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('SELECT question, platform FROM conversations WHERE user_id = ?', (user_id,))
+            self._uncount_questions(cursor, cursor.fetchall())
+            self._uncount_rollups(cursor, user_id)
+            cursor.execute('DELETE FROM conversations WHERE user_id = ?', (user_id,))
+            cursor.execute('DELETE FROM users WHERE user_id = ?', (user_id,))
 
 
 if __name__ == "__main__":
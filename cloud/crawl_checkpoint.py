@@ -0,0 +1,163 @@
+"""
+On-disk checkpoints so an interrupted crawl resumes instead of starting over.
+
+Each crawl keeps two files under `<output_dir>/checkpoints/`:
+
+  <name>.state.json  run parameters (base URL, options), seeds, timestamps
+  <name>.jsonl       append-only log, one line per event:
+                       {"kind": "document", "status": ..., "document": {...}}
+                       {"kind": "done", "url": ..., "links": [...]}
+
+The frontier is not stored separately: on resume it is rebuilt as the seeds
+plus every link logged by a finished page, minus the finished pages. Pages
+that finished without a document (fetch errors, empty pages) are queued
+again. A torn last line from a crash is ignored.
+
+The files are removed once the scraper has written its final output.
+Resuming is skipped when the parameters differ, when the checkpoint is older
+than SCRAPER_CHECKPOINT_MAX_AGE_HOURS (default 12), or with SCRAPER_RESUME=0.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from scraper_common import CrawlFrontier, ScrapedDocument, utc_now_iso
+
+
+def resume_enabled() -> bool:
+    return os.getenv("SCRAPER_RESUME", "1").lower() not in ("0", "false", "no")
+
+
+@dataclass
+class ResumedCrawl:
+    """Progress recovered from a checkpoint log."""
+
+    documents: List[ScrapedDocument] = field(default_factory=list)
+    statuses: Dict[str, str] = field(default_factory=dict)
+    done: Dict[str, List[str]] = field(default_factory=dict)
+
+    def frontier(self, seeds: Iterable[str]) -> CrawlFrontier:
+        """Seeds plus links of finished pages, skipping the finished pages."""
+        frontier = CrawlFrontier()
+        frontier.seen.update(self.done)
+        frontier.extend(seeds)
+        for links in self.done.values():
+            frontier.extend(links)
+        return frontier
+
+
+class CrawlCheckpoint:
+    """Append-only progress log plus state file for one scraper."""
+
+    def __init__(self, directory: Path, name: str, max_age_hours: Optional[float] = None):
+        self.directory = Path(directory)
+        self.state_path = self.directory / f"{name}.state.json"
+        self.log_path = self.directory / f"{name}.jsonl"
+        if max_age_hours is None:
+            max_age_hours = float(os.getenv("SCRAPER_CHECKPOINT_MAX_AGE_HOURS", "12"))
+        self.max_age_seconds = max_age_hours * 3600
+        self._lock = threading.Lock()
+        self._handle = None
+
+    def start(self, params: Dict[str, Any], seeds: Iterable[str]) -> Optional[ResumedCrawl]:
+        """Resume a matching unfinished run, or begin a fresh log.
+
+        Returns the recovered progress, or None when starting over.
+        """
+        resumed = self._load(params) if resume_enabled() else None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if resumed is None:
+            state = {
+                "params": params,
+                "seeds": sorted(seeds),
+                "started_at": utc_now_iso(),
+                "started_ts": time.time(),
+            }
+            tmp_path = self.state_path.with_suffix(".tmp")
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                json.dump(state, handle, indent=2)
+            os.replace(tmp_path, self.state_path)
+            self._handle = self.log_path.open("w", encoding="utf-8")
+        else:
+            self._handle = self.log_path.open("a", encoding="utf-8")
+        return resumed
+
+    def _load(self, params: Dict[str, Any]) -> Optional[ResumedCrawl]:
+        if not self.state_path.exists() or not self.log_path.exists():
+            return None
+        try:
+            with self.state_path.open("r", encoding="utf-8") as handle:
+                state = json.load(handle)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if state.get("params") != params:
+            print("[CHECKPOINT] Parameters changed; starting a fresh crawl", flush=True)
+            return None
+        if time.time() - state.get("started_ts", 0) > self.max_age_seconds:
+            print("[CHECKPOINT] Checkpoint too old; starting a fresh crawl", flush=True)
+            return None
+
+        documents: Dict[str, ScrapedDocument] = {}
+        statuses: Dict[str, str] = {}
+        done: Dict[str, List[str]] = {}
+        with self.log_path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if event.get("kind") == "document":
+                    document = ScrapedDocument.from_dict(event["document"])
+                    documents[document.url] = document
+                    statuses[document.url] = event.get("status", "changed")
+                elif event.get("kind") == "done":
+                    done[event["url"]] = list(event.get("links") or [])
+
+        resumed = ResumedCrawl()
+        for url, links in done.items():
+            if url in documents:
+                resumed.done[url] = links
+                resumed.documents.append(documents[url])
+                resumed.statuses[url] = statuses[url]
+        print(
+            f"[CHECKPOINT] Resuming crawl started {state.get('started_at')}: "
+            f"{len(resumed.done)} pages already done",
+            flush=True,
+        )
+        return resumed
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        if self._handle is None:
+            return
+        line = json.dumps(event, ensure_ascii=False)
+        with self._lock:
+            self._handle.write(line + "\n")
+            self._handle.flush()
+
+    def record_document(self, document: ScrapedDocument, status: str = "changed") -> None:
+        self._append({"kind": "document", "status": status, "document": document.to_dict()})
+
+    def record_done(self, url: str, links: Iterable[str]) -> None:
+        self._append({"kind": "done", "url": url, "links": sorted(links)})
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def clear(self) -> None:
+        """Drop the checkpoint after the final output has been written."""
+        self.close()
+        for path in (self.state_path, self.log_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
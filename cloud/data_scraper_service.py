@@ -4,7 +4,10 @@ Runs GitBook / Website / Blog scrapers in-process and keeps ChromaDB fresh.
 """
 
 import logging
+import multiprocessing
 import os
+import queue
+import sqlite3
 import sys
 import threading
 import time
@@ -14,8 +17,123 @@ from typing import Any, Dict, List, Optional
 # Make shared modules importable both locally and inside the container.
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
 
+from browser_manager import browser_manager_enabled, shared_browser, shutdown_shared_browser
+from fetch_strategy import BROWSER
+
 logger = logging.getLogger(__name__)
 
+FULL_SCRAPE_SOURCES = {"gitbook": "Docs", "website": "Website", "blog": "Blog"}
+
+# Sources whose scrapers may render pages in Chromium.
+BROWSER_SOURCES = ("website", "blog")
+
+# current_progress keys per source, plus the padding used while the total is unknown.
+PROGRESS_KEYS = {
+    "gitbook": ("gitbook_pages_scraped", "gitbook_pages_total", 10),
+    "website": ("website_pages_scraped", "website_pages_total", 10),
+    "blog": ("blog_posts_scraped", "blog_posts_total", 5),
+}
+
+
+def record_pool_metrics(documents) -> None:
+    """Append the website scrape's pool APY/TVL samples to the metrics history.
+
+    The database is uploaded to GCS after every run (when configured), so a
+    container that is replaced without a clean shutdown keeps its history.
+    """
+    from pool_metrics import PoolMetricsStore
+
+    try:
+        store = PoolMetricsStore()
+        try:
+            recorded = store.record_documents(documents)
+            compacted = store.compact()
+        finally:
+            store.close()
+    except sqlite3.Error as exc:
+        logger.warning("Could not record pool metrics: %s", exc)
+        return
+    logger.info("Recorded metrics for %s pools in %s", recorded, store.db_path)
+    if any(compacted.values()):
+        logger.info("Compacted pool metrics: %s", compacted)
+
+    try:
+        from gcs_storage import gcs_storage
+    except ImportError:
+        return
+    if gcs_storage.use_gcs:
+        gcs_storage.save_sqlite_db(str(store.db_path), "pool_metrics.db")
+
+
+def _scrape_source_process(source: str, progress_queue, endpoint_queue=None) -> None:
+    """Child process for a full scrape: run one scraper and save its output.
+
+    Messages on the queue are (source, kind, current, total, message) with
+    kind "progress", "browser" (asks the parent for the shared Chromium's
+    endpoint, answered on `endpoint_queue`), "done" (current = item count,
+    total = pages loaded in the browser) or "error".
+    """
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s [{source}] %(message)s")
+    if os.path.exists("/app"):
+        sys.path.insert(0, "/app")
+
+    def report(current: int, total: int, message: str) -> None:
+        progress_queue.put((source, "progress", current, total, message))
+
+    endpoint: List[str] = []
+
+    def request_endpoint() -> str:
+        # Asked only once a page needs the browser, so HTTP-only runs never start Chromium.
+        if not endpoint:
+            progress_queue.put((source, "browser", 0, 0, None))
+            endpoint.append(endpoint_queue.get())
+        return endpoint[0]
+
+    try:
+        if source == "gitbook":
+            from scrape_gitbook import GitBookScraper
+
+            scraper = GitBookScraper("https://docs.auto.finance/")
+            original_scrape_page = scraper.scrape_page
+            pages_scraped = [0]
+
+            def progress_wrapper(url):
+                result = original_scrape_page(url)
+                pages_scraped[0] += 1
+                report(pages_scraped[0], 0, f"Scraping page {pages_scraped[0]}...")
+                return result
+
+            scraper.scrape_page = progress_wrapper
+            scraper.scrape_all()
+            count = len(scraper.scraped_content)
+        elif source == "website":
+            from scrape_website import WebsiteScraper
+
+            scraper = WebsiteScraper("https://app.auto.finance/")
+            if endpoint_queue is not None and not scraper.remote_browser_endpoint:
+                scraper.browser_endpoint_provider = request_endpoint
+            scraper.scrape_all(progress_callback=report)
+            count = len(scraper.scraped_pages)
+        else:
+            from scrape_blog import BlogScraper
+
+            scraper = BlogScraper("https://blog.tokemak.xyz/")
+            if endpoint_queue is not None and not scraper.remote_browser_endpoint:
+                scraper.browser_endpoint_provider = request_endpoint
+            scraper.scrape_all(progress_callback=report)
+            count = len(scraper.blog_posts)
+
+        scraper.save_to_json()
+        if source == "website":
+            record_pool_metrics(scraper.scraped_pages)
+        scraper.save_to_markdown()
+    except Exception as exc:
+        logging.getLogger(__name__).error("Failed to scrape %s: %s", source, exc, exc_info=True)
+        progress_queue.put((source, "error", 0, 0, str(exc)))
+        return
+    browser_pages = scraper.fetch_counts[BROWSER] if source in BROWSER_SOURCES else 0
+    progress_queue.put((source, "done", count, browser_pages, None))
+
 
 class DataScraperService:
     """Background service that manages scheduled and manual scrapes."""
@@ -108,8 +226,30 @@ class DataScraperService:
         self.is_running = False
         if self.thread:
             self.thread.join(timeout=5)
+        shutdown_shared_browser()
         logger.info("Data scraper service stopped")
 
+    def _browser_endpoint(self, lease: bool = False) -> str:
+        """CDP endpoint of the warm shared Chromium, or "" to let scrapers launch their own.
+
+        The browser stays up between scheduled runs; the manager restarts it
+        after BROWSER_MAX_PAGES pages, on memory growth or a failed health check.
+        With `lease`, it is not recycled until the caller's matching
+        `shared_browser().release()`.
+        """
+        if not browser_manager_enabled():
+            return ""
+        try:
+            return shared_browser().lease() if lease else shared_browser().endpoint()
+        except Exception as exc:
+            logger.warning("Shared browser unavailable, scrapers will launch their own: %s", exc)
+            return ""
+
+    def _attach_shared_browser(self, scraper) -> None:
+        # Resolved lazily: runs that plain HTTP fully serves never start Chromium.
+        if not scraper.remote_browser_endpoint:
+            scraper.browser_endpoint_provider = self._browser_endpoint
+
     def _run_loop(self):
         """Periodic scheduler that runs lightweight scrapes."""
         while self.is_running:
@@ -216,16 +356,22 @@ class DataScraperService:
             self.is_scraping = False
 
     def _run_full_scrape(self) -> List[str]:
-        """Run GitBook, Website, Blog scrapers and rebuild the index."""
+        """Run GitBook, Website and Blog scrapers concurrently, indexing each as it finishes.
+
+        Each scraper runs in its own process (they may each drive Playwright),
+        so a crash or hang in one does not take down the others. Progress
+        arrives over a queue; this thread indexes a source as soon as its
+        process reports, while the remaining scrapers keep running. A scraper
+        still running after SCRAPER_SOURCE_TIMEOUT_MINUTES (default 120) is
+        terminated and reported as timed out.
+        """
         errors: List[str] = []
-        gitbook_count = 0
-        website_count = 0
-        blog_count = 0
+        counts = {source: 0 for source in FULL_SCRAPE_SOURCES}
 
         # Reset progress tracking
         self.current_progress = {
             "stage": "gitbook",
-            "current_step": "Initializing...",
+            "current_step": "Starting GitBook, website and blog scrapes...",
             "gitbook_pages_scraped": 0,
             "gitbook_pages_total": 0,
             "website_pages_scraped": 0,
@@ -236,134 +382,120 @@ class DataScraperService:
             "index_chunks_total": 0,
         }
 
-        try:
-            from scrape_gitbook import GitBookScraper
-
-            logger.info("[1/4] Scraping documentation...")
-            self.current_progress["stage"] = "gitbook"
-            self.current_progress["current_step"] = "Starting GitBook scrape..."
-            logger.info("GitBook progress: Starting scrape...")
-            
-            doc_scraper = GitBookScraper("https://docs.auto.finance/")
-            
-            # Track progress during scraping
-            original_scrape_page = doc_scraper.scrape_page
-            pages_scraped = [0]
-            
-            def progress_wrapper(url):
-                result = original_scrape_page(url)
-                pages_scraped[0] += 1
-                self.current_progress["gitbook_pages_scraped"] = pages_scraped[0]
-                self.current_progress["current_step"] = f"Scraping page {pages_scraped[0]}..."
-                if pages_scraped[0] % 5 == 0:  # Log every 5 pages
-                    logger.info(f"GitBook progress: {pages_scraped[0]} pages scraped...")
-                return result
-            
-            doc_scraper.scrape_page = progress_wrapper
-            doc_scraper.scrape_all()
-            gitbook_count = len(doc_scraper.scraped_content)
-            
-            self.current_progress["gitbook_pages_total"] = gitbook_count
-            self.current_progress["gitbook_pages_scraped"] = gitbook_count
-            self.current_progress["current_step"] = f"Completed GitBook scrape ({gitbook_count} pages)"
-            logger.info("[OK] Documentation scraped (%s pages)", gitbook_count)
-            
-            doc_scraper.save_to_json()
-            doc_scraper.save_to_markdown()
-        except Exception as exc:
-            errors.append(f"Docs: {exc}")
-            logger.error("Failed to scrape docs: %s", exc, exc_info=True)
-        else:
-            if gitbook_count == 0:
-                logger.warning("Documentation scrape returned zero pages")
-                errors.append("Docs: No pages scraped")
-
-        try:
-            from scrape_website import WebsiteScraper
+        # spawn: children must not inherit the API server's threads and event loop.
+        context = multiprocessing.get_context("spawn")
+        progress_queue = context.Queue()
+        endpoint_queues = {}
+        if browser_manager_enabled():
+            endpoint_queues = {source: context.Queue() for source in BROWSER_SOURCES}
+        browser_pages = {source: 0 for source in FULL_SCRAPE_SOURCES}
+        browser_users = set()
+        processes = {}
+        for source in FULL_SCRAPE_SOURCES:
+            process = context.Process(
+                target=_scrape_source_process,
+                args=(source, progress_queue, endpoint_queues.get(source)),
+                name=f"scrape-{source}",
+                daemon=True,
+            )
+            process.start()
+            processes[source] = process
+            logger.info("[%s] Scraper started (pid %s)", source, process.pid)
+
+        started = time.time()
+        source_timeout = float(os.getenv("SCRAPER_SOURCE_TIMEOUT_MINUTES", "120")) * 60
+        results: Dict[str, Optional[str]] = {}
+        builder = None
+
+        def index_progress(current: int, total: int, step: str) -> None:
+            self.current_progress["index_chunks_scraped"] = current
+            self.current_progress["index_chunks_total"] = total
+            self.current_progress["current_step"] = step
+
+        def finish(source: str, error: Optional[str]) -> None:
+            nonlocal builder
+            results[source] = error
+            if source in browser_users:
+                shared_browser().release(browser_pages[source])
+            process = processes[source]
+            process.join(timeout=30)
+            if process.is_alive():
+                logger.warning("[%s] Scraper did not exit; terminating pid %s", source, process.pid)
+                process.terminate()
+                process.join(timeout=10)
+                if process.is_alive():
+                    process.kill()
+                    process.join()
+            elapsed = time.time() - started
+            if error:
+                errors.append(f"{FULL_SCRAPE_SOURCES[source]}: {error}")
+                logger.error("[%s] Scrape failed after %.0fs: %s", source, elapsed, error)
+                return
+            logger.info("[OK] %s scraped (%s) in %.0fs", source, counts[source], elapsed)
+            if counts[source] == 0:
+                errors.append(f"{FULL_SCRAPE_SOURCES[source]}: Nothing scraped")
+                return
 
-            logger.info("[2/4] Scraping website...")
-            self.current_progress["stage"] = "website"
-            self.current_progress["current_step"] = "Starting website scrape..."
-            logger.info("Website progress: Starting scrape...")
-            
-            def website_progress_callback(current: int, total: int, message: str):
-                """Progress callback for website scraper."""
-                self.current_progress["website_pages_scraped"] = current
-                self.current_progress["website_pages_total"] = total if total > 0 else current + 10
-                self.current_progress["current_step"] = message
-                logger.info(f"Website progress: {message} ({current}/{total if total > 0 else '?'} pages)")
-            
-            web_scraper = WebsiteScraper("https://app.auto.finance/")
-            web_scraper.scrape_all(progress_callback=website_progress_callback)
-            website_count = len(web_scraper.scraped_pages)
-            
-            self.current_progress["website_pages_total"] = website_count
-            self.current_progress["website_pages_scraped"] = website_count
-            self.current_progress["current_step"] = f"Completed website scrape ({website_count} pages)"
-            logger.info("[OK] Website scraped (%s pages)", website_count)
-            logger.info(f"Website progress: Completed {website_count} pages")
-            
-            web_scraper.save_to_json()
-            web_scraper.save_to_markdown()
-        except Exception as exc:
-            errors.append(f"Website: {exc}")
-            logger.error("Failed to scrape website: %s", exc, exc_info=True)
-        else:
-            if website_count == 0:
-                logger.warning("Website scrape returned zero pages")
-                errors.append("Website: No pages scraped")
+            self.current_progress["stage"] = "indexing"
+            self.current_progress["current_step"] = f"Indexing {source} data..."
+            try:
+                if builder is None:
+                    from build_complete_index import CompleteIndexBuilder
 
-        try:
-            from scrape_blog import BlogScraper
+                    builder = CompleteIndexBuilder()
+                builder.update_source(source, progress_callback=index_progress)
+            except Exception as exc:
+                errors.append(f"Index ({source}): {exc}")
+                logger.error("Failed to index %s: %s", source, exc, exc_info=True)
 
-            logger.info("[3/4] Scraping blog...")
-            self.current_progress["stage"] = "blog"
-            self.current_progress["current_step"] = "Starting blog scrape..."
-            logger.info("Blog progress: Starting scrape...")
-            
-            def blog_progress_callback(current: int, total: int, message: str):
-                """Progress callback for blog scraper."""
-                self.current_progress["blog_posts_scraped"] = current
-                self.current_progress["blog_posts_total"] = total if total > 0 else current + 5
+        while len(results) < len(processes):
+            try:
+                item = progress_queue.get(timeout=1)
+            except queue.Empty:
+                item = None
+            for source, process in processes.items():
+                if source in results:
+                    continue
+                if process.exitcode not in (None, 0):
+                    # Died without reporting (segfault, OOM kill).
+                    finish(source, f"process exited with code {process.exitcode}")
+                elif process.exitcode is None and time.time() - started > source_timeout:
+                    process.terminate()
+                    finish(source, f"timed out after {source_timeout / 60:.0f} minutes")
+            if item is None:
+                continue
+
+            source, kind, current, total, message = item
+            if source in results:
+                continue
+            if kind == "progress":
+                scraped_key, total_key, padding = PROGRESS_KEYS[source]
+                self.current_progress["stage"] = source
+                self.current_progress[scraped_key] = current
+                self.current_progress[total_key] = total if total > 0 else current + padding
                 self.current_progress["current_step"] = message
-                logger.info(f"Blog progress: {message} ({current}/{total if total > 0 else '?'} posts)")
-            
-            blog_scraper = BlogScraper("https://blog.tokemak.xyz/")
-            blog_scraper.scrape_all(progress_callback=blog_progress_callback)
-            blog_count = len(blog_scraper.blog_posts)
-            
-            self.current_progress["blog_posts_total"] = blog_count
-            self.current_progress["blog_posts_scraped"] = blog_count
-            self.current_progress["current_step"] = f"Completed blog scrape ({blog_count} posts)"
-            logger.info("[OK] Blog scraped (%s posts)", blog_count)
-            logger.info(f"Blog progress: Completed {blog_count} posts")
-            
-            blog_scraper.save_to_json()
-            blog_scraper.save_to_markdown()
-        except Exception as exc:
-            errors.append(f"Blog: {exc}")
-            logger.error("Failed to scrape blog: %s", exc, exc_info=True)
-        else:
-            if blog_count == 0:
-                logger.warning("Blog scrape returned zero posts")
-                errors.append("Blog: No posts scraped")
+                logger.info("%s progress: %s (%s/%s)", source, message, current, total or "?")
+            elif kind == "browser":
+                # Leased until finish(): Chromium must not be recycled under the child.
+                endpoint = self._browser_endpoint(lease=True)
+                if endpoint:
+                    browser_users.add(source)
+                endpoint_queues[source].put(endpoint)
+            elif kind == "done":
+                counts[source] = current
+                browser_pages[source] = total
+                scraped_key, total_key, _ = PROGRESS_KEYS[source]
+                self.current_progress[scraped_key] = current
+                self.current_progress[total_key] = current
+                finish(source, None)
+            else:
+                finish(source, message)
 
-        # Rebuild index when all scrapers finish.
-        if not errors:
-            self.current_progress["stage"] = "indexing"
-            self.current_progress["current_step"] = "Building ChromaDB index..."
-            errors.extend(self._rebuild_index())
-            self.current_progress["current_step"] = "Index build complete"
-
-        self.chunk_counts.update(
-            {
-                "gitbook": gitbook_count,
-                "website": website_count,
-                "blog": blog_count,
-            }
-        )
+        self.chunk_counts.update(counts)
         self._refresh_counts_from_chroma()
-        
+        if builder is not None:
+            builder.verify_index()
+
         # Clear progress when done
         if not errors:
             self.current_progress["stage"] = None
@@ -413,7 +545,7 @@ class DataScraperService:
             logger.info("[GitBook] Rebuilding index with fresh GitBook data...")
             self.current_progress["stage"] = "indexing"
             self.current_progress["current_step"] = "Building index from GitBook data..."
-            index_errors = self._rebuild_index(force=True)
+            index_errors = self._rebuild_index()
             if index_errors:
                 errors.extend(index_errors)
                 logger.warning("Index rebuild had errors: %s", index_errors)
@@ -458,8 +590,10 @@ class DataScraperService:
                 logger.info(f"Blog progress: {message} ({current}/{total if total > 0 else '?'} posts)")
             
             blog_scraper = BlogScraper("https://blog.tokemak.xyz/")
+            self._attach_shared_browser(blog_scraper)
             blog_scraper.scrape_all(progress_callback=blog_progress_callback)
             blog_count = len(blog_scraper.blog_posts)
+            shared_browser().record_pages(blog_scraper.fetch_counts[BROWSER])
             
             self.current_progress["blog_posts_total"] = blog_count
             self.current_progress["blog_posts_scraped"] = blog_count
@@ -474,7 +608,7 @@ class DataScraperService:
             logger.info("[Blog] Rebuilding index with fresh blog data...")
             self.current_progress["stage"] = "indexing"
             self.current_progress["current_step"] = "Building index from blog data..."
-            index_errors = self._rebuild_index(force=True)
+            index_errors = self._rebuild_index()
             if index_errors:
                 errors.extend(index_errors)
                 logger.warning("Index rebuild had errors: %s", index_errors)
@@ -516,8 +650,11 @@ class DataScraperService:
             logger.info(f"Website progress: {message} ({current}/{total if total > 0 else '?'} pages)")
         
         scraper = WebsiteScraper("https://app.auto.finance/")
+        self._attach_shared_browser(scraper)
         scraper.scrape_all(progress_callback=website_progress_callback)
+        shared_browser().record_pages(scraper.fetch_counts[BROWSER])
         scraper.save_to_json()
+        record_pool_metrics(scraper.scraped_pages)
         scraper.save_to_markdown()
 
         self.chunk_counts["website"] = len(scraper.scraped_pages)
@@ -526,7 +663,7 @@ class DataScraperService:
         logger.info("Rebuilding index with fresh website data...")
         self.current_progress["stage"] = "indexing"
         self.current_progress["current_step"] = "Building index from website data..."
-        index_errors = self._rebuild_index(force=True)
+        index_errors = self._rebuild_index()
         if index_errors:
             logger.warning("Index rebuild had errors: %s", index_errors)
         
@@ -534,10 +671,13 @@ class DataScraperService:
         logger.info("[OK] Website scrape completed (%s pages) and index rebuilt", len(scraper.scraped_pages))
 
     def _rebuild_index(self, force: bool = False) -> List[str]:
-        """Rebuild the complete Chroma index from the scraped data.
-        
+        """Bring the complete Chroma index up to date with the scraped data.
+
+        Only URLs reported by the scrapers' change feeds are re-embedded; the
+        index is rebuilt from scratch when a feed cannot be replayed.
+
         Args:
-            force: If True, force rebuild even if hash matches (used after individual scrapes)
+            force: If True, rebuild everything even if the change feeds are usable
         """
         errors: List[str] = []
         try:
@@ -1080,14 +1080,21 @@ async function loadThreadMessages(threadId) {
     if (!threadId) return;
     
     try {
-        const response = await fetch(`${API_URL}/api/threads/${threadId}/messages`);
-        if (!response.ok) {
-            console.error('Failed to load thread messages');
-            return;
-        }
-        
-        const data = await response.json();
-        const messages = data.messages || [];
+        // Messages come in pages; follow next_cursor until the thread is complete
+        let messages = [];
+        let cursor = null;
+        do {
+            const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+            const response = await fetch(`${API_URL}/api/threads/${threadId}/messages${query}`);
+            if (!response.ok) {
+                console.error('Failed to load thread messages');
+                return;
+            }
+            
+            const data = await response.json();
+            messages = messages.concat(data.messages || []);
+            cursor = data.next_cursor;
+        } while (cursor);
         
         const container = document.getElementById('chat-messages');
         if (!container) return;
@@ -0,0 +1,296 @@
+"""
+Time-series store for live pool metrics (APY, TVL, daily returns, volume).
+
+Every website scrape appends one row per pool to a SQLite table keyed by
+(pool, resolution, ts), so questions like "how has plasmaUSD APY changed this
+week" can be answered after website_data.json has been overwritten.
+
+Rows start at full resolution. `compact()` rolls raw rows older than
+POOL_METRICS_RAW_DAYS (default 7) into hourly averages, hourly rows older
+than POOL_METRICS_HOURLY_DAYS (default 90) into daily averages, and drops
+rows older than POOL_METRICS_RETENTION_DAYS (default 730). A scrape writes a
+handful of rows in one transaction, so recording every 10 minutes is cheap.
+
+Usage:
+    python pool_metrics.py pools
+    python pool_metrics.py latest plasmaUSD
+    python pool_metrics.py delta plasmaUSD apy 7d
+    python pool_metrics.py range plasmaUSD 24h
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from discovery import parse_timestamp
+
+METRICS = ("apy", "tvl", "daily_returns", "volume")
+RAW = 0
+HOURLY = 3600
+DAILY = 86400
+
+# /app/data is the image's SQLite directory; the API restores and backs up the
+# file through GCS, so the history survives container restarts.
+DEFAULT_DB_PATH = "/app/data/pool_metrics.db" if os.path.exists("/app") else "data/pool_metrics.db"
+
+_SUFFIXES = {"K": 1e3, "M": 1e6, "B": 1e9}
+_DURATION = re.compile(r"^(\d+)([mhdw])$")
+_DURATION_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_metric(value: Any) -> Optional[float]:
+    """Turn '7.34%', '$12.5M' or '$1,234.56' into a float."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = re.search(r"(-?[\d,]*\.?\d+)\s*([KMB])?", value.replace("$", ""), re.IGNORECASE)
+    if not match:
+        return None
+    number = float(match.group(1).replace(",", ""))
+    suffix = (match.group(2) or "").upper()
+    return number * _SUFFIXES.get(suffix, 1)
+
+
+def parse_duration(text: str) -> int:
+    """'30m', '24h', '7d', '2w' -> seconds."""
+    match = _DURATION.match(text.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid duration: {text!r} (use e.g. 24h, 7d)")
+    return int(match.group(1)) * _DURATION_SECONDS[match.group(2)]
+
+
+def pool_key(url: str) -> str:
+    """/pools/autoETH -> autoETH; /stoke -> stoke."""
+    path = urlparse(url).path.rstrip("/")
+    match = re.search(r"/pools/([\w-]+)$", path)
+    if match:
+        return match.group(1)
+    return path.rsplit("/", 1)[-1] or "home"
+
+
+@dataclass
+class MetricPoint:
+    pool: str
+    ts: int
+    resolution: int
+    apy: Optional[float] = None
+    tvl: Optional[float] = None
+    daily_returns: Optional[float] = None
+    volume: Optional[float] = None
+
+    @property
+    def time(self) -> datetime:
+        return datetime.fromtimestamp(self.ts, tz=timezone.utc)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"pool": self.pool, "time": self.time.isoformat(), "resolution": self.resolution}
+        data.update({metric: getattr(self, metric) for metric in METRICS})
+        return data
+
+
+class PoolMetricsStore:
+    """SQLite-backed pool metric history."""
+
+    def __init__(self, db_path: Optional[str | Path] = None):
+        self.db_path = Path(db_path or os.getenv("POOL_METRICS_DB", DEFAULT_DB_PATH))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.init_database()
+
+    def init_database(self) -> None:
+        with self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pool_metrics (
+                    pool TEXT NOT NULL,
+                    ts INTEGER NOT NULL,
+                    resolution INTEGER NOT NULL DEFAULT 0,
+                    apy REAL,
+                    tvl REAL,
+                    daily_returns REAL,
+                    volume REAL,
+                    PRIMARY KEY (pool, resolution, ts)
+                ) WITHOUT ROWID
+                """
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_pool_metrics_pool_ts ON pool_metrics(pool, ts)"
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # ------------------------------------------------------------------#
+    # Writes
+    # ------------------------------------------------------------------#
+
+    def record(self, pool: str, values: Dict[str, Optional[float]], ts: Optional[int] = None) -> bool:
+        """Store one sample. Returns False when it carries no numeric metric."""
+        row = [values.get(metric) for metric in METRICS]
+        if all(value is None for value in row):
+            return False
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pool_metrics "
+                "(pool, ts, resolution, apy, tvl, daily_returns, volume) "
+                "VALUES (?, ?, 0, ?, ?, ?, ?)",
+                [pool, int(ts if ts is not None else time.time()), *row],
+            )
+        return True
+
+    def record_documents(self, documents: Iterable[Any]) -> int:
+        """Record pool_data from scraped website documents in one transaction."""
+        rows = []
+        for document in documents:
+            pool_data = (document.metadata or {}).get("pool_data")
+            if not pool_data:
+                continue
+            values = [parse_metric(pool_data.get(metric)) for metric in METRICS]
+            if all(value is None for value in values):
+                continue
+            scraped = parse_timestamp(document.scraped_at)
+            ts = int(scraped.timestamp()) if scraped else int(time.time())
+            rows.append((pool_key(document.url), ts, *values))
+        if rows:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO pool_metrics "
+                    "(pool, ts, resolution, apy, tvl, daily_returns, volume) "
+                    "VALUES (?, ?, 0, ?, ?, ?, ?)",
+                    rows,
+                )
+        return len(rows)
+
+    def _rollup(self, source: int, target: int, cutoff: int) -> int:
+        averages = ", ".join(f"AVG({metric})" for metric in METRICS)
+        with self.conn:
+            self.conn.execute(
+                f"""
+                INSERT OR REPLACE INTO pool_metrics
+                    (pool, ts, resolution, apy, tvl, daily_returns, volume)
+                SELECT pool, (ts / {target}) * {target}, {target}, {averages}
+                FROM pool_metrics
+                WHERE resolution = ? AND ts < ?
+                GROUP BY pool, ts / {target}
+                """,
+                (source, cutoff),
+            )
+            cursor = self.conn.execute(
+                "DELETE FROM pool_metrics WHERE resolution = ? AND ts < ?", (source, cutoff)
+            )
+        return cursor.rowcount
+
+    def compact(
+        self,
+        raw_days: Optional[float] = None,
+        hourly_days: Optional[float] = None,
+        retention_days: Optional[float] = None,
+        now: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """Downsample old rows and apply retention. Cheap when nothing is due."""
+        if raw_days is None:
+            raw_days = float(os.getenv("POOL_METRICS_RAW_DAYS", "7"))
+        if hourly_days is None:
+            hourly_days = float(os.getenv("POOL_METRICS_HOURLY_DAYS", "90"))
+        if retention_days is None:
+            retention_days = float(os.getenv("POOL_METRICS_RETENTION_DAYS", "730"))
+        now = int(now if now is not None else time.time())
+        raw_cutoff = (now - int(raw_days * DAILY)) // HOURLY * HOURLY
+        hourly_cutoff = (now - int(hourly_days * DAILY)) // DAILY * DAILY
+        stats = {
+            "raw_to_hourly": self._rollup(RAW, HOURLY, raw_cutoff),
+            "hourly_to_daily": self._rollup(HOURLY, DAILY, hourly_cutoff),
+        }
+        with self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM pool_metrics WHERE ts < ?", (now - int(retention_days * DAILY),)
+            )
+        stats["expired"] = cursor.rowcount
+        return stats
+
+    # ------------------------------------------------------------------#
+    # Queries
+    # ------------------------------------------------------------------#
+
+    def _points(self, sql: str, params: Iterable[Any]) -> List[MetricPoint]:
+        cursor = self.conn.execute(
+            "SELECT pool, ts, resolution, apy, tvl, daily_returns, volume "
+            f"FROM pool_metrics {sql}",
+            list(params),
+        )
+        return [MetricPoint(*row) for row in cursor.fetchall()]
+
+    def pools(self) -> List[str]:
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT pool FROM pool_metrics ORDER BY pool")]
+
+    def latest(self, pool: str) -> Optional[MetricPoint]:
+        points = self._points("WHERE pool = ? ORDER BY ts DESC LIMIT 1", [pool])
+        return points[0] if points else None
+
+    def range(self, pool: str, start: int, end: Optional[int] = None) -> List[MetricPoint]:
+        """Samples with start <= ts <= end (any resolution), oldest first."""
+        end = int(end if end is not None else time.time())
+        return self._points("WHERE pool = ? AND ts BETWEEN ? AND ? ORDER BY ts", [pool, start, end])
+
+    def delta(self, pool: str, metric: str, window_seconds: int) -> Optional[Dict[str, Any]]:
+        """Change of `metric` between the first sample in the window and the latest."""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}; expected one of {METRICS}")
+        start = int(time.time()) - window_seconds
+        points = [
+            point for point in self.range(pool, start) if getattr(point, metric) is not None
+        ]
+        if not points:
+            return None
+        first, last = points[0], points[-1]
+        before, after = getattr(first, metric), getattr(last, metric)
+        return {
+            "pool": pool,
+            "metric": metric,
+            "from_time": first.time.isoformat(),
+            "to_time": last.time.isoformat(),
+            "from": before,
+            "to": after,
+            "change": after - before,
+            "pct_change": (after - before) / before * 100 if before else None,
+        }
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    store = PoolMetricsStore()
+    try:
+        if args[:1] == ["pools"]:
+            for pool in store.pools():
+                print(pool)
+        elif args[:1] == ["latest"] and len(args) == 2:
+            point = store.latest(args[1])
+            print(point.to_dict() if point else f"No data for {args[1]}")
+        elif args[:1] == ["delta"] and len(args) == 4:
+            result = store.delta(args[1], args[2], parse_duration(args[3]))
+            print(result or f"No {args[2]} data for {args[1]} in the last {args[3]}")
+        elif args[:1] == ["range"] and len(args) == 3:
+            for point in store.range(args[1], int(time.time()) - parse_duration(args[2])):
+                print(point.to_dict())
+        elif args[:1] == ["compact"]:
+            print(store.compact())
+        else:
+            print(__doc__.split("Usage:", 1)[1].rstrip())
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,41 @@
 """
 Scrape blog.tokemak.xyz blog posts.
+
+The homepage and posts are fetched over plain HTTP first (see
+fetch_strategy.py); the browser is only connected for what fails the content
+check, so a run that HTTP can fully serve never starts Chromium.
 """
 
 from __future__ import annotations
 
+import re
 import time
+from collections import Counter
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import Callable, Dict, List, Optional, Set
 from urllib.parse import urljoin, urlparse
 
 import os
 import asyncio
 import logging
+import requests
+from bs4 import BeautifulSoup
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError, sync_playwright
 from playwright.async_api import Page as AsyncPage, Browser, BrowserContext  # For type hints
 from playwright._impl._errors import TargetClosedError  # For handling closed connections
 
+from crawl_checkpoint import CrawlCheckpoint
+from fetch_strategy import (
+    BROWSER,
+    HTTP,
+    FetchFailed,
+    FetchPathMemory,
+    http_first_enabled,
+    url_path,
+    url_pattern,
+    visible_text,
+)
+from http_client import create_session
 from scraper_common import (
     ScrapedDocument,
     save_documents_json,
@@ -24,6 +44,12 @@ from scraper_common import (
 
 logger = logging.getLogger(__name__)
 
+ARTICLE_SELECTORS = ["article", '[role="article"]', ".blog-post", ".post-content", "main"]
+DATE_SELECTORS = ["time", ".date", ".published", "[datetime]"]
+MIN_ARTICLE_CHARS = 200
+# Listing pages linked from the homepage alongside the posts
+NON_POST_PREFIXES = ("/tag/", "/category/", "/author/", "/page/")
+
 
 class BlogScraper:
     """Scrapes blog.tokemak.xyz."""
@@ -54,6 +80,46 @@ class BlogScraper:
         self.page_timeout = int(
             os.getenv("PLAYWRIGHT_OPERATION_TIMEOUT_MS", "90000")
         )  # default 90 seconds
+        self.session = create_session()
+        self.http_first = http_first_enabled()
+        self.fetch_paths = FetchPathMemory(self.output_dir / "fetch_paths.json")
+        self.fetch_counts: Counter = Counter()
+        self.http_escalate_after = int(os.getenv("BLOG_HTTP_ESCALATE_AFTER", "3"))
+        self.checkpoint = CrawlCheckpoint(self.output_dir / "checkpoints", "blog")
+        # Posts an interrupted run already fetched
+        self.resumed: Set[str] = set()
+        # Called for an endpoint only once a page needs the browser (set by the service).
+        self.browser_endpoint_provider: Optional[Callable[[], str]] = None
+
+    def _remote_endpoint(self) -> str:
+        """The CDP endpoint to connect to, asked for only when the browser is needed."""
+        if not self.remote_browser_endpoint and self.browser_endpoint_provider:
+            self.remote_browser_endpoint = self.browser_endpoint_provider()
+        return self.remote_browser_endpoint
+
+    def _start_crawl(self) -> None:
+        """Pick up the posts an interrupted run already fetched."""
+        resumed = self.checkpoint.start({"base_url": self.base_url}, [])
+        if resumed is None:
+            return
+        self.blog_posts.extend(resumed.documents)
+        self.resumed.update(document.url.rstrip("/") for document in resumed.documents)
+
+    def _keep_post(self, document: ScrapedDocument) -> None:
+        self.blog_posts.append(document)
+        self.checkpoint.record_document(document)
+        self.checkpoint.record_done(document.url, [])
+
+    def is_post_url(self, url: str) -> bool:
+        """Check whether a URL looks like a blog post rather than a listing."""
+        parsed = urlparse(url)
+        path = parsed.path.rstrip("/") + "/"
+        return (
+            url.startswith(self.base_url)
+            and path != "/"
+            and not path.startswith(NON_POST_PREFIXES)
+            and "/page/" not in path
+        )
 
     def extract_blog_post(self, page, url: str) -> Optional[ScrapedDocument]:
         """Extract blog post content."""
@@ -68,15 +134,7 @@ class BlogScraper:
             title = page.title()
             article_content = None
 
-            selectors = [
-                "article",
-                '[role=\"article\"]',
-                ".blog-post",
-                ".post-content",
-                "main",
-            ]
-
-            for selector in selectors:
+            for selector in ARTICLE_SELECTORS:
                 try:
                     element = page.locator(selector).first
                     if element.is_visible():
@@ -90,8 +148,7 @@ class BlogScraper:
 
             metadata = {}
 
-            date_selectors = ["time", ".date", ".published", "[datetime]"]
-            for selector in date_selectors:
+            for selector in DATE_SELECTORS:
                 try:
                     date_element = page.locator(selector).first
                     if date_element.is_visible():
@@ -134,15 +191,7 @@ class BlogScraper:
             title = await page.title()
             article_content = None
 
-            selectors = [
-                "article",
-                '[role=\"article\"]',
-                ".blog-post",
-                ".post-content",
-                "main",
-            ]
-
-            for selector in selectors:
+            for selector in ARTICLE_SELECTORS:
                 try:
                     element = page.locator(selector).first
                     if await element.is_visible():
@@ -156,8 +205,7 @@ class BlogScraper:
 
             metadata = {}
 
-            date_selectors = ["time", ".date", ".published", "[datetime]"]
-            for selector in date_selectors:
+            for selector in DATE_SELECTORS:
                 try:
                     date_element = page.locator(selector).first
                     if await date_element.is_visible():
@@ -204,15 +252,7 @@ class BlogScraper:
                         continue
 
                     absolute_url = urljoin(self.base_url, href)
-                    parsed = urlparse(absolute_url)
-
-                    if (
-                        absolute_url.startswith(self.base_url)
-                        and parsed.path
-                        and parsed.path != "/"
-                        and not parsed.path.startswith("/tag/")
-                        and not parsed.path.startswith("/category/")
-                    ):
+                    if self.is_post_url(absolute_url):
                         links.add(absolute_url.rstrip("/"))
                 except Exception:
                     continue
@@ -236,15 +276,7 @@ class BlogScraper:
                         continue
 
                     absolute_url = urljoin(self.base_url, href)
-                    parsed = urlparse(absolute_url)
-
-                    if (
-                        absolute_url.startswith(self.base_url)
-                        and parsed.path
-                        and parsed.path != "/"
-                        and not parsed.path.startswith("/tag/")
-                        and not parsed.path.startswith("/category/")
-                    ):
+                    if self.is_post_url(absolute_url):
                         links.add(absolute_url.rstrip("/"))
                 except Exception:
                     continue
@@ -260,6 +292,131 @@ class BlogScraper:
 
         return links
 
+    def parse_post_html(self, url: str, html: bytes) -> Optional[ScrapedDocument]:
+        """Extract a post from server-rendered HTML; None if the article is empty."""
+        soup = BeautifulSoup(html, "html.parser")
+        title = soup.title.get_text(strip=True) if soup.title else ""
+
+        metadata: Dict[str, str] = {}
+        for selector in DATE_SELECTORS:
+            date_element = soup.select_one(selector)
+            if date_element:
+                date_text = date_element.get_text(strip=True) or date_element.get("datetime")
+                if date_text:
+                    metadata["date"] = date_text
+                    break
+
+        article_content = ""
+        for selector in ARTICLE_SELECTORS:
+            element = soup.select_one(selector)
+            if element:
+                article_content = visible_text(element)
+                if article_content:
+                    break
+
+        if len(article_content) < MIN_ARTICLE_CHARS:
+            return None
+
+        read_time = re.search(r"\d+\s*min read", article_content, re.IGNORECASE)
+        if read_time:
+            metadata["read_time"] = read_time.group(0)
+
+        return ScrapedDocument(
+            title=title or url,
+            url=url,
+            content=article_content,
+            source="blog",
+            scraped_at=time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            metadata=metadata,
+        )
+
+    def fetch_post_http(self, url: str) -> Optional[ScrapedDocument]:
+        try:
+            response = self.session.get(url, timeout=30)
+        except requests.RequestException as exc:
+            print(f"  [HTTP] {url} failed: {exc}", flush=True)
+            raise FetchFailed(str(exc)) from exc
+        if response.status_code != 200:
+            print(f"  [HTTP] {url} returned {response.status_code}", flush=True)
+            raise FetchFailed(f"HTTP {response.status_code}")
+        return self.parse_post_html(url, response.content)
+
+    def find_blog_post_links_http(self) -> Set[str]:
+        """Post links from the server-rendered homepage, if it has any."""
+        if not self.http_first or not self.fetch_paths.should_try_http("/"):
+            return set()
+        try:
+            response = self.session.get(self.base_url, timeout=30)
+        except requests.RequestException:
+            return set()
+        if response.status_code != 200:
+            return set()
+        links: Set[str] = set()
+        soup = BeautifulSoup(response.content, "html.parser")
+        for anchor in soup.find_all("a", href=True):
+            absolute_url = urljoin(self.base_url, anchor["href"]).split("#")[0]
+            if self.is_post_url(absolute_url):
+                links.add(absolute_url.rstrip("/"))
+        self.fetch_paths.record("/", HTTP if links else BROWSER)
+        return links
+
+    def _scrape_over_http(self, urls: List[str], progress_callback=None) -> List[str]:
+        """Scrape what plain HTTP can serve; return the URLs that need the browser.
+
+        Posts restored from the checkpoint are left out of both.
+        """
+        urls = [url for url in urls if url.rstrip("/") not in self.resumed]
+        if not self.http_first:
+            return urls
+
+        remaining: List[str] = []
+        empty_in_a_row = 0
+        for index, url in enumerate(urls, 1):
+            pattern = url_pattern(url, keep_segments=0)
+            path = url_path(url)
+            if not (
+                self.fetch_paths.should_try_http(pattern)
+                and self.fetch_paths.should_try_http(path)
+            ):
+                remaining.append(url)
+                continue
+
+            try:
+                document = self.fetch_post_http(url)
+            except FetchFailed:
+                remaining.append(url)
+                continue
+            if document is None:
+                print(f"  [HTTP] Empty article at {url}; escalating it to browser", flush=True)
+                self.fetch_paths.record(path, BROWSER)
+                remaining.append(url)
+                empty_in_a_row += 1
+                if empty_in_a_row == self.http_escalate_after:
+                    print(
+                        f"  [HTTP] {empty_in_a_row} empty articles in a row; escalating {pattern}",
+                        flush=True,
+                    )
+                    self.fetch_paths.record(pattern, BROWSER)
+                continue
+
+            empty_in_a_row = 0
+            self.fetch_paths.forget(path)
+            self.fetch_paths.record(pattern, HTTP)
+            self.fetch_counts[HTTP] += 1
+            self._keep_post(document)
+            print(f"  [OK] Fetched over HTTP: {document.title[:60]}", flush=True)
+            if progress_callback:
+                progress_callback(index, len(urls), f"Fetched post {index}/{len(urls)} over HTTP")
+        return remaining
+
+    def _print_fetch_summary(self) -> None:
+        self.fetch_paths.save()
+        print(
+            f"Fetch paths: {self.fetch_counts[HTTP]} posts over HTTP, "
+            f"{self.fetch_counts[BROWSER]} in the browser",
+            flush=True,
+        )
+
     def scrape_all(self, progress_callback=None) -> None:
         """Scrape all blog posts.
         
@@ -267,13 +424,33 @@ class BlogScraper:
             progress_callback: Optional callback(current, total, message) for progress updates
         """
         print(f"Starting blog scrape: {self.base_url}", flush=True)
+        self._start_crawl()
+
+        # Plain HTTP first: posts from the server-rendered homepage. browser_urls
+        # stays None when the homepage itself has to be rendered.
+        browser_urls: Optional[List[str]] = None
+        homepage_links = self.find_blog_post_links_http()
+        if homepage_links:
+            print(f"Found {len(homepage_links)} blog post URLs over HTTP", flush=True)
+            if progress_callback:
+                progress_callback(0, len(homepage_links), f"Found {len(homepage_links)} blog posts to scrape")
+            browser_urls = self._scrape_over_http(sorted(homepage_links), progress_callback)
+            if not browser_urls:
+                self.checkpoint.close()
+                print(f"\n[OK] Completed over HTTP! Scraped {len(self.blog_posts)} blog posts", flush=True)
+                self._print_fetch_summary()
+                if progress_callback:
+                    progress_callback(len(self.blog_posts), len(self.blog_posts), f"Completed scraping {len(self.blog_posts)} blog posts")
+                return
+            print(f"{len(browser_urls)} posts need the browser", flush=True)
+
         if progress_callback:
             progress_callback(0, 0, "Initializing browser...")
         logger.info("Blog scraper: Initializing Playwright browser...")
 
         try:
             # Check if we should use remote browser
-            if self.remote_browser_endpoint:
+            if self._remote_endpoint():
                 logger.info(f"Blog scraper: Connecting to remote browser at {self.remote_browser_endpoint}")
                 print(f"  [DEBUG] Connecting to remote browser: {self.remote_browser_endpoint}", flush=True)
                 
@@ -398,34 +575,40 @@ class BlogScraper:
                             logger.info("Blog scraper: Browser, context, and page recreated successfully")
                             print("  [DEBUG] Browser, context, and page recreated successfully", flush=True)
                         
-                        # Scraping logic using async page operations
-                        print("\nVisiting blog homepage...", flush=True)
-                        if progress_callback:
-                            progress_callback(0, 0, "Loading blog homepage to discover posts...")
-                        logger.info("Blog scraper: Visiting homepage to discover posts...")
+                        if browser_urls is not None:
+                            post_links = set(browser_urls)
+                        else:
+                            # Scraping logic using async page operations
+                            print("\nVisiting blog homepage...", flush=True)
+                            if progress_callback:
+                                progress_callback(0, 0, "Loading blog homepage to discover posts...")
+                            logger.info("Blog scraper: Visiting homepage to discover posts...")
                         
-                        # Retry logic for homepage visit
-                        homepage_loaded = False
-                        for homepage_attempt in range(2):
-                            try:
-                                await page.goto(
-                                    self.base_url, wait_until="domcontentloaded", timeout=self.page_timeout
-                                )
-                                await asyncio.sleep(3)
-                                logger.info("Blog scraper: Homepage loaded")
-                                homepage_loaded = True
-                                break
-                            except TargetClosedError:
-                                if homepage_attempt < 1:
-                                    await reconnect_browser_and_page()
-                                    await asyncio.sleep(2)
-                                else:
-                                    raise
+                            # Retry logic for homepage visit
+                            homepage_loaded = False
+                            for homepage_attempt in range(2):
+                                try:
+                                    await page.goto(
+                                        self.base_url, wait_until="domcontentloaded", timeout=self.page_timeout
+                                    )
+                                    await asyncio.sleep(3)
+                                    logger.info("Blog scraper: Homepage loaded")
+                                    homepage_loaded = True
+                                    break
+                                except TargetClosedError:
+                                    if homepage_attempt < 1:
+                                        await reconnect_browser_and_page()
+                                        await asyncio.sleep(2)
+                                    else:
+                                        raise
                         
-                        if not homepage_loaded:
-                            raise RuntimeError("Failed to load homepage after retries")
+                            if not homepage_loaded:
+                                raise RuntimeError("Failed to load homepage after retries")
                         
-                        post_links = await self.find_blog_post_links_async(page)
+                            post_links = await self.find_blog_post_links_async(page)
+                            # Posts may still be served over HTTP even when the homepage is not.
+                            post_links = set(self._scrape_over_http(sorted(post_links), progress_callback))
+
                         total_posts = len(post_links)
                         print(f"Found {total_posts} blog post URLs", flush=True)
                         logger.info(f"Blog scraper: Found {total_posts} blog posts to scrape")
@@ -459,9 +642,10 @@ class BlogScraper:
                                     logger.info(f"Blog scraper: Post {index} loaded in {elapsed:.1f}s")
 
                                     document = await self.extract_blog_post_async(page, post_url)
+                                    self.fetch_counts[BROWSER] += 1
 
                                     if document:
-                                        self.blog_posts.append(document)
+                                        self._keep_post(document)
                                         print(f"  [OK] Extracted: {document.title[:60]}", flush=True)
                                         logger.info(f"Blog scraper: Successfully extracted post {index}: {document.title[:60]}")
 
@@ -499,6 +683,7 @@ class BlogScraper:
                 # Run the async scraping function
                 asyncio.run(connect_and_scrape())
                 print(f"\n[OK] Completed! Scraped {len(self.blog_posts)} blog posts", flush=True)
+                self._print_fetch_summary()
                 if progress_callback:
                     progress_callback(len(self.blog_posts), len(self.blog_posts), f"Completed scraping {len(self.blog_posts)} blog posts")
                 return  # Exit early since scraping is done
@@ -535,19 +720,25 @@ class BlogScraper:
                     logger.info("Blog scraper: Page created")
                     print("  [DEBUG] Page created successfully", flush=True)
 
-                    # Common scraping logic for local browser
-                    print("\nVisiting blog homepage...", flush=True)
-                    if progress_callback:
-                        progress_callback(0, 0, "Loading blog homepage to discover posts...")
-                    logger.info("Blog scraper: Visiting homepage to discover posts...")
+                    if browser_urls is not None:
+                        post_links = set(browser_urls)
+                    else:
+                        # Common scraping logic for local browser
+                        print("\nVisiting blog homepage...", flush=True)
+                        if progress_callback:
+                            progress_callback(0, 0, "Loading blog homepage to discover posts...")
+                        logger.info("Blog scraper: Visiting homepage to discover posts...")
                     
-                    page.goto(
-                        self.base_url, wait_until="domcontentloaded", timeout=self.page_timeout
-                    )
-                    time.sleep(3)
-                    logger.info("Blog scraper: Homepage loaded")
+                        page.goto(
+                            self.base_url, wait_until="domcontentloaded", timeout=self.page_timeout
+                        )
+                        time.sleep(3)
+                        logger.info("Blog scraper: Homepage loaded")
+
+                        post_links = self.find_blog_post_links(page)
+                        # Posts may still be served over HTTP even when the homepage is not.
+                        post_links = set(self._scrape_over_http(sorted(post_links), progress_callback))
 
-                    post_links = self.find_blog_post_links(page)
                     total_posts = len(post_links)
                     print(f"Found {total_posts} blog post URLs", flush=True)
                     logger.info(f"Blog scraper: Found {total_posts} blog posts to scrape")
@@ -576,9 +767,10 @@ class BlogScraper:
                             logger.info(f"Blog scraper: Post {index} loaded in {elapsed:.1f}s")
 
                             document = self.extract_blog_post(page, post_url)
+                            self.fetch_counts[BROWSER] += 1
 
                             if document:
-                                self.blog_posts.append(document)
+                                self._keep_post(document)
                                 print(f"  [OK] Extracted: {document.title[:60]}", flush=True)
                                 logger.info(f"Blog scraper: Successfully extracted post {index}: {document.title[:60]}")
 
@@ -597,6 +789,7 @@ class BlogScraper:
                     logger.info("Blog scraper: Browser closed")
 
                     print(f"\n[OK] Completed! Scraped {len(self.blog_posts)} blog posts", flush=True)
+                    self._print_fetch_summary()
                     if progress_callback:
                         progress_callback(total_posts, total_posts, f"Completed scraping {len(self.blog_posts)} blog posts")
         except Exception as exc:
@@ -605,12 +798,15 @@ class BlogScraper:
             if progress_callback:
                 progress_callback(0, 0, f"Error: {exc}")
             raise
+        finally:
+            self.checkpoint.close()
 
     def save_to_json(self, filename: str = "blog_posts.json") -> None:
         """Save blog posts to JSON."""
         output_path = self.output_dir / filename
         save_documents_json(self.blog_posts, output_path)
         print(f"Saved to {output_path}", flush=True)
+        self.checkpoint.clear()
 
     def save_to_markdown(self) -> None:
         """Save each post as markdown."""
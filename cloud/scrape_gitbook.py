@@ -8,7 +8,9 @@ from urllib.parse import urljoin, urlparse
 import requests
 from bs4 import BeautifulSoup
 
+from crawl_checkpoint import CrawlCheckpoint
 from scraper_common import (
+    CrawlFrontier,
     ScrapedDocument,
     save_documents_json,
     save_documents_markdown,
@@ -32,6 +34,7 @@ class GitBookScraper:
         self.output_dir.mkdir(exist_ok=True)
         self.visited_urls: set[str] = set()
         self.scraped_content: List[ScrapedDocument] = []
+        self.checkpoint = CrawlCheckpoint(self.output_dir / "checkpoints", "gitbook")
 
     def is_valid_url(self, url: str) -> bool:
         """Check if URL belongs to the same GitBook site."""
@@ -122,6 +125,16 @@ class GitBookScraper:
 
         return links
 
+    def _start_crawl(self) -> CrawlFrontier:
+        """Build the frontier, resuming from the checkpoint when one matches."""
+        seeds = [self.base_url]
+        resumed = self.checkpoint.start({"base_url": self.base_url}, seeds)
+        if resumed is None:
+            return CrawlFrontier(seeds)
+        self.scraped_content.extend(resumed.documents)
+        self.visited_urls.update(resumed.done)
+        return resumed.frontier(seeds)
+
     def scrape_page(self, url: str) -> List[str]:
         """Scrape a single page."""
         if url in self.visited_urls:
@@ -139,9 +152,11 @@ class GitBookScraper:
             document = self.extract_content(soup, url)
             if document:
                 self.scraped_content.append(document)
+                self.checkpoint.record_document(document)
                 print(f"  [OK] Extracted: {document.title[:50]}", flush=True)
 
             new_links = self.find_internal_links(soup, url)
+            self.checkpoint.record_done(url, new_links)
             time.sleep(1)
             return list(new_links)
         except Exception as exc:
@@ -152,13 +167,13 @@ class GitBookScraper:
         """Recursively scrape all pages starting from base_url."""
         print(f"Starting GitBook scrape: {self.base_url}", flush=True)
         logger.info(f"GitBook scraper: Starting scrape of {self.base_url}")
-        to_visit = [self.base_url]
+        to_visit = self._start_crawl()
         pages_scraped = 0
         errors = []
 
         try:
             while to_visit and (max_pages is None or pages_scraped < max_pages):
-                current_url = to_visit.pop(0)
+                current_url = to_visit.pop()
                 logger.info(f"GitBook scraper: Scraping page {pages_scraped + 1}: {current_url}")
                 
                 try:
@@ -188,12 +203,15 @@ class GitBookScraper:
             logger.error(f"GitBook scraper: Fatal error: {exc}", exc_info=True)
             print(f"\n[ERROR] GitBook scraper failed: {exc}", flush=True)
             raise
+        finally:
+            self.checkpoint.close()
 
     def save_to_json(self, filename: str = "gitbook_data.json") -> None:
         """Save scraped content to JSON file."""
         output_path = self.output_dir / filename
         save_documents_json(self.scraped_content, output_path)
         print(f"Saved to {output_path}", flush=True)
+        self.checkpoint.clear()
 
     def save_to_markdown(self) -> None:
         """Save each page as a separate markdown file."""
@@ -1,6 +1,10 @@
 """
 Scrape app.auto.finance with Playwright.
 Handles JavaScript-heavy React app.
+
+Pages are fetched over plain HTTP first (see fetch_strategy.py); the browser
+is only connected for pages that fail the content check, so a run that HTTP
+can fully serve never starts Chromium.
 """
 
 from __future__ import annotations
@@ -9,15 +13,29 @@ import os
 import re
 import time
 import asyncio
+from collections import Counter
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
 
+import requests
+from bs4 import BeautifulSoup
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError, sync_playwright
 from playwright.async_api import Page as AsyncPage, Browser, BrowserContext  # For type hints
 from playwright._impl._errors import TargetClosedError  # For handling closed connections
 import logging
 
+from fetch_strategy import (
+    BROWSER,
+    HTTP,
+    FetchFailed,
+    FetchPathMemory,
+    http_first_enabled,
+    url_pattern,
+    visible_text,
+)
+from http_client import create_session
+from crawl_checkpoint import CrawlCheckpoint
 from scraper_common import (
     ScrapedDocument,
     save_documents_json,
@@ -26,6 +44,8 @@ from scraper_common import (
 
 logger = logging.getLogger(__name__)
 
+MIN_HTTP_TEXT_CHARS = 200
+
 
 class WebsiteScraper:
     """Scrapes app.auto.finance with live data."""
@@ -58,11 +78,50 @@ class WebsiteScraper:
         self.visited_urls: Set[str] = set()
         self.scraped_pages: List[ScrapedDocument] = []
         self.skip_patterns = ["/portfolio"]
+        self.session = create_session()
+        self.http_first = http_first_enabled()
+        self.fetch_paths = FetchPathMemory(self.output_dir / "fetch_paths.json")
+        self.fetch_counts: Counter = Counter()
+        self.checkpoint = CrawlCheckpoint(self.output_dir / "checkpoints", "website")
+        # Called for an endpoint only once a page needs the browser (set by the service).
+        self.browser_endpoint_provider: Optional[Callable[[], str]] = None
+
+    def _start_crawl(self, start_urls: List[str]) -> List[str]:
+        """URLs to visit, resuming from the checkpoint when one matches."""
+        seeds = [url.rstrip("/") for url in start_urls]
+        resumed = self.checkpoint.start({"base_url": self.base_url}, seeds)
+        if resumed is None:
+            return seeds
+        self.scraped_pages.extend(resumed.documents)
+        self.visited_urls.update(resumed.done)
+        frontier = resumed.frontier(seeds)
+        return [frontier.pop() for _ in range(len(frontier))]
+
+    def _keep_document(self, document: ScrapedDocument) -> None:
+        self.scraped_pages.append(document)
+        self.checkpoint.record_document(document)
 
     def should_skip(self, url: str) -> bool:
         """Check if URL should be skipped."""
         return any(pattern in url for pattern in self.skip_patterns)
 
+    @staticmethod
+    def has_pool_data(url: str) -> bool:
+        """Pages that carry live APY/TVL metrics."""
+        return (
+            "/pools/" in url
+            or "/stoke/" in url
+            or url.endswith("/pools")
+            or url.endswith("/stoke")
+            or url.endswith("/tokelp")
+        )
+
+    def _remote_endpoint(self) -> str:
+        """The CDP endpoint to connect to, asked for only when the browser is needed."""
+        if not self.remote_browser_endpoint and self.browser_endpoint_provider:
+            self.remote_browser_endpoint = self.browser_endpoint_provider()
+        return self.remote_browser_endpoint
+
     async def extract_page_data_async(self, page: AsyncPage, url: str) -> Optional[ScrapedDocument]:
         """Extract page data (async version for use with async page)."""
         print(f"Extracting data from: {url}", flush=True)
@@ -78,13 +137,7 @@ class WebsiteScraper:
             content = await page.inner_text("body")
 
             pool_data = None
-            if (
-                "/pools/" in url
-                or "/stoke/" in url
-                or url.endswith("/pools")
-                or url.endswith("/stoke")
-                or url.endswith("/tokelp")
-            ):
+            if self.has_pool_data(url):
                 pool_data = await self.extract_pool_data_async(page)
 
             scraped_at = time.strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -117,13 +170,7 @@ class WebsiteScraper:
             content = page.inner_text("body")
 
             pool_data = None
-            if (
-                "/pools/" in url
-                or "/stoke/" in url
-                or url.endswith("/pools")
-                or url.endswith("/stoke")
-                or url.endswith("/tokelp")
-            ):
+            if self.has_pool_data(url):
                 pool_data = self.extract_pool_data(page)
 
             scraped_at = time.strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -145,77 +192,25 @@ class WebsiteScraper:
 
     async def extract_pool_data_async(self, page: AsyncPage) -> Dict[str, str]:
         """Extract pool data (async version)."""
-        pool_data: Dict[str, str] = {}
         try:
-            page_text = await page.inner_text("body")
-            current_url = page.url
-
-            if "/pools/" in current_url:
-                pool_name_match = re.search(r"/pools/([\w-]+)", current_url)
-                if pool_name_match:
-                    pool_name = pool_name_match.group(1)
-                    pool_section_start = page_text.find(pool_name)
-                    if pool_section_start > 0:
-                        pool_section = page_text[pool_section_start : pool_section_start + 3000]
-
-                        apy_match = re.search(r"APY\s+([\d.]+)%", pool_section)
-                        if apy_match:
-                            pool_data["apy"] = f"{apy_match.group(1)}%"
-
-                        tvl_match = re.search(r"TVL\s+\$([0-9.]+[MKB]?)", pool_section)
-                        if tvl_match:
-                            pool_data["tvl"] = f"${tvl_match.group(1)}"
-
-                        daily_match = re.search(
-                            r"DAILY RETURNS\s+\$([0-9,.]+[MK]?)",
-                            pool_section,
-                            re.IGNORECASE,
-                        )
-                        if daily_match:
-                            pool_data["daily_returns"] = f"${daily_match.group(1)}"
-
-                        volume_match = re.search(
-                            r"TOTAL AUTOMATED VOLUME\s+\$([0-9,.]+[MK]?)",
-                            pool_section,
-                            re.IGNORECASE,
-                        )
-                        if volume_match:
-                            pool_data["volume"] = f"${volume_match.group(1)}"
-
-                        tokens_section = re.search(
-                            r"Tokens\s+(.*?)\s+Protocols", pool_section, re.DOTALL
-                        )
-                        if tokens_section:
-                            tokens_text = tokens_section.group(1).strip()
-                            tokens = [
-                                token.strip()
-                                for token in tokens_text.split("\n")
-                                if token.strip() and "+" not in token
-                            ]
-                            if tokens:
-                                pool_data["tokens"] = tokens
-
-            if not pool_data:
-                summary_matches = re.findall(
-                    r"(?:APY|TVL|Daily Rewards?|Volume)\s+[:$]?\s*([0-9.,%$]+)",
-                    page_text,
-                )
-                if summary_matches:
-                    pool_data["summary_metrics"] = summary_matches
-
+            return self.parse_pool_data(await page.inner_text("body"), page.url)
         except Exception as exc:
             print(f"  Error extracting pool data: {exc}", flush=True)
+            return {}
 
-        return pool_data
-    
     def extract_pool_data(self, page) -> Dict[str, str]:
         """Extract structured data from pool/staking pages."""
+        try:
+            return self.parse_pool_data(page.inner_text("body"), page.url)
+        except Exception as exc:
+            print(f"  Error extracting pool data: {exc}", flush=True)
+            return {}
+
+    def parse_pool_data(self, page_text: str, current_url: str) -> Dict[str, str]:
+        """Pull pool metrics out of rendered page text."""
         pool_data: Dict[str, str] = {}
 
         try:
-            page_text = page.inner_text("body")
-            current_url = page.url
-
             if "/pools/" in current_url:
                 pool_name_match = re.search(r"/pools/([\w-]+)", current_url)
                 if pool_name_match:
@@ -380,6 +375,127 @@ class WebsiteScraper:
             print(f"  Error finding links: {exc}", flush=True)
         return links
 
+    def _filter_links(self, url: str, hrefs: List[Optional[str]]) -> Set[str]:
+        """Resolve raw hrefs and keep unvisited, in-scope app links."""
+        links: Set[str] = set()
+        for href in hrefs:
+            if not href:
+                continue
+            absolute_url = urljoin(url, href).split("#")[0]
+            parsed = urlparse(absolute_url)
+            if (
+                absolute_url.startswith(self.base_url)
+                and parsed.scheme in ("http", "https")
+                and absolute_url not in self.visited_urls
+                and not self.should_skip(absolute_url)
+            ):
+                links.add(absolute_url)
+        return links
+
+    def fetch_via_http(self, url: str) -> Optional[Tuple[ScrapedDocument, Set[str]]]:
+        """Fetch and parse `url` without a browser.
+
+        Raises FetchFailed on a network error or non-200 response, and
+        returns None when the server-rendered HTML fails the content check:
+        pool pages need metrics in their text, other pages need a
+        non-trivial amount of text.
+        """
+        try:
+            response = self.session.get(url, timeout=30)
+        except requests.RequestException as exc:
+            print(f"  [HTTP] {url} failed: {exc}", flush=True)
+            raise FetchFailed(str(exc)) from exc
+        if response.status_code != 200:
+            print(f"  [HTTP] {url} returned {response.status_code}", flush=True)
+            raise FetchFailed(f"HTTP {response.status_code}")
+        if "html" not in response.headers.get("content-type", ""):
+            return None
+
+        soup = BeautifulSoup(response.content, "html.parser")
+        hrefs = [anchor.get("href") for anchor in soup.find_all("a", href=True)]
+        title = soup.title.get_text(strip=True) if soup.title else ""
+        content = visible_text(soup.body or soup)
+
+        metadata: Dict[str, Any] = {}
+        if self.has_pool_data(url):
+            pool_data = self.parse_pool_data(content, url)
+            if not pool_data:
+                return None
+            metadata["pool_data"] = pool_data
+        elif len(content) < MIN_HTTP_TEXT_CHARS:
+            return None
+
+        document = ScrapedDocument(
+            title=title or url,
+            url=url,
+            content=content,
+            source="website",
+            scraped_at=time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            metadata=metadata,
+        )
+        return document, self._filter_links(url, hrefs)
+
+    def scrape_page_http(self, url: str) -> Optional[List[str]]:
+        """Try the HTTP fast path for `url`.
+
+        Returns new links on success, or None when the page should be
+        rendered in the browser instead.
+        """
+        if url in self.visited_urls:
+            return []
+        pattern = url_pattern(url)
+        if not self.http_first or not self.fetch_paths.should_try_http(pattern):
+            return None
+
+        try:
+            result = self.fetch_via_http(url)
+        except FetchFailed:
+            return None
+        if result is None:
+            print(f"  [HTTP] Content check failed for {url}; escalating to browser", flush=True)
+            self.fetch_paths.record(pattern, BROWSER)
+            return None
+
+        document, links = result
+        self.visited_urls.add(url)
+        self.fetch_paths.record(pattern, HTTP)
+        self.fetch_counts[HTTP] += 1
+        self._keep_document(document)
+        self.checkpoint.record_done(url, links)
+        print(f"\nFetched over HTTP: {url}", flush=True)
+        print(f"  [OK] Extracted: {document.title[:60]}", flush=True)
+        return sorted(links)
+
+    def _crawl_over_http(
+        self, to_visit: List[str], max_pages: int, progress_callback=None
+    ) -> List[str]:
+        """Crawl what plain HTTP can serve; return the URLs that need the browser."""
+        browser_urls: List[str] = []
+        while to_visit and len(self.visited_urls) + len(browser_urls) < max_pages:
+            url = to_visit.pop(0).rstrip("/")
+            if url in self.visited_urls or url in browser_urls:
+                continue
+            new_links = self.scrape_page_http(url)
+            if new_links is None:
+                browser_urls.append(url)
+                continue
+            to_visit.extend(link for link in new_links if link not in self.visited_urls)
+            if progress_callback:
+                progress_callback(
+                    len(self.visited_urls),
+                    len(self.visited_urls) + len(to_visit),
+                    f"Fetched page {len(self.visited_urls)} over HTTP: {url}",
+                )
+        return browser_urls + to_visit
+
+    def _print_fetch_summary(self) -> None:
+        self.fetch_paths.save()
+        print(
+            f"Fetch paths: {self.fetch_counts[HTTP]} pages over HTTP, "
+            f"{self.fetch_counts[BROWSER]} in the browser",
+            flush=True,
+        )
+
     def scrape_page(self, page, url: str) -> List[str]:
         """Visit a page, extract data, and return new links."""
         if url in self.visited_urls:
@@ -387,17 +503,19 @@ class WebsiteScraper:
 
         print(f"\nVisiting: {url}", flush=True)
         self.visited_urls.add(url)
+        self.fetch_counts[BROWSER] += 1
 
         try:
             page.goto(url, wait_until="domcontentloaded", timeout=self.page_timeout)
             document = self.extract_page_data(page, url)
             if document:
-                self.scraped_pages.append(document)
+                self._keep_document(document)
                 print(f"  [OK] Extracted: {document.title[:60]}", flush=True)
 
             new_links = self.find_links(page, url)
             if url.endswith("/pools"):
                 new_links.update(self.discover_pool_pages(page, url))
+            self.checkpoint.record_done(url, new_links)
 
             time.sleep(2.5)
             return list(new_links)
@@ -427,6 +545,21 @@ class WebsiteScraper:
 
         print(f"Starting scrape of {self.base_url}", flush=True)
         print(f"Start URLs: {start_urls}", flush=True)
+
+        # Plain HTTP first; only what fails its content check goes to the browser.
+        # Pages finished by an interrupted run are skipped (see crawl_checkpoint.py).
+        start_urls = self._start_crawl(start_urls)
+        if self.http_first:
+            start_urls = self._crawl_over_http(start_urls, max_pages, progress_callback)
+            if not start_urls:
+                self.checkpoint.close()
+                print(f"\n[OK] Completed over HTTP! Scraped {len(self.scraped_pages)} pages", flush=True)
+                self._print_fetch_summary()
+                if progress_callback:
+                    progress_callback(len(self.scraped_pages), len(self.scraped_pages), f"Completed scraping {len(self.scraped_pages)} pages")
+                return
+            print(f"{len(start_urls)} pages need the browser", flush=True)
+
         if progress_callback:
             progress_callback(0, 0, f"Initializing browser...")
         logger.info("Website scraper: Initializing Playwright browser...")
@@ -434,7 +567,7 @@ class WebsiteScraper:
 
         try:
             # Check if we should use remote browser
-            if self.remote_browser_endpoint:
+            if self._remote_endpoint():
                 logger.info(f"Website scraper: Connecting to remote browser at {self.remote_browser_endpoint}")
                 print(f"  [DEBUG] Connecting to remote browser: {self.remote_browser_endpoint}", flush=True)
                 
@@ -616,8 +749,8 @@ class WebsiteScraper:
                         
                         # Perform scraping using async page operations
                         to_visit = list(start_urls)
-                        visited_count = 0
-                        total_estimated = len(start_urls) + 20
+                        visited_count = len(self.visited_urls)
+                        total_estimated = visited_count + len(start_urls) + 20
 
                         if progress_callback:
                             progress_callback(0, total_estimated, f"Starting scrape with {len(start_urls)} initial URLs...")
@@ -628,6 +761,12 @@ class WebsiteScraper:
                             logger.info(f"Website scraper: Visiting page {visited_count + 1}: {current_url}")
                             if progress_callback:
                                 progress_callback(visited_count, total_estimated, f"Scraping page {visited_count + 1}: {current_url}")
+
+                            http_links = await asyncio.to_thread(self.scrape_page_http, current_url)
+                            if http_links is not None:
+                                to_visit.extend(link for link in http_links if link not in self.visited_urls)
+                                visited_count += 1
+                                continue
                             
                             # Retry logic for handling closed connections
                             max_page_retries = 2
@@ -641,9 +780,10 @@ class WebsiteScraper:
                                     # Extract page data
                                     if current_url not in self.visited_urls:
                                         self.visited_urls.add(current_url)
+                                        self.fetch_counts[BROWSER] += 1
                                         document = await self.extract_page_data_async(page, current_url)
                                         if document:
-                                            self.scraped_pages.append(document)
+                                            self._keep_document(document)
                                             print(f"  [OK] Extracted: {document.title[:60]}", flush=True)
                                     
                                     # Find links (using sync locator methods which work with async page)
@@ -651,6 +791,7 @@ class WebsiteScraper:
                                     if current_url.endswith("/pools"):
                                         pool_links = await self.discover_pool_pages_async(page, current_url)
                                         new_links.update(pool_links)
+                                    self.checkpoint.record_done(current_url, new_links)
                                     
                                     to_visit.extend(link for link in new_links if link not in self.visited_urls)
                                     page_scraped = True
@@ -704,6 +845,7 @@ class WebsiteScraper:
                 # Note: scrape_all() is sync, so we use asyncio.run() to execute the async function
                 asyncio.run(connect_and_scrape())
                 print(f"\n[OK] Completed! Scraped {len(self.scraped_pages)} pages", flush=True)
+                self._print_fetch_summary()
                 if progress_callback:
                     progress_callback(len(self.scraped_pages), len(self.scraped_pages), f"Completed scraping {len(self.scraped_pages)} pages")
                 return  # Exit early since scraping is done
@@ -753,8 +895,8 @@ class WebsiteScraper:
                     
                     # Common scraping logic for local browser
                     to_visit = list(start_urls)
-                    visited_count = 0
-                    total_estimated = len(start_urls) + 20  # Initial estimate
+                    visited_count = len(self.visited_urls)
+                    total_estimated = visited_count + len(start_urls) + 20  # Initial estimate
 
                     if progress_callback:
                         progress_callback(0, total_estimated, f"Starting scrape with {len(start_urls)} initial URLs...")
@@ -766,7 +908,9 @@ class WebsiteScraper:
                         if progress_callback:
                             progress_callback(visited_count, total_estimated, f"Scraping page {visited_count + 1}: {current_url}")
                         
-                        new_links = self.scrape_page(page, current_url)
+                        new_links = self.scrape_page_http(current_url)
+                        if new_links is None:
+                            new_links = self.scrape_page(page, current_url)
                         to_visit.extend(link for link in new_links if link not in self.visited_urls)
                         visited_count += 1
                         
@@ -786,6 +930,7 @@ class WebsiteScraper:
                     logger.info("Website scraper: Browser closed")
 
             print(f"\n[OK] Completed! Scraped {len(self.scraped_pages)} pages", flush=True)
+            self._print_fetch_summary()
             if progress_callback:
                 progress_callback(len(self.scraped_pages), len(self.scraped_pages), f"Completed scraping {len(self.scraped_pages)} pages")
         except TimeoutError as exc:
@@ -800,12 +945,15 @@ class WebsiteScraper:
             if progress_callback:
                 progress_callback(0, 0, f"Error: {exc}")
             raise
+        finally:
+            self.checkpoint.close()
 
     def save_to_json(self, filename: str = "website_data.json") -> None:
         """Save to JSON."""
         output_path = self.output_dir / filename
         save_documents_json(self.scraped_pages, output_path)
         print(f"Saved to {output_path}", flush=True)
+        self.checkpoint.clear()
 
     def save_to_markdown(self) -> None:
         """Save each page as markdown."""
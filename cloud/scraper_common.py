@@ -7,11 +7,13 @@ consume the data without per-source adapters.
 
 from __future__ import annotations
 
+import hashlib
 import json
+from collections import deque
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
 
 
 def utc_now_iso() -> str:
@@ -36,19 +38,99 @@ class ScrapedDocument:
         """Convert to a plain dictionary suitable for JSON serialization."""
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScrapedDocument":
+        """Rebuild a document from its JSON representation."""
+        return cls(
+            title=data.get("title") or "",
+            url=data.get("url") or "",
+            content=data.get("content") or "",
+            source=data.get("source") or "",
+            scraped_at=data.get("scraped_at") or utc_now_iso(),
+            metadata=dict(data.get("metadata") or {}),
+        )
+
+
+class CrawlFrontier:
+    """FIFO crawl queue that de-duplicates URLs at enqueue time."""
+
+    def __init__(self, seeds: Optional[Iterable[str]] = None):
+        self._queue: Deque[str] = deque()
+        self.seen: Set[str] = set()
+        if seeds:
+            self.extend(seeds)
+
+    def add(self, url: str) -> bool:
+        """Queue a URL unless it was queued before. Returns True if added."""
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        self._queue.append(url)
+        return True
+
+    def extend(self, urls: Iterable[str]) -> int:
+        """Queue several URLs and return how many were new."""
+        return sum(1 for url in urls if self.add(url))
+
+    def pop(self) -> str:
+        return self._queue.popleft()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __bool__(self) -> bool:
+        return bool(self._queue)
+
 
 def documents_to_dicts(documents: Iterable[ScrapedDocument]) -> List[Dict[str, Any]]:
     """Convert an iterable of ScrapedDocument instances into JSON-ready dicts."""
     return [doc.to_dict() for doc in documents]
 
 
+def document_hash(record: Dict[str, Any]) -> str:
+    """Hash of a document dict's title, URL, content and metadata (not scraped_at)."""
+    payload = json.dumps(
+        [record.get("title"), record.get("url"), record.get("content"), record.get("metadata")],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _hashes_by_url(records: Iterable[Any]) -> Dict[str, str]:
+    return {
+        record["url"]: document_hash(record)
+        for record in records
+        if isinstance(record, dict) and record.get("url")
+    }
+
+
 def save_documents_json(documents: Iterable[ScrapedDocument], output_path: Path) -> None:
-    """Persist documents to JSON using the shared schema."""
+    """Persist documents to JSON using the shared schema.
+
+    The per-URL hashes are compared with the file being replaced and the
+    added/modified/removed URLs are appended to the source's change feed.
+    """
+    from change_feed import ChangeFeed
+
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    previous: Dict[str, str] = {}
+    if output_path.exists():
+        try:
+            with output_path.open("r", encoding="utf-8") as handle:
+                previous = _hashes_by_url(json.load(handle))
+        except (OSError, json.JSONDecodeError):
+            previous = {}
+
     data = documents_to_dicts(documents)
     with output_path.open("w", encoding="utf-8") as handle:
         json.dump(data, handle, indent=2, ensure_ascii=False)
 
+    if data:
+        ChangeFeed(output_path.parent, data[0]["source"]).append(
+            previous, _hashes_by_url(data), data
+        )
+
 
 def save_documents_markdown(
     documents: Iterable[ScrapedDocument],
@@ -0,0 +1,286 @@
+"""
+Streaming conversation exports: JSON, JSONL (optionally gzip), fine-tuning
+JSONL and Parquet.
+
+Rows come from one query ordered by (ts, id) and are pulled with
+fetchmany(chunk_size), so memory stays bounded by the chunk size however
+large the conversations table is. Each chunk is written (or, for Parquet,
+appended as a row group) before the next is read. Exports are written to
+`<file>.tmp` and renamed when complete.
+
+Filters: since/until (datetime, epoch seconds or 'YYYY-MM-DD[ HH:MM:SS]'
+in UTC; until is exclusive) and platform. progress(written, total) is
+called after every chunk.
+
+pyarrow is optional; `PYARROW_AVAILABLE` is False when it is not installed
+and only the Parquet format is unavailable.
+
+Usage:
+    python conversation_export.py conversations.jsonl.gz [--since 2025-01-01] [--platform telegram]
+    python conversation_export.py conversations.parquet --db bot_conversations.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    PYARROW_AVAILABLE = False
+
+EXPORT_FORMATS = ("jsonl", "json", "finetune", "parquet")
+
+# Exported columns, in order; OPTIONAL_FIELDS only where the table has them
+EXPORT_FIELDS = [
+    "user_id", "username", "chat_id", "chat_type", "platform",
+    "timestamp", "question", "answer", "model", "tokens_used",
+]
+OPTIONAL_FIELDS = ["thread_id", "system_prompt"]
+INTEGER_FIELDS = {"tokens_used"}
+
+Progress = Callable[[int, int], None]
+
+
+def to_epoch(value: Any) -> Optional[int]:
+    """Epoch seconds from a datetime, number or UTC date/time string."""
+    if value is None or isinstance(value, (int, float)):
+        return None if value is None else int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def guess_format(output_file: str) -> str:
+    name = output_file.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith(".parquet"):
+        return "parquet"
+    if name.endswith(".json"):
+        return "json"
+    return "jsonl"
+
+
+def _filters(
+    since: Any, until: Any, platform: Optional[str]
+) -> Tuple[str, List[Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    if platform:
+        clauses.append("platform = ?")
+        params.append(platform)
+    if since is not None:
+        clauses.append("ts >= ?")
+        params.append(to_epoch(since))
+    if until is not None:
+        clauses.append("ts < ?")
+        params.append(to_epoch(until))
+    return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+
+def export_fields(conn) -> List[str]:
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(conversations)")}
+    return EXPORT_FIELDS + [field for field in OPTIONAL_FIELDS if field in columns]
+
+
+def count_conversations(conn, since: Any = None, until: Any = None, platform: Optional[str] = None) -> int:
+    where, params = _filters(since, until, platform)
+    return conn.execute(f"SELECT COUNT(*) FROM conversations {where}", params).fetchone()[0]
+
+
+def iter_conversation_chunks(
+    conn,
+    fields: List[str],
+    since: Any = None,
+    until: Any = None,
+    platform: Optional[str] = None,
+    chunk_size: int = 5000,
+) -> Iterator[List[tuple]]:
+    """Rows (in `fields` order) oldest first, at most chunk_size at a time."""
+    where, params = _filters(since, until, platform)
+    cursor = conn.execute(
+        f"SELECT {', '.join(fields)} FROM conversations {where} ORDER BY ts, id", params
+    )
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield rows
+
+
+class _TextWriter:
+    """JSON / JSONL / fine-tuning lines, plain or gzip."""
+
+    def __init__(self, path: str, fmt: str, fields: List[str], compress: bool):
+        self.fmt = fmt
+        self.fields = fields
+        self.handle = (
+            gzip.open(path, "wt", compresslevel=6, encoding="utf-8", newline="\n")
+            if compress
+            else open(path, "w", encoding="utf-8", newline="\n")
+        )
+        self.first = True
+        # One encoder for every row (json.dumps with options builds a new one per call)
+        self.encode = json.JSONEncoder(ensure_ascii=False).encode
+        if fmt == "json":
+            self.handle.write("[")
+
+    def write(self, rows: List[tuple]) -> None:
+        lines = []
+        for row in rows:
+            if self.fmt == "finetune":
+                record = dict(zip(self.fields, row))
+                lines.append(json.dumps({
+                    "messages": [
+                        {"role": "user", "content": record["question"]},
+                        {"role": "assistant", "content": record["answer"]},
+                    ]
+                }) + "\n")
+            elif self.fmt == "json":
+                # Same layout as json.dump(list, indent=2), one item at a time
+                item = json.dumps(dict(zip(self.fields, row)), indent=2, ensure_ascii=False)
+                lines.append(("\n  " if self.first else ",\n  ") + item.replace("\n", "\n  "))
+                self.first = False
+            else:
+                lines.append(self.encode(dict(zip(self.fields, row))) + "\n")
+        self.handle.write("".join(lines))
+
+    def close(self) -> None:
+        if self.fmt == "json":
+            self.handle.write("]" if self.first else "\n]")
+        self.handle.close()
+
+
+class _ParquetWriter:
+    """One Parquet row group per chunk (zstd)."""
+
+    def __init__(self, path: str, fields: List[str]):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        self.fields = fields
+        self.schema = pa.schema(
+            [(field, pa.int64() if field in INTEGER_FIELDS else pa.string()) for field in fields]
+        )
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def write(self, rows: List[tuple]) -> None:
+        columns = list(zip(*rows))
+        self.writer.write_table(
+            pa.Table.from_arrays(
+                [pa.array(column, type=self.schema.field(i).type) for i, column in enumerate(columns)],
+                schema=self.schema,
+            )
+        )
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def export_conversations(
+    conn,
+    output_file: str,
+    fmt: Optional[str] = None,
+    since: Any = None,
+    until: Any = None,
+    platform: Optional[str] = None,
+    compress: Optional[bool] = None,
+    chunk_size: int = 5000,
+    progress: Optional[Progress] = None,
+) -> Dict[str, Any]:
+    """Stream conversations from `conn` into output_file.
+
+    fmt defaults to the file extension (.parquet, .json, else JSONL);
+    compress defaults to True for .gz names (ignored for Parquet, which is
+    zstd-compressed internally).
+    """
+    fmt = fmt or guess_format(output_file)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; choose from {EXPORT_FORMATS}")
+    if compress is None:
+        compress = output_file.lower().endswith(".gz")
+
+    started = time.time()
+    fields = export_fields(conn)
+    total = count_conversations(conn, since, until, platform) if progress else 0
+    tmp_path = f"{output_file}.tmp"
+    writer = (
+        _ParquetWriter(tmp_path, fields)
+        if fmt == "parquet"
+        else _TextWriter(tmp_path, fmt, fields, compress)
+    )
+    written = 0
+    try:
+        for rows in iter_conversation_chunks(conn, fields, since, until, platform, chunk_size):
+            writer.write(rows)
+            written += len(rows)
+            if progress:
+                progress(written, total)
+        writer.close()
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        try:
+            writer.close()
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+
+    return {
+        "path": output_file,
+        "format": fmt,
+        "rows": written,
+        "bytes": os.path.getsize(output_file),
+        "seconds": round(time.time() - started, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("output", help=".jsonl[.gz], .json[.gz] or .parquet")
+    parser.add_argument("--db", default="bot_conversations.db")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default=None)
+    parser.add_argument("--since", default=None, help="UTC date/time, inclusive")
+    parser.add_argument("--until", default=None, help="UTC date/time, exclusive")
+    parser.add_argument("--platform", default=None)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    from conversation_storage import ConversationStorage
+
+    def report(written: int, total: int) -> None:
+        print(f"\r  {written:,}/{total:,} conversations", end="", flush=True)
+
+    storage = ConversationStorage(args.db)
+    try:
+        result = storage.export_conversations(
+            args.output,
+            fmt=args.format,
+            since=args.since,
+            until=args.until,
+            platform=args.platform,
+            chunk_size=args.chunk_size,
+            progress=report,
+        )
+    finally:
+        storage.close()
+    print(
+        f"\n[OK] {result['rows']:,} conversations -> {result['path']} "
+        f"({result['bytes'] / 1024 / 1024:.1f} MB, {result['seconds']}s)",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
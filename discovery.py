@@ -0,0 +1,203 @@
+"""
+Sitemap and RSS/Atom based URL discovery.
+
+Reading a site's sitemap or feed is a handful of small XML requests, versus a
+full page fetch (or browser render) per hop when discovering pages by
+following links. Scrapers use these helpers first and fall back to link
+crawling when a site publishes neither.
+"""
+
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterable, List, Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+FEED_PATHS = ("/rss/", "/feed", "/rss.xml", "/atom.xml", "/feed.xml", "/index.xml")
+MAX_SITEMAP_DEPTH = 3
+
+
+@dataclass
+class DiscoveredUrl:
+    """A URL found via sitemap or feed, with its last-modified time if known."""
+
+    url: str
+    lastmod: Optional[datetime] = None
+    title: Optional[str] = None
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse W3C/ISO-8601 or RFC-822 timestamps into aware UTC datetimes."""
+    if not value:
+        return None
+    value = value.strip()
+    parsed: Optional[datetime] = None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def to_aware(value: Optional[datetime]) -> Optional[datetime]:
+    """Treat naive datetimes (as stored in update_config.json) as local time."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.astimezone()
+    return value.astimezone(timezone.utc)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element: ET.Element, name: str) -> Optional[str]:
+    for child in element:
+        if _local_name(child.tag) == name:
+            return (child.text or "").strip() or None
+    return None
+
+
+def _fetch_xml(session: requests.Session, url: str, timeout: int) -> Optional[ET.Element]:
+    try:
+        response = session.get(url, timeout=timeout)
+        if response.status_code != 200 or not response.content:
+            return None
+        return ET.fromstring(response.content)
+    except (requests.RequestException, ET.ParseError):
+        return None
+
+
+def _robots_sitemaps(session: requests.Session, base_url: str, timeout: int) -> List[str]:
+    try:
+        response = session.get(urljoin(base_url + "/", "robots.txt"), timeout=timeout)
+    except requests.RequestException:
+        return []
+    if response.status_code != 200:
+        return []
+    sitemaps = []
+    for line in response.text.splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().lower() == "sitemap" and value.strip():
+            sitemaps.append(value.strip())
+    return sitemaps
+
+
+def fetch_sitemap_urls(
+    session: requests.Session, base_url: str, timeout: int = 30
+) -> List[DiscoveredUrl]:
+    """Collect page URLs from robots.txt sitemaps or /sitemap.xml.
+
+    Sitemap indexes are followed recursively. Returns an empty list when the
+    site has no readable sitemap.
+    """
+    base_url = base_url.rstrip("/")
+    pending = _robots_sitemaps(session, base_url, timeout) or [f"{base_url}/sitemap.xml"]
+    seen_sitemaps = set()
+    found: dict = {}
+
+    depth = 0
+    while pending and depth < MAX_SITEMAP_DEPTH:
+        next_round: List[str] = []
+        for sitemap_url in pending:
+            if sitemap_url in seen_sitemaps:
+                continue
+            seen_sitemaps.add(sitemap_url)
+            root = _fetch_xml(session, sitemap_url, timeout)
+            if root is None:
+                continue
+            kind = _local_name(root.tag)
+            for entry in root:
+                loc = _child_text(entry, "loc")
+                if not loc:
+                    continue
+                if kind == "sitemapindex":
+                    next_round.append(loc)
+                elif kind == "urlset":
+                    found[loc] = DiscoveredUrl(
+                        url=loc, lastmod=parse_timestamp(_child_text(entry, "lastmod"))
+                    )
+        pending = next_round
+        depth += 1
+
+    return list(found.values())
+
+
+def _parse_feed(root: ET.Element, base_url: str) -> List[DiscoveredUrl]:
+    entries: List[DiscoveredUrl] = []
+    if _local_name(root.tag) == "rss":
+        channel = next((child for child in root if _local_name(child.tag) == "channel"), root)
+        for item in channel:
+            if _local_name(item.tag) != "item":
+                continue
+            link = _child_text(item, "link")
+            if link:
+                entries.append(
+                    DiscoveredUrl(
+                        url=urljoin(base_url + "/", link),
+                        lastmod=parse_timestamp(_child_text(item, "pubDate")),
+                        title=_child_text(item, "title"),
+                    )
+                )
+    elif _local_name(root.tag) == "feed":
+        for entry in root:
+            if _local_name(entry.tag) != "entry":
+                continue
+            href = None
+            for child in entry:
+                if _local_name(child.tag) == "link" and child.get("rel", "alternate") == "alternate":
+                    href = child.get("href")
+                    break
+            if href:
+                entries.append(
+                    DiscoveredUrl(
+                        url=urljoin(base_url + "/", href),
+                        lastmod=parse_timestamp(
+                            _child_text(entry, "updated") or _child_text(entry, "published")
+                        ),
+                        title=_child_text(entry, "title"),
+                    )
+                )
+    return entries
+
+
+def fetch_feed_urls(
+    session: requests.Session,
+    base_url: str,
+    feed_paths: Iterable[str] = FEED_PATHS,
+    timeout: int = 30,
+) -> List[DiscoveredUrl]:
+    """Return post URLs from the first RSS or Atom feed found on the site."""
+    base_url = base_url.rstrip("/")
+    for path in feed_paths:
+        root = _fetch_xml(session, f"{base_url}{path}", timeout)
+        if root is None:
+            continue
+        entries = _parse_feed(root, base_url)
+        if entries:
+            return entries
+    return []
+
+
+def same_site(entries: Iterable[DiscoveredUrl], base_url: str) -> List[DiscoveredUrl]:
+    """Keep only entries on the same host as base_url."""
+    domain = urlparse(base_url).netloc
+    return [entry for entry in entries if urlparse(entry.url).netloc == domain]
+
+
+def modified_since(lastmod: Optional[datetime], since: Optional[datetime]) -> bool:
+    """True when a page may have changed after `since` (unknown counts as changed)."""
+    if since is None or lastmod is None:
+        return True
+    return to_aware(lastmod) > to_aware(since)
@@ -0,0 +1,121 @@
+"""
+HTTP-first page fetching with a remembered browser fallback.
+
+Launching Chromium dominates the cost of a quick update, yet blog posts and
+some app routes are served as usable HTML. Scrapers first try a plain pooled
+HTTP fetch and only escalate to Playwright when their content check fails
+(no metrics found, empty article). `FetchPathMemory` records per URL pattern
+which path worked last time, so routes known to need JavaScript go straight
+to the browser on the next run. Network errors and non-200 responses raise
+`FetchFailed` and leave the remembered path alone. Browser-only patterns are probed over HTTP
+again once their entry is older than SCRAPER_HTTP_RECHECK_HOURS (default 24).
+
+Set SCRAPER_HTTP_FIRST=0 to always use the browser.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+HTTP = "http"
+BROWSER = "browser"
+
+NON_CONTENT_TAGS = ("script", "style", "noscript", "template", "svg")
+
+
+class FetchFailed(Exception):
+    """An HTTP fetch that failed before its content could be checked."""
+
+
+def http_first_enabled() -> bool:
+    return os.getenv("SCRAPER_HTTP_FIRST", "1").lower() not in ("0", "false", "no")
+
+
+def url_pattern(url: str, keep_segments: int = 1) -> str:
+    """Group URLs by path shape: with keep_segments=1, /pools/autoETH -> /pools/*."""
+    segments = [segment for segment in urlparse(url).path.split("/") if segment]
+    if not segments:
+        return "/"
+    shaped = segments[:keep_segments] + ["*"] * (len(segments) - keep_segments)
+    return "/" + "/".join(shaped)
+
+
+def url_path(url: str) -> str:
+    """The exact path of `url`, for remembering the fetch path of one page."""
+    return urlparse(url).path.rstrip("/") or "/"
+
+
+def visible_text(element) -> str:
+    """Text of a BeautifulSoup element without scripts, styles and templates."""
+    for tag in element.find_all(NON_CONTENT_TAGS):
+        tag.decompose()
+    return element.get_text("\n", strip=True)
+
+
+def embedded_json_payloads(soup) -> List[Any]:
+    """JSON islands in server-rendered HTML (e.g. Next.js __NEXT_DATA__)."""
+    payloads: List[Any] = []
+    for script in soup.find_all("script", type="application/json"):
+        try:
+            payloads.append(json.loads(script.string or ""))
+        except ValueError:
+            continue
+    return payloads
+
+
+class FetchPathMemory:
+    """JSON-backed map of URL pattern -> the fetch path that worked last time."""
+
+    def __init__(self, path: Path, recheck_hours: Optional[float] = None):
+        self.path = Path(path)
+        if recheck_hours is None:
+            recheck_hours = float(os.getenv("SCRAPER_HTTP_RECHECK_HOURS", "24"))
+        self.recheck_seconds = recheck_hours * 3600
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with self.path.open("r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, json.JSONDecodeError) as exc:
+            print(f"[WARN] Ignoring unreadable fetch-path memory {self.path}: {exc}", flush=True)
+            return
+        if isinstance(data, dict):
+            self.entries = data
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(self.entries, handle, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def should_try_http(self, pattern: str) -> bool:
+        """True unless the pattern recently needed the browser."""
+        entry = self.entries.get(pattern)
+        if not entry or entry.get("path") != BROWSER:
+            return True
+        return time.time() - entry.get("updated_at", 0) >= self.recheck_seconds
+
+    def record(self, pattern: str, path: str) -> None:
+        previous = self.entries.get(pattern, {}).get("path")
+        if previous and previous != path:
+            print(f"  [PATH] {pattern}: {previous} -> {path}", flush=True)
+        self.entries[pattern] = {"path": path, "updated_at": int(time.time())}
+        self._dirty = True
+
+    def forget(self, pattern: str) -> None:
+        if self.entries.pop(pattern, None) is not None:
+            self._dirty = True
@@ -0,0 +1,147 @@
+"""
+Single-pass GitBook page extraction on lxml.
+
+`GitBookScraper.extract_content` (BeautifulSoup + html.parser) walks the tree
+once per noise tag list, once per nav class, then again for headings and
+links. Here the document is parsed by lxml's C parser and walked exactly
+once: noise subtrees inside the main container are skipped (not
+decomposed), and text, headings and links are collected on the way.
+
+lxml is optional; `LXML_AVAILABLE` is False when it is not installed and
+the scraper keeps using BeautifulSoup.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import lxml.html
+    from lxml import etree
+
+    LXML_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    LXML_AVAILABLE = False
+
+NOISE_TAGS = frozenset({"script", "style", "nav", "header", "footer", "aside"})
+NOISE_CLASSES = ("navigation", "sidebar", "nav-menu", "breadcrumb", "toc")
+HEADING_TAGS = frozenset({"h1", "h2", "h3", "h4", "h5"})
+
+MAIN_CONTENT_XPATHS = (
+    "//div[@data-testid='page-content']",
+    "//article",
+    "//main",
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' page-inner ')]",
+    "//div[@role='main']",
+)
+
+
+@dataclass
+class ExtractedPage:
+    """What the scraper needs from one GitBook page."""
+
+    title: str = ""
+    content: str = ""
+    description: Optional[str] = None
+    headings: List[Dict[str, str]] = field(default_factory=list)
+    hrefs: List[str] = field(default_factory=list)
+    used_fallback: bool = False
+
+
+def _is_noise(element) -> bool:
+    if element.tag in NOISE_TAGS:
+        return True
+    classes = element.get("class")
+    if classes:
+        lowered = classes.lower()
+        return any(name in lowered for name in NOISE_CLASSES)
+    return False
+
+
+def _find_main(root):
+    for xpath in MAIN_CONTENT_XPATHS:
+        found = root.xpath(xpath)
+        if found:
+            return found[0], False
+    body = root.find(".//body")
+    return (body if body is not None else root), True
+
+
+def extract_page(html: bytes) -> Optional[ExtractedPage]:
+    """Parse a GitBook page; None if the document is empty or unparsable."""
+    # Without a charset declaration lxml assumes Latin-1; BeautifulSoup sniffs
+    # UTF-8. Decode first so both paths agree.
+    try:
+        markup = html.decode("utf-8")
+    except UnicodeDecodeError:
+        markup = html
+    try:
+        root = lxml.html.fromstring(markup)
+    except (etree.ParserError, ValueError):
+        return None
+
+    page = ExtractedPage()
+    title = root.find(".//title")
+    if title is not None:
+        page.title = (title.text_content() or "").strip().split("|")[0].strip()
+    description = root.find(".//meta[@name='description']")
+    if description is not None and description.get("content"):
+        page.description = description.get("content")
+
+    main, page.used_fallback = _find_main(root)
+    texts: List[str] = []
+    heading_parts: List[Tuple[str, List[str]]] = []
+
+    def add_text(value: Optional[str], sink: List[str]) -> None:
+        if value:
+            stripped = value.strip()
+            if stripped:
+                sink.append(stripped)
+
+    # Iterative walk. Each frame: (element, inside main, inside noise, heading sink).
+    # "tail" frames emit the text that follows a closed element.
+    stack: List[tuple] = [("node", root, False, False, None)]
+    while stack:
+        kind, element, in_main, in_noise, heading = stack.pop()
+        if kind == "tail":
+            if in_main and not in_noise:
+                add_text(element.tail, texts)
+                if heading is not None:
+                    add_text(element.tail, heading)
+            continue
+
+        if not isinstance(element.tag, str):
+            # Comments and processing instructions: skip, but keep their tail.
+            stack.append(("tail", element, in_main, in_noise, heading))
+            continue
+
+        if element.tag == "a":
+            href = element.get("href")
+            if href:
+                page.hrefs.append(href)
+
+        entering_main = element is main
+        child_in_main = in_main or entering_main
+        child_in_noise = in_noise or (child_in_main and not entering_main and _is_noise(element))
+
+        child_heading = heading
+        if child_in_main and not child_in_noise and element.tag in HEADING_TAGS:
+            child_heading = []
+            heading_parts.append((element.tag, child_heading))
+
+        stack.append(("tail", element, in_main, in_noise, heading))
+        for child in reversed(element):
+            stack.append(("node", child, child_in_main, child_in_noise, child_heading))
+
+        if child_in_main and not child_in_noise:
+            add_text(element.text, texts)
+            if child_heading is not None:
+                add_text(element.text, child_heading)
+
+    for level, parts in heading_parts:
+        text = "".join(parts)
+        if text:
+            page.headings.append({"level": level, "text": text})
+    page.content = "\n".join(texts)
+    return page
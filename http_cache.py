@@ -0,0 +1,115 @@
+"""
+On-disk conditional-GET cache for the plain-HTTP scrapers.
+
+For every URL we remember the ETag / Last-Modified validators, a hash of the
+response body, the document extracted from it and the links it contained.
+Subsequent runs send If-None-Match / If-Modified-Since; a 304 (or an
+identical body) lets the scraper reuse the cached document without parsing.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from scraper_common import ScrapedDocument, utc_now_iso
+
+
+def body_hash(body: bytes) -> str:
+    """Stable content hash used to detect unchanged responses."""
+    return hashlib.sha256(body).hexdigest()
+
+
+class HttpCache:
+    """JSON-backed cache of validators and parsed documents keyed by URL."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with self.path.open("r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, json.JSONDecodeError) as exc:
+            print(f"[WARN] Ignoring unreadable HTTP cache {self.path}: {exc}", flush=True)
+            return
+        if isinstance(data, dict):
+            self.entries = data
+
+    def save(self) -> None:
+        """Write the cache atomically if anything changed."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(self.entries, handle, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Request headers that let the server answer 304 Not Modified."""
+        entry = self.entries.get(url)
+        if not entry:
+            return {}
+        headers: Dict[str, str] = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def is_unchanged(self, url: str, body: bytes) -> bool:
+        entry = self.entries.get(url)
+        return bool(entry) and entry.get("body_hash") == body_hash(body)
+
+    def document(self, url: str) -> Optional[ScrapedDocument]:
+        entry = self.entries.get(url)
+        if not entry or not entry.get("document"):
+            return None
+        return ScrapedDocument.from_dict(entry["document"])
+
+    def links(self, url: str) -> List[str]:
+        entry = self.entries.get(url) or {}
+        return list(entry.get("links") or [])
+
+    def store(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        body: bytes,
+        document: Optional[ScrapedDocument],
+        links: List[str],
+    ) -> None:
+        """Record a fresh 200 response together with what was extracted from it."""
+        lowered = {key.lower(): value for key, value in headers.items()}
+        self.entries[url] = {
+            "etag": lowered.get("etag"),
+            "last_modified": lowered.get("last-modified"),
+            "body_hash": body_hash(body),
+            "checked_at": utc_now_iso(),
+            "document": document.to_dict() if document else None,
+            "links": sorted(links),
+        }
+        self._dirty = True
+
+    def touch(self, url: str, headers: Optional[Dict[str, str]] = None) -> None:
+        """Mark a cached entry as revalidated, refreshing validators if sent."""
+        entry = self.entries.get(url)
+        if not entry:
+            return
+        lowered = {key.lower(): value for key, value in (headers or {}).items()}
+        if lowered.get("etag"):
+            entry["etag"] = lowered["etag"]
+        if lowered.get("last-modified"):
+            entry["last_modified"] = lowered["last-modified"]
+        entry["checked_at"] = utc_now_iso()
+        self._dirty = True
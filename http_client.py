@@ -0,0 +1,192 @@
+"""
+Pooled HTTP clients shared by the plain-HTTP scrapers.
+
+`create_session` returns a keep-alive `requests.Session` for synchronous
+crawls. `AsyncFetcher` wraps an aiohttp connection pool with bounded
+concurrency, per-host politeness limits and retries with backoff.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_USER_AGENT = "AutoFinanceBot/1.0 (+https://docs.auto.finance)"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def create_session(
+    pool_size: int = 10,
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+    user_agent: str = DEFAULT_USER_AGENT,
+) -> requests.Session:
+    """Build a keep-alive session with a connection pool and retry policy."""
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": user_agent})
+    return session
+
+
+@dataclass
+class FetchResult:
+    """Outcome of a single HTTP fetch."""
+
+    url: str
+    status: int
+    body: bytes = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+    attempts: int = 1
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 300
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+
+class _HostThrottle:
+    """Caps in-flight requests and spaces request starts for one host."""
+
+    def __init__(self, max_concurrent: int, min_interval: float):
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.min_interval = min_interval
+        self._lock = asyncio.Lock()
+        self._last_start = 0.0
+
+    async def __aenter__(self) -> "_HostThrottle":
+        await self.semaphore.acquire()
+        async with self._lock:
+            wait = self._last_start + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_start = time.monotonic()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.semaphore.release()
+
+
+class AsyncFetcher:
+    """Concurrent GET client backed by a single aiohttp connection pool.
+
+    Use as an async context manager so the pool is closed when the crawl ends.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        per_host_limit: int = 4,
+        per_host_delay: float = 0.1,
+        timeout: float = 60.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        self.concurrency = concurrency
+        self.per_host_limit = per_host_limit
+        self.per_host_delay = per_host_delay
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.user_agent = user_agent
+
+        self._session = None
+        self._throttles: Dict[str, _HostThrottle] = {}
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency, limit_per_host=self.per_host_limit
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": self.user_agent},
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _throttle_for(self, url: str) -> _HostThrottle:
+        host = urlparse(url).netloc
+        throttle = self._throttles.get(host)
+        if throttle is None:
+            throttle = _HostThrottle(self.per_host_limit, self.per_host_delay)
+            self._throttles[host] = throttle
+        return throttle
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff_base * (2 ** attempt) + random.uniform(0, self.backoff_base)
+
+    async def fetch(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> FetchResult:
+        """GET a URL, retrying transient failures with exponential backoff."""
+        import aiohttp
+
+        if self._session is None:
+            raise RuntimeError("AsyncFetcher must be used as an async context manager")
+
+        throttle = self._throttle_for(url)
+        start = time.monotonic()
+        last_error: Optional[str] = None
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with throttle:
+                    async with self._session.get(url, headers=headers) as response:
+                        body = await response.read()
+                        if response.status in RETRY_STATUSES and attempt < self.max_retries:
+                            last_error = f"HTTP {response.status}"
+                            retry_after = response.headers.get("Retry-After")
+                        else:
+                            return FetchResult(
+                                url=str(response.url),
+                                status=response.status,
+                                body=body,
+                                headers=dict(response.headers),
+                                elapsed=time.monotonic() - start,
+                                attempts=attempt + 1,
+                            )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                last_error = f"{type(exc).__name__}: {exc}"
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        return FetchResult(
+            url=url,
+            status=0,
+            elapsed=time.monotonic() - start,
+            attempts=self.max_retries + 1,
+            error=last_error,
+        )
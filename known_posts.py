@@ -0,0 +1,124 @@
+"""
+Persistent index of blog posts we have already scraped.
+
+Published posts almost never change, so the blog scraper only fetches URLs
+missing from this index, posts whose sitemap/feed lastmod moved forward, and
+a small rotating sample of old posts (least recently checked first) to catch
+silent edits. Each entry keeps the content hash, so a re-fetch tells us
+whether the post actually changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from discovery import parse_timestamp, to_aware
+from scraper_common import ScrapedDocument, utc_now_iso
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class KnownPostsIndex:
+    """JSON-backed map of post URL -> content hash, dates and last check time."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with self.path.open("r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, json.JSONDecodeError) as exc:
+            print(f"[WARN] Ignoring unreadable post index {self.path}: {exc}", flush=True)
+            return
+        if isinstance(data, dict):
+            self.entries = data
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(self.entries, handle, indent=2, sort_keys=True, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def seed(self, document: ScrapedDocument) -> None:
+        """Index a post from an older blog_posts.json without re-fetching it."""
+        if document.url in self.entries:
+            return
+        self.entries[document.url] = {
+            "content_hash": content_hash(document.content),
+            "published": document.metadata.get("date"),
+            "lastmod": None,
+            "first_seen": document.scraped_at,
+            "checked_at": None,
+        }
+        self._dirty = True
+
+    def is_modified(self, url: str, lastmod: Optional[datetime]) -> bool:
+        """True when the sitemap/feed reports a newer lastmod than we indexed.
+
+        Entries without a lastmod (seeded from blog_posts.json) adopt this one
+        as their baseline and count as unchanged.
+        """
+        entry = self.entries.get(url)
+        if entry is None or lastmod is None:
+            return False
+        indexed = parse_timestamp(entry.get("lastmod"))
+        if indexed is None:
+            entry["lastmod"] = to_aware(lastmod).isoformat()
+            self._dirty = True
+            return False
+        return to_aware(lastmod) > indexed
+
+    def forget(self, url: str) -> None:
+        """Drop a post the blog no longer lists."""
+        if self.entries.pop(url, None) is not None:
+            self._dirty = True
+
+    def rotation_sample(self, urls: Iterable[str], size: int) -> List[str]:
+        """The `size` URLs checked least recently (never-checked first)."""
+        ordered = sorted(urls, key=lambda url: self.entries.get(url, {}).get("checked_at") or "")
+        return ordered[: max(size, 0)]
+
+    def record(
+        self,
+        document: ScrapedDocument,
+        lastmod: Optional[datetime] = None,
+    ) -> bool:
+        """Store a freshly fetched post. Returns True if it is new or changed."""
+        digest = content_hash(document.content)
+        entry = self.entries.get(document.url)
+        changed = entry is None or entry.get("content_hash") != digest
+        now = utc_now_iso()
+        self.entries[document.url] = {
+            "content_hash": digest,
+            "published": document.metadata.get("date")
+            or (entry or {}).get("published")
+            or (to_aware(lastmod).isoformat() if lastmod else None),
+            "lastmod": to_aware(lastmod).isoformat() if lastmod else (entry or {}).get("lastmod"),
+            "first_seen": (entry or {}).get("first_seen") or now,
+            "checked_at": now,
+        }
+        self._dirty = True
+        return changed
@@ -0,0 +1,127 @@
+"""
+Per-page-type readiness rules for Playwright scrapes.
+
+Instead of waiting for `networkidle` (which pages with polling websockets
+never reach) and then sleeping, each page type declares what "rendered"
+means - a selector or a JS predicate - and we wait for exactly that with a
+short timeout. If a rule times out we log it and extract whatever is there.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Pattern, Sequence
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+
+@dataclass(frozen=True)
+class ReadinessRule:
+    """Wait condition for URLs matching `url_pattern`."""
+
+    name: str
+    url_pattern: Pattern[str]
+    selector: Optional[str] = None
+    function: Optional[str] = None
+    timeout_ms: int = 10000
+
+
+@dataclass
+class ReadinessResult:
+    rule: str
+    ready: bool
+    elapsed: float
+
+    def log_line(self) -> str:
+        state = "ready" if self.ready else "timed out"
+        return f"  [READY] rule={self.rule} {state} after {self.elapsed:.2f}s"
+
+
+def _rule(name: str, pattern: str, **kwargs) -> ReadinessRule:
+    return ReadinessRule(name=name, url_pattern=re.compile(pattern), **kwargs)
+
+
+_BODY_HAS_TEXT = "() => document.body && document.body.innerText.trim().length > 200"
+
+WEBSITE_RULES: List[ReadinessRule] = [
+    _rule(
+        "pool-detail",
+        r"/pools/[\w-]+/?$",
+        function=(
+            "() => /APY\\s+[\\d.]+%/.test(document.body.innerText)"
+            " && /TVL\\s+\\$[0-9.]/.test(document.body.innerText)"
+        ),
+    ),
+    _rule("pools-list", r"/pools/?$", selector="a[href*='/pools/']"),
+    _rule(
+        "staking",
+        r"/(stoke|tokelp)(/|$)",
+        function="() => /(APY|TVL)/.test(document.body.innerText)",
+    ),
+    _rule("app-shell", r".*", function=_BODY_HAS_TEXT, timeout_ms=8000),
+]
+
+BLOG_RULES: List[ReadinessRule] = [
+    _rule("blog-home", r"^https?://[^/]+/?$", selector="a[href]", timeout_ms=8000),
+    _rule(
+        "blog-article",
+        r".*",
+        selector="article, [role='article'], .post-content, .blog-post",
+        timeout_ms=8000,
+    ),
+]
+
+
+def match_rule(url: str, rules: Sequence[ReadinessRule]) -> Optional[ReadinessRule]:
+    for rule in rules:
+        if rule.url_pattern.search(url):
+            return rule
+    return None
+
+
+def wait_until_ready(page, url: str, rules: Sequence[ReadinessRule]) -> ReadinessResult:
+    """Block until the first rule matching `url` is satisfied (sync API)."""
+    rule = match_rule(url, rules)
+    start = time.monotonic()
+    if rule is None:
+        return ReadinessResult(rule="none", ready=True, elapsed=0.0)
+
+    ready = True
+    try:
+        if rule.selector:
+            page.wait_for_selector(rule.selector, timeout=rule.timeout_ms)
+        if rule.function:
+            page.wait_for_function(rule.function, timeout=rule.timeout_ms)
+    except PlaywrightTimeoutError:
+        ready = False
+
+    result = ReadinessResult(rule=rule.name, ready=ready, elapsed=time.monotonic() - start)
+    print(result.log_line(), flush=True)
+    return result
+
+
+async def wait_until_ready_async(
+    page, url: str, rules: Sequence[ReadinessRule]
+) -> ReadinessResult:
+    """Async-API counterpart of wait_until_ready."""
+    from playwright.async_api import TimeoutError as AsyncPlaywrightTimeoutError
+
+    rule = match_rule(url, rules)
+    start = time.monotonic()
+    if rule is None:
+        return ReadinessResult(rule="none", ready=True, elapsed=0.0)
+
+    ready = True
+    try:
+        if rule.selector:
+            await page.wait_for_selector(rule.selector, timeout=rule.timeout_ms)
+        if rule.function:
+            await page.wait_for_function(rule.function, timeout=rule.timeout_ms)
+    except AsyncPlaywrightTimeoutError:
+        ready = False
+
+    result = ReadinessResult(rule=rule.name, ready=ready, elapsed=time.monotonic() - start)
+    print(result.log_line(), flush=True)
+    return result
@@ -0,0 +1,230 @@
+"""
+Build pool metrics from the JSON the app fetches, instead of page text.
+
+The app.auto.finance React frontend loads pool data over XHR/fetch. A
+`JsonResponseRecorder` collects matching JSON responses during navigation
+and `pool_data_from_payloads` walks them for the object describing a given
+pool. The regex-over-page-text extraction remains the fallback.
+
+Which URLs count as pool APIs is configurable with WEBSITE_POOL_API_PATTERNS
+(comma-separated regexes), so the same code runs against a local fixture
+server replaying recorded responses.
+
+APY units: a key ending in "percent"/"pct" is a percentage; otherwise, when
+the page shows an APY, the JSON value is read in whichever unit (fraction or
+percent) matches it; otherwise WEBSITE_POOL_APY_UNIT ("fraction", the
+default, or "percent") applies. A value above 1 is never read as a fraction,
+since that would be an APY over 100%.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+
+DEFAULT_API_PATTERNS = (r"/api/", r"graphql", r"subgraph", r"autopool", r"/pools?\b")
+
+PERCENT_KEY_SUFFIXES = ("percent", "percentage", "pct")
+APY_KEYS = {"apy", "totalapy", "currentapy", "apr", "totalapr", "baseapy"}
+APY_KEYS |= {key + suffix for key in APY_KEYS for suffix in PERCENT_KEY_SUFFIXES}
+TVL_KEYS = {"tvl", "tvlusd", "totalvaluelocked", "totalvaluelockedusd", "navusd"}
+DAILY_KEYS = {"dailyreturns", "dailyreturnsusd", "dailyrewards", "dailyrewardsusd"}
+VOLUME_KEYS = {"volume", "volumeusd", "totalvolume", "totalautomatedvolume", "totalautomatedvolumeusd"}
+NAME_KEYS = {"symbol", "name", "slug", "id", "key"}
+TOKEN_LIST_KEYS = {"tokens", "underlyingtokens", "assets", "constituents"}
+APY_UNITS = ("fraction", "percent")
+
+
+def _norm(key: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", key.lower())
+
+
+def api_patterns_from_env() -> List[Pattern[str]]:
+    raw = os.getenv("WEBSITE_POOL_API_PATTERNS", "")
+    patterns = [item.strip() for item in raw.split(",") if item.strip()] or DEFAULT_API_PATTERNS
+    return [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+
+
+class JsonResponseRecorder:
+    """Collects XHR/fetch JSON responses whose URL matches the API patterns.
+
+    Responses are only queued in the event handler; bodies are read later
+    with `payloads()` / `payloads_async()`, outside Playwright's dispatcher.
+    """
+
+    def __init__(self, patterns: Optional[List[Pattern[str]]] = None):
+        self.patterns = patterns if patterns is not None else api_patterns_from_env()
+        self._responses: List[Any] = []
+
+    def reset(self) -> None:
+        self._responses = []
+
+    def matches(self, url: str, resource_type: str, content_type: str) -> bool:
+        if resource_type not in ("xhr", "fetch"):
+            return False
+        if "json" not in content_type:
+            return False
+        return any(pattern.search(url) for pattern in self.patterns)
+
+    def on_response(self, response) -> None:
+        content_type = response.headers.get("content-type", "")
+        if self.matches(response.url, response.request.resource_type, content_type):
+            self._responses.append(response)
+
+    def attach(self, page) -> None:
+        page.on("response", self.on_response)
+
+    def payloads(self) -> List[Any]:
+        """Parsed JSON bodies (sync API)."""
+        bodies = []
+        for response in self._responses:
+            try:
+                bodies.append(response.json())
+            except Exception:
+                continue
+        return bodies
+
+    async def payloads_async(self) -> List[Any]:
+        """Parsed JSON bodies (async API)."""
+        bodies = []
+        for response in self._responses:
+            try:
+                bodies.append(await response.json())
+            except Exception:
+                continue
+        return bodies
+
+
+def _walk_dicts(node: Any) -> Iterable[Dict[str, Any]]:
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            yield current
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+
+
+def _to_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        cleaned = value.replace(",", "").replace("$", "").replace("%", "").strip()
+        try:
+            return float(cleaned)
+        except ValueError:
+            return None
+    if isinstance(value, dict):
+        for key in ("value", "usd", "total", "formatted"):
+            if key in value:
+                return _to_number(value[key])
+    return None
+
+
+def _compact_usd(value: float) -> str:
+    for threshold, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if abs(value) >= threshold:
+            return f"${value / threshold:.2f}".rstrip("0").rstrip(".") + suffix
+    return f"${value:,.2f}"
+
+
+def apy_unit_from_env() -> str:
+    unit = os.getenv("WEBSITE_POOL_APY_UNIT", "fraction").strip().lower()
+    return unit if unit in APY_UNITS else "fraction"
+
+
+def _apy_percent(key: str, value: float, shown_apy: Optional[float], default_unit: str) -> float:
+    """APY as a percentage: unit from the key, else the page's APY, else the default."""
+    if key.endswith(PERCENT_KEY_SUFFIXES):
+        return value
+    if shown_apy is not None:
+        return min((value * 100, value), key=lambda percent: abs(percent - shown_apy))
+    return value * 100 if default_unit == "fraction" and abs(value) <= 1 else value
+
+
+def _format_percent(value: float) -> str:
+    return f"{value:.2f}%"
+
+
+def _find_item(candidate: Dict[str, Any], keys: set) -> Optional[Tuple[str, float]]:
+    """(normalized key, number) for the first key in `keys` with a numeric value."""
+    for key, value in candidate.items():
+        normalized = _norm(key)
+        if normalized in keys:
+            number = _to_number(value)
+            if number is not None:
+                return normalized, number
+    return None
+
+
+def _find_field(candidate: Dict[str, Any], keys: set) -> Optional[float]:
+    item = _find_item(candidate, keys)
+    return None if item is None else item[1]
+
+
+def _token_symbols(candidate: Dict[str, Any]) -> List[str]:
+    for key, value in candidate.items():
+        if _norm(key) in TOKEN_LIST_KEYS and isinstance(value, list):
+            symbols = []
+            for token in value:
+                if isinstance(token, str):
+                    symbols.append(token)
+                elif isinstance(token, dict):
+                    symbol = token.get("symbol") or token.get("name")
+                    if symbol:
+                        symbols.append(str(symbol))
+            if symbols:
+                return symbols
+    return []
+
+
+def _names_pool(candidate: Dict[str, Any], pool_name: str) -> bool:
+    target = _norm(pool_name)
+    for key, value in candidate.items():
+        if _norm(key) in NAME_KEYS and isinstance(value, str) and _norm(value) == target:
+            return True
+    return False
+
+
+def pool_data_from_payloads(
+    payloads: Iterable[Any],
+    pool_name: str,
+    shown_apy: Optional[float] = None,
+    apy_unit: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Extract apy/tvl/daily_returns/volume/tokens for `pool_name`.
+
+    `shown_apy` is the APY percentage the page text displays, if any; it
+    settles the unit of APY values whose key does not. Returns the same
+    shape as the text-based extractor, or {} when no JSON object naming the
+    pool carries any metric.
+    """
+    apy_unit = apy_unit or apy_unit_from_env()
+    best: Dict[str, Any] = {}
+    for payload in payloads:
+        for candidate in _walk_dicts(payload):
+            if not _names_pool(candidate, pool_name):
+                continue
+            pool_data: Dict[str, Any] = {}
+            apy = _find_item(candidate, APY_KEYS)
+            if apy is not None:
+                pool_data["apy"] = _format_percent(_apy_percent(*apy, shown_apy, apy_unit))
+            tvl = _find_field(candidate, TVL_KEYS)
+            if tvl is not None:
+                pool_data["tvl"] = _compact_usd(tvl)
+            daily = _find_field(candidate, DAILY_KEYS)
+            if daily is not None:
+                pool_data["daily_returns"] = _compact_usd(daily)
+            volume = _find_field(candidate, VOLUME_KEYS)
+            if volume is not None:
+                pool_data["volume"] = _compact_usd(volume)
+            tokens = _token_symbols(candidate)
+            if tokens:
+                pool_data["tokens"] = tokens
+            if len(pool_data) > len(best):
+                best = pool_data
+    return best
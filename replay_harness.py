@@ -0,0 +1,499 @@
+"""
+Offline record/replay of scraper traffic.
+
+Recording runs a real scraper and keeps every response it sees, one
+fixtures directory per scraper:
+
+  <fixtures>/docs/http.har        requests made over plain HTTP (requests.Session)
+  <fixtures>/docs/browser.har     Playwright traffic, content embedded
+  <fixtures>/docs/pages/*.html    HTML documents, with urls.json (file -> URL)
+  <fixtures>/docs/xhr/*.json      JSON responses (pool APIs and other XHR/fetch)
+
+pages/ uses the same layout as benchmark_gitbook_parser.py, so recorded docs
+pages can be fed straight to the parser benchmark.
+
+Replay serves the recorded responses without touching the network:
+
+  server  a local HTTP server answers every request; the scraper's
+          requests.Session is pointed at it through a transport adapter and
+          browser requests are fulfilled from it by a context route
+  har     HTTP requests are answered from the HAR files in-process and the
+          browser replays browser.har with Playwright's route_from_har
+
+Both modes add optional per-request latency. URLs that were never recorded
+get a 404 (HTTP) or are aborted (browser) and are counted as misses. Browser
+route handlers run one at a time in the sync API, so compare replay runs
+with each other rather than with live timings.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_FIXTURES_DIR = Path("scraped_data/fixtures")
+REPLAY_URL_HEADER = "X-Replay-Url"
+REPLAY_MISS_HEADER = "X-Replay-Miss"
+REPLAY_MODES = ("server", "har")
+
+# Bodies are stored decoded, so these no longer describe them.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+_TEXT_TYPES = ("text/", "json", "xml", "javascript")
+
+
+def fixture_name(url: str) -> str:
+    """Filesystem-safe, collision-free name for a URL."""
+    name = re.sub(r"[^A-Za-z0-9_-]+", "_", url.split("://", 1)[-1]).strip("_")[:90]
+    return f"{name}_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _strip_fragment(url: str) -> str:
+    return url.split("#", 1)[0]
+
+
+# ----------------------------------------------------------------------#
+# HAR entries
+# ----------------------------------------------------------------------#
+
+
+@dataclass
+class RecordedResponse:
+    url: str
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    @property
+    def content_type(self) -> str:
+        for name, value in self.headers.items():
+            if name.lower() == "content-type":
+                return value
+        return ""
+
+    @classmethod
+    def from_har_entry(cls, entry: Dict[str, Any]) -> "RecordedResponse":
+        response = entry["response"]
+        content = response.get("content", {})
+        text = content.get("text") or ""
+        if content.get("encoding") == "base64":
+            body = base64.b64decode(text)
+        else:
+            body = text.encode("utf-8")
+        headers = {
+            header["name"]: header["value"]
+            for header in response.get("headers", [])
+            if header["name"].lower() not in _DROPPED_HEADERS and not header["name"].startswith(":")
+        }
+        if content.get("mimeType") and not any(name.lower() == "content-type" for name in headers):
+            headers["Content-Type"] = content["mimeType"]
+        return cls(url=entry["request"]["url"], status=response["status"], headers=headers, body=body)
+
+
+def har_entry(
+    method: str,
+    url: str,
+    status: int,
+    reason: str,
+    headers: Dict[str, str],
+    body: bytes,
+    elapsed: float = 0.0,
+) -> Dict[str, Any]:
+    """A HAR 1.2 entry for one response (body stored decoded)."""
+    headers = {name: value for name, value in headers.items() if name.lower() not in _DROPPED_HEADERS}
+    mime_type = next((v for k, v in headers.items() if k.lower() == "content-type"), "")
+    content: Dict[str, Any] = {"size": len(body), "mimeType": mime_type}
+    text = None
+    if any(marker in mime_type for marker in _TEXT_TYPES):
+        try:
+            text = body.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+    if text is None:
+        content["text"] = base64.b64encode(body).decode("ascii")
+        content["encoding"] = "base64"
+    else:
+        content["text"] = text
+    wait_ms = round(elapsed * 1000, 3)
+    return {
+        "startedDateTime": datetime.now(timezone.utc).isoformat(),
+        "time": wait_ms,
+        "request": {
+            "method": method,
+            "url": url,
+            "httpVersion": "HTTP/1.1",
+            "cookies": [],
+            "headers": [],
+            "queryString": [],
+            "headersSize": -1,
+            "bodySize": -1,
+        },
+        "response": {
+            "status": status,
+            "statusText": reason or "",
+            "httpVersion": "HTTP/1.1",
+            "cookies": [],
+            "headers": [{"name": name, "value": value} for name, value in headers.items()],
+            "content": content,
+            "redirectURL": headers.get("Location", headers.get("location", "")),
+            "headersSize": -1,
+            "bodySize": len(body),
+        },
+        "cache": {},
+        "timings": {"send": 0, "wait": wait_ms, "receive": 0},
+    }
+
+
+def read_har(path: Path) -> List[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle).get("log", {}).get("entries", [])
+
+
+def write_har(path: Path, entries: List[Dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    har = {"log": {"version": "1.2", "creator": {"name": "replay_harness", "version": "1"}, "entries": entries}}
+    with path.open("w", encoding="utf-8") as handle:
+        json.dump(har, handle, ensure_ascii=False)
+
+
+# ----------------------------------------------------------------------#
+# Recording
+# ----------------------------------------------------------------------#
+
+
+class Recorder:
+    """Captures one scraper's HTTP and browser traffic into a fixtures directory."""
+
+    def __init__(self, fixtures_dir: Path):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+        self.http_entries: List[Dict[str, Any]] = []
+        self._contexts = 0
+        self._lock = threading.Lock()
+
+    def _on_response(self, response: requests.Response, *args, **kwargs) -> None:
+        entry = har_entry(
+            response.request.method,
+            response.url,
+            response.status_code,
+            response.reason,
+            dict(response.headers),
+            response.content,
+            response.elapsed.total_seconds(),
+        )
+        with self._lock:
+            self.http_entries.append(entry)
+
+    def context_hook(self, context):
+        """Record a browser context into its own HAR (written when it closes).
+
+        Works for sync and async contexts; the scrapers await the result.
+        """
+        with self._lock:
+            self._contexts += 1
+            path = self.fixtures_dir / f"browser-{self._contexts}.har"
+        return context.route_from_har(path, update=True, update_content="embed", update_mode="full")
+
+    def install(self, scraper) -> None:
+        scraper.session.hooks["response"].append(self._on_response)
+        if hasattr(scraper, "context_hook"):
+            scraper.context_hook = self.context_hook
+
+    def finish(self) -> Dict[str, int]:
+        """Write http.har, merge browser HARs and export pages/ and xhr/."""
+        write_har(self.fixtures_dir / "http.har", self.http_entries)
+
+        browser_entries: List[Dict[str, Any]] = []
+        for path in sorted(self.fixtures_dir.glob("browser-*.har")):
+            browser_entries.extend(read_har(path))
+            path.unlink()
+        if browser_entries:
+            write_har(self.fixtures_dir / "browser.har", browser_entries)
+
+        return {
+            "http_responses": len(self.http_entries),
+            "browser_responses": len(browser_entries),
+            **export_documents(self.fixtures_dir, self.http_entries + browser_entries),
+        }
+
+
+def export_documents(fixtures_dir: Path, entries: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Save 200 HTML documents to pages/ and JSON responses to xhr/."""
+    pages_dir = fixtures_dir / "pages"
+    xhr_dir = fixtures_dir / "xhr"
+    page_urls: Dict[str, str] = {}
+    xhr_urls: Dict[str, str] = {}
+    for entry in entries:
+        response = RecordedResponse.from_har_entry(entry)
+        if response.status != 200 or not response.body:
+            continue
+        if "html" in response.content_type:
+            target, urls, suffix = pages_dir, page_urls, ".html"
+        elif "json" in response.content_type:
+            target, urls, suffix = xhr_dir, xhr_urls, ".json"
+        else:
+            continue
+        target.mkdir(parents=True, exist_ok=True)
+        name = fixture_name(response.url) + suffix
+        (target / name).write_bytes(response.body)
+        urls[name] = response.url
+
+    for target, urls in ((pages_dir, page_urls), (xhr_dir, xhr_urls)):
+        if urls:
+            with (target / "urls.json").open("w", encoding="utf-8") as handle:
+                json.dump(urls, handle, indent=2)
+    return {"pages": len(page_urls), "xhr": len(xhr_urls)}
+
+
+# ----------------------------------------------------------------------#
+# Replay
+# ----------------------------------------------------------------------#
+
+
+@dataclass
+class ReplayStats:
+    hits: int = 0
+    misses: int = 0
+    missed_urls: Set[str] = field(default_factory=set)
+
+    def record(self, url: str, found: bool) -> None:
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.missed_urls.add(url)
+
+
+class FixtureStore:
+    """URL -> recorded response, loaded from every HAR under a directory."""
+
+    def __init__(self, fixtures_dir: Path):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.responses: Dict[str, RecordedResponse] = {}
+        for path in sorted(self.fixtures_dir.rglob("*.har")):
+            for entry in read_har(path):
+                if entry["request"].get("method", "GET") not in ("GET", "HEAD"):
+                    continue
+                response = RecordedResponse.from_har_entry(entry)
+                # Prefer a successful capture over a later error for the same URL.
+                existing = self.responses.get(_strip_fragment(response.url))
+                if existing is None or existing.status >= 400 or response.status < 400:
+                    self.responses[_strip_fragment(response.url)] = response
+        self.stats = ReplayStats()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.responses)
+
+    def lookup(self, url: str) -> Optional[RecordedResponse]:
+        response = self.responses.get(_strip_fragment(url))
+        with self._lock:
+            self.stats.record(url, response is not None)
+        return response
+
+
+def _not_found(url: str) -> RecordedResponse:
+    return RecordedResponse(url=url, status=404, headers={"Content-Type": "text/plain"}, body=b"not recorded")
+
+
+class ReplayServer:
+    """Local HTTP server answering from a FixtureStore.
+
+    The original URL comes from the X-Replay-Url header, or is rebuilt from
+    the Host header and path (https assumed), so it can be curl'ed directly.
+    """
+
+    def __init__(self, store: FixtureStore, latency: float = 0.0, port: int = 0):
+        self.store = store
+        self.latency = latency
+        handler = self._handler_class()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread: Optional[threading.Thread] = None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _respond(self, send_body: bool) -> None:
+                url = self.headers.get(REPLAY_URL_HEADER) or f"https://{self.headers.get('Host', '')}{self.path}"
+                if server.latency:
+                    time.sleep(server.latency)
+                response = server.store.lookup(url)
+                if response is None:
+                    response = _not_found(url)
+                    self.send_response(response.status)
+                    self.send_header(REPLAY_MISS_HEADER, "1")
+                else:
+                    self.send_response(response.status)
+                for name, value in response.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(response.body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(response.body)
+
+            def do_GET(self) -> None:
+                self._respond(True)
+
+            def do_HEAD(self) -> None:
+                self._respond(False)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        print(f"[REPLAY] Serving {len(self.store)} recorded responses on {self.url}", flush=True)
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _forwarding_session(pool_size: int = 10) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    return session
+
+
+class ReplayAdapter(BaseAdapter):
+    """requests transport that answers from fixtures instead of the network.
+
+    With `server_url` every request is forwarded to the ReplayServer;
+    otherwise the store answers in-process after `latency` seconds.
+    """
+
+    def __init__(self, store: FixtureStore, latency: float = 0.0, server_url: Optional[str] = None):
+        super().__init__()
+        self.store = store
+        self.latency = latency
+        self.server_url = server_url
+        self._forward = _forwarding_session() if server_url else None
+
+    def _fetch(self, method: str, url: str, timeout: Any) -> Tuple[int, str, Dict[str, str], bytes]:
+        if self._forward is not None:
+            upstream = self._forward.request(
+                method,
+                self.server_url + "/",
+                headers={REPLAY_URL_HEADER: url},
+                timeout=timeout,
+                allow_redirects=False,
+            )
+            return upstream.status_code, upstream.reason, dict(upstream.headers), upstream.content
+        if self.latency:
+            time.sleep(self.latency)
+        recorded = self.store.lookup(url) or _not_found(url)
+        return recorded.status, "", dict(recorded.headers), recorded.body
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        status, reason, headers, body = self._fetch(request.method, request.url, timeout)
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = b"" if request.method == "HEAD" else body
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self) -> None:
+        if self._forward is not None:
+            self._forward.close()
+
+
+class Replayer:
+    """Points scrapers at recorded fixtures (see module docstring for modes)."""
+
+    def __init__(self, fixtures_dir: Path, mode: str = "server", latency_ms: float = 0.0):
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Unknown replay mode {mode!r}; expected one of {REPLAY_MODES}")
+        self.fixtures_dir = Path(fixtures_dir)
+        self.mode = mode
+        self.latency = latency_ms / 1000
+        self.store = FixtureStore(self.fixtures_dir)
+        self.server: Optional[ReplayServer] = None
+        if mode == "server":
+            self.server = ReplayServer(self.store, self.latency).start()
+        self._browser_forward = _forwarding_session() if self.server else None
+
+    @property
+    def stats(self) -> ReplayStats:
+        return self.store.stats
+
+    def close(self) -> None:
+        if self.server:
+            self.server.stop()
+        if self._browser_forward is not None:
+            self._browser_forward.close()
+
+    def __enter__(self) -> "Replayer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # Browser side (sync Playwright contexts) ------------------------------#
+
+    def _fulfill_from_server(self, route) -> None:
+        upstream = self._browser_forward.get(
+            self.server.url + "/", headers={REPLAY_URL_HEADER: route.request.url}, timeout=30
+        )
+        if upstream.headers.get(REPLAY_MISS_HEADER):
+            route.abort("internetdisconnected")
+            return
+        headers = {k: v for k, v in upstream.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        route.fulfill(status=upstream.status_code, headers=headers, body=upstream.content)
+
+    def _delay_then_har(self, route) -> None:
+        self.store.lookup(route.request.url)  # counts hits and misses
+        if self.latency:
+            time.sleep(self.latency)
+        route.fallback()
+
+    def context_hook(self, context) -> None:
+        if self.server:
+            context.route("**/*", self._fulfill_from_server)
+            return
+        har_path = self.fixtures_dir / "browser.har"
+        if har_path.exists():
+            context.route_from_har(har_path, not_found="abort")
+        else:
+            context.route("**/*", lambda route: route.abort("internetdisconnected"))
+        # Registered last so it runs first, then falls back to the HAR route.
+        context.route("**/*", self._delay_then_har)
+
+    # Scraper wiring -------------------------------------------------------#
+
+    def install(self, scraper) -> None:
+        """Route a scraper's requests.Session and browser contexts to the fixtures."""
+        adapter = ReplayAdapter(self.store, self.latency, self.server.url if self.server else None)
+        scraper.session.mount("http://", adapter)
+        scraper.session.mount("https://", adapter)
+        if hasattr(scraper, "context_hook"):
+            scraper.context_hook = self.context_hook
@@ -0,0 +1,166 @@
+"""
+Playwright request interception for headless scrapes.
+
+The scrapers only read rendered text, so images, media, fonts and
+third-party analytics / wallet-connector traffic are aborted before they
+hit the network. The policy is configurable through environment variables:
+
+  SCRAPER_BLOCK_RESOURCES=0              disable interception entirely
+  SCRAPER_BLOCK_RESOURCE_TYPES=image,... resource types to abort
+  SCRAPER_BLOCK_DOMAINS=example.com,...  extra domains to abort
+"""
+
+from __future__ import annotations
+
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Optional
+from urllib.parse import urlparse
+
+DEFAULT_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
+DEFAULT_BLOCKED_DOMAINS = frozenset(
+    {
+        "google-analytics.com",
+        "googletagmanager.com",
+        "doubleclick.net",
+        "segment.io",
+        "segment.com",
+        "mixpanel.com",
+        "hotjar.com",
+        "intercom.io",
+        "sentry.io",
+        "walletconnect.com",
+        "walletconnect.org",
+        "web3modal.org",
+        "fonts.googleapis.com",
+        "fonts.gstatic.com",
+    }
+)
+
+
+def _split_env(name: str) -> FrozenSet[str]:
+    raw = os.getenv(name, "")
+    return frozenset(item.strip().lower() for item in raw.split(",") if item.strip())
+
+
+@dataclass(frozen=True)
+class BlockPolicy:
+    """Which requests to abort, by resource type and by domain suffix."""
+
+    resource_types: FrozenSet[str] = DEFAULT_BLOCKED_RESOURCE_TYPES
+    domains: FrozenSet[str] = DEFAULT_BLOCKED_DOMAINS
+    enabled: bool = True
+
+    @classmethod
+    def from_env(cls) -> "BlockPolicy":
+        enabled = os.getenv("SCRAPER_BLOCK_RESOURCES", "1").lower() not in ("0", "false", "no")
+        resource_types = _split_env("SCRAPER_BLOCK_RESOURCE_TYPES") or DEFAULT_BLOCKED_RESOURCE_TYPES
+        domains = DEFAULT_BLOCKED_DOMAINS | _split_env("SCRAPER_BLOCK_DOMAINS")
+        return cls(resource_types=resource_types, domains=domains, enabled=enabled)
+
+    def block_reason(self, url: str, resource_type: str) -> Optional[str]:
+        """Return why a request should be aborted, or None to let it through."""
+        if not self.enabled:
+            return None
+        if resource_type in self.resource_types:
+            return f"type:{resource_type}"
+        host = (urlparse(url).hostname or "").lower()
+        for domain in self.domains:
+            if host == domain or host.endswith("." + domain):
+                return f"domain:{domain}"
+        return None
+
+
+@dataclass
+class BlockStats:
+    """Counters for aborted and allowed requests across a scrape.
+
+    Only allowed responses have a size; `allowed_response_bytes` is what the
+    page still loaded, not an estimate of what blocking saved.
+    """
+
+    blocked_requests: int = 0
+    allowed_requests: int = 0
+    allowed_response_bytes: int = 0
+    blocked_by_reason: Counter = field(default_factory=Counter)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "blocked_requests": self.blocked_requests,
+            "allowed_requests": self.allowed_requests,
+            "allowed_response_bytes": self.allowed_response_bytes,
+            "blocked_by_reason": dict(self.blocked_by_reason.most_common()),
+        }
+
+
+class ResourceBlocker:
+    """Installs a BlockPolicy as a route handler on pages or contexts.
+
+    Aborted requests never reach the network, so their size is unknown and
+    no savings figure is reported; `allowed_response_bytes` sums the
+    Content-Length of responses that were allowed.
+    """
+
+    def __init__(self, policy: Optional[BlockPolicy] = None):
+        self.policy = policy or BlockPolicy.from_env()
+        self.stats = BlockStats()
+
+    @classmethod
+    def from_env(cls) -> "ResourceBlocker":
+        return cls(BlockPolicy.from_env())
+
+    def _record_response(self, response) -> None:
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.stats.allowed_response_bytes += int(length)
+
+    def _decide(self, request) -> Optional[str]:
+        reason = self.policy.block_reason(request.url, request.resource_type)
+        if reason:
+            self.stats.blocked_requests += 1
+            self.stats.blocked_by_reason[reason] += 1
+        else:
+            self.stats.allowed_requests += 1
+        return reason
+
+    # Allowed requests fall back (rather than continue) so routes installed
+    # earlier, such as fixture replay on the context, still see them.
+    def _handle_route(self, route) -> None:
+        if self._decide(route.request):
+            route.abort("blockedbyclient")
+        else:
+            route.fallback()
+
+    async def _handle_route_async(self, route) -> None:
+        if self._decide(route.request):
+            await route.abort("blockedbyclient")
+        else:
+            await route.fallback()
+
+    def attach(self, target) -> None:
+        """Install on a sync-API page or context."""
+        if not self.policy.enabled:
+            return
+        target.route("**/*", self._handle_route)
+        target.on("response", self._record_response)
+
+    async def attach_async(self, target) -> None:
+        """Install on an async-API page or context."""
+        if not self.policy.enabled:
+            return
+        await target.route("**/*", self._handle_route_async)
+        target.on("response", self._record_response)
+
+    def summary(self) -> str:
+        stats = self.stats
+        top = ", ".join(
+            f"{reason}={count}" for reason, count in stats.blocked_by_reason.most_common(5)
+        )
+        return (
+            f"Blocked {stats.blocked_requests} requests "
+            f"({top or 'none'}); allowed {stats.allowed_requests} "
+            f"({stats.allowed_response_bytes / 1024:.0f} KiB of allowed responses)"
+        )
+
@@ -1,13 +1,159 @@
 """
 Master scraper - runs all scrapers and rebuilds index
 Run this daily to keep data fresh!
+
+The three sources are independent, so each scraper runs in its own process
+and a source is indexed as soon as its scrape finishes. A crash in one
+scraper does not stop the others. The website and blog scrapers attach to
+one shared Chromium started here (see browser_manager.py). Use --sequential
+to run them one after another in this process instead.
 """
 
+import asyncio
+import multiprocessing
+import os
 import sys
+import time
+from multiprocessing.connection import wait
 from pathlib import Path
+from typing import Callable, Dict, Iterable
+
+from browser_manager import browser_manager_enabled, shared_browser, shutdown_shared_browser
+
+SOURCES = {
+    "gitbook": "Documentation (docs.auto.finance)",
+    "website": "Website (app.auto.finance)",
+    "blog": "Blog (blog.tokemak.xyz)",
+}
+# Sources that may render pages in Chromium.
+BROWSER_SOURCES = {"website", "blog"}
+
+
+def scrape_source(source: str) -> None:
+    """Run one scraper and write its JSON/markdown output. Raises on failure."""
+    if source == "gitbook":
+        from scrape_gitbook import GitBookScraper
+        scraper = GitBookScraper("https://docs.auto.finance/")
+        asyncio.run(scraper.scrape_all_async())
+    elif source == "website":
+        from scrape_website import WebsiteScraper
+        scraper = WebsiteScraper()
+        asyncio.run(scraper.scrape_all_async())
+    elif source == "blog":
+        from scrape_blog import BlogScraper
+        scraper = BlogScraper()
+        scraper.scrape_all()
+    else:
+        raise ValueError(f"Unknown source: {source}")
+    scraper.save_to_json()
+    scraper.save_to_markdown()
+
+
+class _PrefixedStream:
+    """Prefix each output line of a child scraper with its source name."""
+
+    def __init__(self, stream, prefix: str):
+        self.stream = stream
+        self.prefix = prefix
+        self.at_line_start = True
+
+    def write(self, text: str) -> int:
+        for line in text.splitlines(keepends=True):
+            if self.at_line_start:
+                self.stream.write(self.prefix)
+            self.stream.write(line)
+            self.at_line_start = line.endswith("\n")
+        return len(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def _scrape_worker(source: str, browser_endpoint: str) -> None:
+    """Child process entry point; the exit code reports success."""
+    sys.stdout = _PrefixedStream(sys.stdout, f"[{source}] ")
+    sys.stderr = _PrefixedStream(sys.stderr, f"[{source}] ")
+    if browser_endpoint:
+        # Attach to the parent's Chromium instead of launching one per child.
+        os.environ["PLAYWRIGHT_REMOTE_BROWSER_ENDPOINT"] = browser_endpoint
+    try:
+        scrape_source(source)
+    except Exception as e:
+        print(f"[ERROR] Error scraping {source}: {e}", flush=True)
+        sys.exit(1)
+    finally:
+        # multiprocessing children skip atexit, so stop a browser we launched.
+        shutdown_shared_browser()
+    sys.stdout.flush()
+
+
+def _shared_browser_endpoint(sources: Iterable[str]) -> str:
+    """Endpoint of the warm shared Chromium for browser-driven sources, or ''."""
+    if not browser_manager_enabled() or not set(sources) & BROWSER_SOURCES:
+        return ""
+    try:
+        return shared_browser().endpoint()
+    except Exception as e:
+        print(f"[WARN] Shared browser unavailable, scrapers will launch their own: {e}", flush=True)
+        return ""
+
+
+def run_scrapers_parallel(
+    sources: Iterable[str],
+    on_finished: Callable[[str, bool], None],
+) -> Dict[str, bool]:
+    """Run each scraper in its own process; call on_finished as each one exits."""
+    # spawn: no inherited threads or event loops from the caller (bots, GUIs).
+    sources = list(sources)
+    context = multiprocessing.get_context("spawn")
+    browser_endpoint = _shared_browser_endpoint(sources)
+    running = {}
+    for source in sources:
+        process = context.Process(
+            target=_scrape_worker, args=(source, browser_endpoint), name=f"scrape-{source}"
+        )
+        process.start()
+        running[process.sentinel] = (source, process, time.time())
+        print(f"[START] {SOURCES[source]} (pid {process.pid})", flush=True)
+
+    results: Dict[str, bool] = {}
+    while running:
+        for sentinel in wait(list(running)):
+            source, process, started = running.pop(sentinel)
+            process.join()
+            ok = process.exitcode == 0
+            results[source] = ok
+            status = "OK" if ok else "ERROR"
+            print(
+                f"[{status}] {SOURCES[source]} finished in {time.time() - started:.0f}s "
+                f"(exit code {process.exitcode})",
+                flush=True,
+            )
+            on_finished(source, ok)
+    return results
+
+
+def run_scrapers_sequential(
+    sources: Iterable[str],
+    on_finished: Callable[[str, bool], None],
+) -> Dict[str, bool]:
+    results: Dict[str, bool] = {}
+    for source in sources:
+        print(f"\n[START] {SOURCES[source]}", flush=True)
+        print("-"*70)
+        try:
+            scrape_source(source)
+            results[source] = True
+            print(f"[OK] {SOURCES[source]} scraped")
+        except Exception as e:
+            results[source] = False
+            print(f"[ERROR] Error scraping {source}: {e}")
+        on_finished(source, results[source])
+    return results
+
 
 def run_all_scrapers():
-    """Run all scrapers in sequence"""
+    """Run all scrapers concurrently and index each source as it finishes"""
     print("\n" + "="*70)
     print(" AUTO FINANCE - COMPLETE DATA SCRAPER")
     print("="*70)
@@ -15,7 +161,7 @@ def run_all_scrapers():
     print("  1. Documentation (docs.auto.finance)")
     print("  2. Website (app.auto.finance)")
     print("  3. Blog (blog.tokemak.xyz)")
-    print("  4. Rebuild complete index\n")
+    print("  4. Index each source as soon as its scrape finishes\n")
     
     # Confirmation
     if len(sys.argv) > 1 and sys.argv[1] == '--auto':
@@ -27,62 +173,47 @@ def run_all_scrapers():
             return False
     
     print("\n" + "="*70)
-    
-    # Step 1: Scrape docs (fast, we already have this)
-    print("\n[1/4] Scraping Documentation...")
-    print("-"*70)
-    try:
-        from scrape_gitbook import GitBookScraper
-        scraper = GitBookScraper("https://docs.auto.finance/")
-        scraper.scrape_all()
-        scraper.save_to_json()
-        scraper.save_to_markdown()
-        print("[OK] Documentation scraped")
-    except Exception as e:
-        print(f"[ERROR] Error scraping docs: {e}")
-        print("  (Continuing with existing docs data...)")
-    
-    # Step 2: Scrape website
-    print("\n[2/4] Scraping Website (app.auto.finance)...")
+    started = time.time()
+
+    builder = None
+    index_errors = []
+
+    def index_finished_source(source: str, ok: bool) -> None:
+        """Index a source right after its scrape; failed scrapes keep the old chunks."""
+        nonlocal builder
+        try:
+            if builder is None:
+                from build_complete_index import CompleteIndexBuilder
+                builder = CompleteIndexBuilder()
+            if ok:
+                builder.update_source(source)
+            elif builder.source_chunk_count(source) == 0:
+                print(f"  (Indexing existing {source} data...)")
+                builder.index_source(source)
+            else:
+                print(f"  (Keeping previously indexed {source} data...)")
+        except Exception as e:
+            print(f"[ERROR] Error indexing {source}: {e}")
+            index_errors.append(source)
+
+    if "--sequential" in sys.argv:
+        results = run_scrapers_sequential(SOURCES, index_finished_source)
+    else:
+        print("\n[1/2] Scraping all sources in parallel (indexing each as it finishes)...")
+        print("-"*70)
+        results = run_scrapers_parallel(SOURCES, index_finished_source)
+
+    print("\n[2/2] Verifying Complete Index...")
     print("-"*70)
-    try:
-        from scrape_website import WebsiteScraper
-        scraper = WebsiteScraper()
-        scraper.scrape_all()
-        scraper.save_to_json()
-        scraper.save_to_markdown()
-        print("[OK] Website scraped")
-    except Exception as e:
-        print(f"[ERROR] Error scraping website: {e}")
+    if builder is None or index_errors or not builder.verify_index():
+        print("[ERROR] Index is incomplete")
         return False
-    
-    # Step 3: Scrape blog
-    print("\n[3/4] Scraping Blog (blog.tokemak.xyz)...")
-    print("-"*70)
-    try:
-        from scrape_blog import BlogScraper
-        scraper = BlogScraper()
-        scraper.scrape_all()
-        scraper.save_to_json()
-        scraper.save_to_markdown()
-        print("[OK] Blog scraped")
-    except Exception as e:
-        print(f"[ERROR] Error scraping blog: {e}")
-        print("  (Continuing without blog data...)")
-    
-    # Step 4: Build complete index
-    print("\n[4/4] Building Complete Index...")
-    print("-"*70)
-    try:
-        from build_complete_index import CompleteIndexBuilder
-        builder = CompleteIndexBuilder()
-        builder.build_index()
-        builder.verify_index()
-        print("[OK] Complete index built")
-    except Exception as e:
-        print(f"[ERROR] Error building index: {e}")
+    print(f"[OK] Complete index updated in {time.time() - started:.0f}s")
+
+    if not results.get("website"):
+        print("[ERROR] Website scrape failed; live pool data is stale")
         return False
-    
+
     # Summary
     print("\n" + "="*70)
     print(" SCRAPING COMPLETE!")
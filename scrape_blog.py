@@ -4,20 +4,60 @@ Scrape blog.tokemak.xyz blog posts.
 
 from __future__ import annotations
 
+import json
+import re
+import sys
 import time
+from collections import Counter
+from contextlib import ExitStack, closing
+from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set
 from urllib.parse import urljoin, urlparse
 
 import os
+import requests
+from bs4 import BeautifulSoup
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError, sync_playwright
 
+from browser_manager import browser_manager_enabled, shared_browser
+from crawl_checkpoint import CrawlCheckpoint
+from discovery import (
+    DiscoveredUrl,
+    fetch_feed_urls,
+    fetch_sitemap_urls,
+    modified_since,
+    same_site,
+)
+from fetch_strategy import (
+    BROWSER,
+    HTTP,
+    FetchFailed,
+    FetchPathMemory,
+    http_first_enabled,
+    url_path,
+    url_pattern,
+    visible_text,
+)
+from http_cache import HttpCache
+from http_client import create_session
+from known_posts import KnownPostsIndex
+from page_readiness import BLOG_RULES, wait_until_ready
+from resource_blocking import ResourceBlocker
 from scraper_common import (
+    DocumentStream,
+    ScrapeReport,
     ScrapedDocument,
     save_documents_json,
     save_documents_markdown,
 )
 
+ARTICLE_SELECTORS = ["article", '[role="article"]', ".blog-post", ".post-content", "main"]
+DATE_SELECTORS = ["time", ".date", ".published", "[datetime]"]
+MIN_ARTICLE_CHARS = 200
+# Listing pages a Ghost-style sitemap index mixes in with the posts
+NON_POST_PREFIXES = ("/tag/", "/category/", "/author/", "/page/")
+
 
 class BlogScraper:
     """Scrapes blog.tokemak.xyz."""
@@ -32,33 +72,45 @@ class BlogScraper:
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
         self.blog_posts: List[ScrapedDocument] = []
+        self.session = create_session()
+        self.resource_blocker = ResourceBlocker.from_env()
         self.launch_timeout = int(
             os.getenv("PLAYWRIGHT_LAUNCH_TIMEOUT_MS", "1800000")
         )  # default 30 mins
         self.page_timeout = int(
             os.getenv("PLAYWRIGHT_OPERATION_TIMEOUT_MS", "90000")
         )  # default 90 seconds
+        self.page_delay = float(os.getenv("SCRAPER_PAGE_DELAY_SECONDS", "0.5"))
+        self.readiness_rules = list(BLOG_RULES)
+        self.http_first = http_first_enabled()
+        self.http_cache = HttpCache(self.output_dir / "http_cache" / "blog.json")
+        self.fetch_paths = FetchPathMemory(self.output_dir / "fetch_paths.json")
+        self.fetch_counts: Counter = Counter()
+        self.http_escalate_after = int(os.getenv("BLOG_HTTP_ESCALATE_AFTER", "3"))
+        self.known_posts = KnownPostsIndex(self.output_dir / "known_posts.json")
+        self.recheck_sample = int(os.getenv("BLOG_RECHECK_SAMPLE", "3"))
+        self.lastmod: Dict[str, datetime] = {}
+        # Every post URL, when the sitemap listed the whole blog this run
+        self.listed_posts: Optional[Set[str]] = None
+        self.report = ScrapeReport(source="blog")
+        self.stream = DocumentStream(self.output_dir, "blog")
+        self.checkpoint = CrawlCheckpoint(self.output_dir / "checkpoints", "blog")
+        # Posts an interrupted run already fetched, by URL
+        self.resumed: Dict[str, ScrapedDocument] = {}
+        # Called with every new browser context (fixture record/replay hooks in).
+        self.context_hook: Optional[Callable[[Any], Any]] = None
 
     def extract_blog_post(self, page, url: str) -> Optional[ScrapedDocument]:
         """Extract blog post content."""
         print(f"  [PARSE] {url}", flush=True)
 
         try:
-            page.wait_for_load_state("networkidle", timeout=60000)
-            time.sleep(2)
+            wait_until_ready(page, url, self.readiness_rules)
 
             title = page.title()
             article_content = None
 
-            selectors = [
-                "article",
-                '[role=\"article\"]',
-                ".blog-post",
-                ".post-content",
-                "main",
-            ]
-
-            for selector in selectors:
+            for selector in ARTICLE_SELECTORS:
                 try:
                     element = page.locator(selector).first
                     if element.is_visible():
@@ -72,8 +124,7 @@ class BlogScraper:
 
             metadata = {}
 
-            date_selectors = ["time", ".date", ".published", "[datetime]"]
-            for selector in date_selectors:
+            for selector in DATE_SELECTORS:
                 try:
                     date_element = page.locator(selector).first
                     if date_element.is_visible():
@@ -104,6 +155,232 @@ class BlogScraper:
             print(f"  Error extracting post: {exc}", flush=True)
             return None
 
+    def parse_post_html(self, url: str, html: bytes) -> Optional[ScrapedDocument]:
+        """Extract a post from server-rendered HTML; None if the article is empty."""
+        soup = BeautifulSoup(html, "html.parser")
+        title = soup.title.get_text(strip=True) if soup.title else ""
+
+        metadata: Dict[str, str] = {}
+        for selector in DATE_SELECTORS:
+            date_element = soup.select_one(selector)
+            if date_element:
+                date_text = date_element.get_text(strip=True) or date_element.get("datetime")
+                if date_text:
+                    metadata["date"] = date_text
+                    break
+
+        article_content = ""
+        for selector in ARTICLE_SELECTORS:
+            element = soup.select_one(selector)
+            if element:
+                article_content = visible_text(element)
+                if article_content:
+                    break
+
+        if len(article_content) < MIN_ARTICLE_CHARS:
+            return None
+
+        read_time = re.search(r"\d+\s*min read", article_content, re.IGNORECASE)
+        if read_time:
+            metadata["read_time"] = read_time.group(0)
+
+        return ScrapedDocument(
+            title=title or url,
+            url=url,
+            content=article_content,
+            source="blog",
+            metadata=metadata,
+        )
+
+    def fetch_post_http(self, url: str) -> Optional[ScrapedDocument]:
+        """Fetch a post with a conditional GET, reusing the cached parse on 304.
+
+        Raises FetchFailed on a network error or an unusable status; returns
+        None when the article is empty.
+        """
+        try:
+            response = self.session.get(
+                url, headers=self.http_cache.conditional_headers(url), timeout=30
+            )
+        except requests.RequestException as exc:
+            print(f"  [HTTP] {url} failed: {exc}", flush=True)
+            raise FetchFailed(str(exc)) from exc
+
+        if response.status_code == 304 or (
+            response.status_code == 200 and self.http_cache.is_unchanged(url, response.content)
+        ):
+            document = self.http_cache.document(url)
+            if document:
+                self.http_cache.touch(url, dict(response.headers))
+                return document
+        if response.status_code != 200:
+            print(f"  [HTTP] {url} returned {response.status_code}", flush=True)
+            raise FetchFailed(f"HTTP {response.status_code}")
+
+        document = self.parse_post_html(url, response.content)
+        if document:
+            self.http_cache.store(url, dict(response.headers), response.content, document, [])
+        return document
+
+    def find_blog_post_links_http(self) -> Set[str]:
+        """Post links from the server-rendered homepage, if it has any."""
+        if not self.http_first or not self.fetch_paths.should_try_http("/"):
+            return set()
+        try:
+            response = self.session.get(self.base_url, timeout=30)
+        except requests.RequestException:
+            return set()
+        if response.status_code != 200:
+            return set()
+        links: Set[str] = set()
+        soup = BeautifulSoup(response.content, "html.parser")
+        for anchor in soup.find_all("a", href=True):
+            absolute_url = urljoin(self.base_url, anchor["href"]).split("#")[0]
+            if self.is_post_url(absolute_url):
+                links.add(absolute_url.rstrip("/"))
+        self.fetch_paths.record("/", HTTP if links else BROWSER)
+        return links
+
+    def _scrape_over_http(self, urls: List[str]) -> List[str]:
+        """Scrape what plain HTTP can serve; return the URLs that need a browser."""
+        if not self.http_first:
+            return list(urls)
+
+        remaining: List[str] = []
+        empty_in_a_row = 0
+        for url in urls:
+            pattern = url_pattern(url, keep_segments=0)
+            path = url_path(url)
+            if not (
+                self.fetch_paths.should_try_http(pattern)
+                and self.fetch_paths.should_try_http(path)
+            ):
+                remaining.append(url)
+                continue
+
+            try:
+                document = self.fetch_post_http(url)
+            except FetchFailed:
+                remaining.append(url)
+                continue
+            if document is None:
+                print(f"  [HTTP] Empty article at {url}; escalating it to browser", flush=True)
+                self.fetch_paths.record(path, BROWSER)
+                remaining.append(url)
+                empty_in_a_row += 1
+                if empty_in_a_row == self.http_escalate_after:
+                    print(
+                        f"  [HTTP] {empty_in_a_row} empty articles in a row; escalating {pattern}",
+                        flush=True,
+                    )
+                    self.fetch_paths.record(pattern, BROWSER)
+                continue
+
+            empty_in_a_row = 0
+            self.fetch_paths.forget(path)
+            self.fetch_paths.record(pattern, HTTP)
+            self.fetch_counts[HTTP] += 1
+            self._record_post(document)
+            print(f"  [OK] Fetched over HTTP: {document.title[:60]}", flush=True)
+
+        self.http_cache.save()
+        return remaining
+
+    def _print_fetch_summary(self) -> None:
+        self.fetch_paths.save()
+        print(
+            f"Fetch paths: {self.fetch_counts[HTTP]} posts over HTTP, "
+            f"{self.fetch_counts[BROWSER]} in the browser",
+            flush=True,
+        )
+
+    def is_post_url(self, url: str) -> bool:
+        """Check whether a URL looks like a blog post rather than a listing."""
+        parsed = urlparse(url)
+        path = parsed.path.rstrip("/") + "/"
+        return (
+            url.startswith(self.base_url)
+            and path != "/"
+            and not path.startswith(NON_POST_PREFIXES)
+            and "/page/" not in path
+        )
+
+    def discover_post_urls(self) -> Dict[str, DiscoveredUrl]:
+        """Find post URLs from the sitemap and RSS/Atom feed without a browser.
+
+        The sitemap lists every post; the feed adds publish dates for recent
+        ones. Returns an empty dict when the blog publishes neither. When the
+        sitemap lists posts, their URLs are kept in `listed_posts` so posts
+        missing from it can be dropped.
+        """
+        discovered: Dict[str, DiscoveredUrl] = {}
+        sitemap_entries = same_site(fetch_sitemap_urls(self.session, self.base_url), self.base_url)
+        feed_entries = same_site(fetch_feed_urls(self.session, self.base_url), self.base_url)
+
+        listed: Set[str] = set()
+        for position, entry in enumerate(sitemap_entries + feed_entries):
+            url = entry.url.split("#")[0].split("?")[0].rstrip("/")
+            if not self.is_post_url(url):
+                continue
+            if position < len(sitemap_entries):
+                listed.add(url)
+            known = discovered.get(url)
+            if known is None:
+                discovered[url] = DiscoveredUrl(url=url, lastmod=entry.lastmod, title=entry.title)
+            elif entry.lastmod and (known.lastmod is None or entry.lastmod > known.lastmod):
+                known.lastmod = entry.lastmod
+
+        if listed:
+            self.listed_posts = listed
+
+        print(
+            f"Discovery: {len(sitemap_entries)} sitemap entries, "
+            f"{len(feed_entries)} feed entries -> {len(discovered)} posts",
+            flush=True,
+        )
+        return discovered
+
+    def _load_previous_posts(self, filename: str = "blog_posts.json") -> Dict[str, ScrapedDocument]:
+        """Load posts from the last saved run, keyed by URL."""
+        path = self.output_dir / filename
+        if not path.exists():
+            return {}
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                records = json.load(handle)
+        except (OSError, json.JSONDecodeError) as exc:
+            print(f"  [WARN] Could not read previous posts from {path}: {exc}", flush=True)
+            return {}
+        return {
+            record["url"].rstrip("/"): ScrapedDocument.from_dict(record)
+            for record in records
+            if isinstance(record, dict) and record.get("url")
+        }
+
+    def _open_page(self, playwright, stack: ExitStack):
+        """A page in a fresh context, on the shared Chromium unless BROWSER_MANAGER=0."""
+        if browser_manager_enabled():
+            session = stack.enter_context(shared_browser().session(playwright))
+            browser_visits = self.fetch_counts[BROWSER]
+            stack.callback(lambda: session.count_page(self.fetch_counts[BROWSER] - browser_visits))
+            context = stack.enter_context(closing(session.new_context()))
+        else:
+            browser = playwright.chromium.launch(
+                headless=True,
+                timeout=self.launch_timeout,
+                args=[
+                    "--no-sandbox",
+                    "--disable-setuid-sandbox",
+                    "--disable-dev-shm-usage",
+                    "--disable-gpu",
+                ],
+            )
+            stack.callback(browser.close)
+            context = browser.new_context()
+        if self.context_hook:
+            self.context_hook(context)
+        return context.new_page()
+
     def find_blog_post_links(self, page) -> Set[str]:
         """Find all blog post links from the blog homepage."""
         links: Set[str] = set()
@@ -118,15 +395,7 @@ class BlogScraper:
                         continue
 
                     absolute_url = urljoin(self.base_url, href)
-                    parsed = urlparse(absolute_url)
-
-                    if (
-                        absolute_url.startswith(self.base_url)
-                        and parsed.path
-                        and parsed.path != "/"
-                        and not parsed.path.startswith("/tag/")
-                        and not parsed.path.startswith("/category/")
-                    ):
+                    if self.is_post_url(absolute_url):
                         links.add(absolute_url.rstrip("/"))
                 except Exception:
                     continue
@@ -136,36 +405,177 @@ class BlogScraper:
 
         return links
 
-    def scrape_all(self) -> None:
-        """Scrape all blog posts."""
+    def _select_posts(
+        self,
+        discovered: Dict[str, DiscoveredUrl],
+        previous: Dict[str, ScrapedDocument],
+        since: Optional[datetime],
+    ) -> List[str]:
+        """Pick the posts to fetch: new, modified, and a rotating sample.
+
+        Everything else is carried over from `previous` when merging.
+        """
+        new_posts: List[str] = []
+        modified: List[str] = []
+        for url in sorted(discovered):
+            lastmod = discovered[url].lastmod
+            if lastmod:
+                self.lastmod[url] = lastmod
+            if url not in previous:
+                new_posts.append(url)
+            elif self.known_posts.is_modified(url, lastmod) or (
+                since and lastmod and modified_since(lastmod, since)
+            ):
+                modified.append(url)
+
+        selected = set(new_posts) | set(modified)
+        sample = self.known_posts.rotation_sample(
+            (url for url in previous if url not in selected), self.recheck_sample
+        )
+        print(
+            f"Known posts: {len(previous)}; fetching {len(new_posts)} new, "
+            f"{len(modified)} modified, {len(sample)} rechecks",
+            flush=True,
+        )
+        if self.resumed:
+            print(f"Skipping {len(self.resumed)} posts fetched before the restart", flush=True)
+        return [url for url in new_posts + modified + sample if url not in self.resumed]
+
+    def _start_crawl(self, since: Optional[datetime], full: bool) -> None:
+        """Pick up the posts an interrupted run with the same options fetched."""
+        params = {
+            "base_url": self.base_url,
+            "since": since.isoformat() if since else None,
+            "full": full,
+        }
+        resumed = self.checkpoint.start(params, [])
+        if resumed is None:
+            return
+        for document in resumed.documents:
+            url = document.url.rstrip("/")
+            self.resumed[url] = document
+            self.blog_posts.append(document)
+            self.stream.write(document)
+            if resumed.statuses.get(document.url) == "unchanged":
+                self.report.mark_unchanged(url)
+            else:
+                self.report.mark_changed(url)
+
+    def _record_post(self, document: ScrapedDocument) -> None:
+        """Keep a fetched post and update the known-posts index."""
+        url = document.url.rstrip("/")
+        if self.known_posts.record(document, self.lastmod.get(url)):
+            self.report.mark_changed(url)
+            self.checkpoint.record_document(document, "changed")
+            print(f"  [CHANGED] {url}", flush=True)
+        else:
+            self.report.mark_unchanged(url)
+            self.checkpoint.record_document(document, "unchanged")
+        self.checkpoint.record_done(document.url, [])
+        self.blog_posts.append(document)
+        self.stream.write(document)
+
+    def _merge_previous(self, previous: Dict[str, ScrapedDocument]) -> None:
+        """Merge fetched posts over the previous run's posts, sorted by URL.
+
+        Previous posts the sitemap no longer lists are dropped and reported
+        as removed.
+        """
+        merged = dict(previous)
+        fetched = {document.url.rstrip("/"): document for document in self.blog_posts}
+        for url, document in previous.items():
+            if self.listed_posts is not None and url not in self.listed_posts and url not in fetched:
+                print(f"  [REMOVED] No longer in the sitemap: {url}", flush=True)
+                del merged[url]
+                self.known_posts.forget(document.url)
+                self.report.mark_removed(url)
+                continue
+            if url not in fetched:
+                self.stream.write(document)
+                if url not in self.report.failed:
+                    self.report.mark_unchanged(url)
+        merged.update(fetched)
+        self.blog_posts = [merged[url] for url in sorted(merged)]
+        # Resumed posts never reached the saved index; their lastmod is known now
+        for url, document in self.resumed.items():
+            self.known_posts.record(document, self.lastmod.get(url))
+        self.known_posts.save()
+        self.report.finish()
+
+    def scrape_all(self, since: Optional[datetime] = None, full: bool = False) -> None:
+        """Scrape new blog posts and merge them with the known ones.
+
+        Posts are discovered from the sitemap/feed, falling back to the links
+        on the homepage. Only posts missing from blog_posts.json, posts whose
+        lastmod moved forward (or is newer than `since`) and a rotating
+        sample of old posts are fetched; `full=True` re-fetches everything.
+        Posts are fetched over plain HTTP first; Chromium is only launched
+        for those that need rendering. Fetched posts are checkpointed, so a
+        restarted run skips the ones it already has.
+        """
         print(f"Starting blog scrape: {self.base_url}", flush=True)
 
-        with sync_playwright() as playwright:
-            browser = playwright.chromium.launch(
-                headless=True,
-                timeout=self.launch_timeout,
-                args=[
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-gpu",
-                ],
-            )
-            page = browser.new_page()
+        previous = {} if full else self._load_previous_posts()
+        for document in previous.values():
+            self.known_posts.seed(document)
+
+        self._start_crawl(since, full)
+        try:
+            discovered = self.discover_post_urls()
+            if not discovered:
+                homepage_links = self.find_blog_post_links_http()
+                if homepage_links:
+                    print(f"Found {len(homepage_links)} blog post URLs over HTTP", flush=True)
+                    discovered = {url: DiscoveredUrl(url=url) for url in homepage_links}
+
+            to_scrape: Optional[List[str]] = None
+            if discovered:
+                to_scrape = self._select_posts(discovered, previous, since)
+                if to_scrape:
+                    to_scrape = self._scrape_over_http(to_scrape)
+
+            if to_scrape is None or to_scrape:
+                self._scrape_in_browser(to_scrape, previous, since)
+        finally:
+            self.checkpoint.close()
+
+        fetched = len(self.blog_posts)
+        self._merge_previous(previous)
+        print(
+            f"\n[OK] Completed! Fetched {fetched} posts "
+            f"({len(self.report.changed)} new or changed); {len(self.blog_posts)} blog posts total",
+            flush=True,
+        )
+        self._print_fetch_summary()
+
+    def _scrape_in_browser(
+        self,
+        to_scrape: Optional[List[str]],
+        previous: Dict[str, ScrapedDocument],
+        since: Optional[datetime],
+    ) -> None:
+        """Render posts with Playwright; with no URL list, discover from the homepage."""
+        with sync_playwright() as playwright, ExitStack() as stack:
+            page = self._open_page(playwright, stack)
             page.set_default_timeout(self.page_timeout)
+            self.resource_blocker.attach(page)
 
-            print("\nVisiting blog homepage...", flush=True)
-            page.goto(
-                self.base_url, wait_until="domcontentloaded", timeout=self.page_timeout
-            )
-            time.sleep(3)
+            if to_scrape is None:
+                print("\nVisiting blog homepage...", flush=True)
+                page.goto(
+                    self.base_url, wait_until="domcontentloaded", timeout=self.page_timeout
+                )
+                wait_until_ready(page, self.base_url, self.readiness_rules)
 
-            post_links = self.find_blog_post_links(page)
-            print(f"Found {len(post_links)} blog post URLs", flush=True)
+                post_links = self.find_blog_post_links(page)
+                print(f"Found {len(post_links)} blog post URLs", flush=True)
+                to_scrape = self._select_posts(
+                    {url: DiscoveredUrl(url=url) for url in post_links}, previous, since
+                )
 
-            for index, post_url in enumerate(sorted(post_links), 1):
+            for index, post_url in enumerate(to_scrape, 1):
                 print(
-                    f"\n[{index}/{len(post_links)}] Scraping: {post_url}", flush=True
+                    f"\n[{index}/{len(to_scrape)}] Scraping: {post_url}", flush=True
                 )
 
                 try:
@@ -178,35 +588,51 @@ class BlogScraper:
                     )
 
                     document = self.extract_blog_post(page, post_url)
+                    self.fetch_counts[BROWSER] += 1
 
                     if document:
-                        self.blog_posts.append(document)
+                        self._record_post(document)
                         print(f"  [OK] Extracted: {document.title[:60]}", flush=True)
+                    else:
+                        self.report.mark_failed(post_url)
 
-                    time.sleep(2.5)
+                    if self.page_delay:
+                        time.sleep(self.page_delay)
 
                 except PlaywrightTimeoutError as exc:
+                    self.report.mark_failed(post_url)
                     print(f"  [TIMEOUT] {post_url} ({exc})", flush=True)
                     continue
                 except Exception as exc:
+                    self.report.mark_failed(post_url)
                     print(f"  [ERROR] Error scraping post: {exc}", flush=True)
                     continue
 
-            browser.close()
-
-        print(f"\n[OK] Completed! Scraped {len(self.blog_posts)} blog posts", flush=True)
+        print(self.resource_blocker.summary(), flush=True)
 
     def save_to_json(self, filename: str = "blog_posts.json") -> None:
         """Save blog posts to JSON."""
         output_path = self.output_dir / filename
         save_documents_json(self.blog_posts, output_path)
         print(f"Saved to {output_path}", flush=True)
+        print(f"Saved stream to {self.stream.finish()}", flush=True)
+        self.save_report()
+        self.checkpoint.clear()
+
+    def save_report(self, filename: str = "blog_report.json") -> None:
+        """Save the changed/unchanged post report next to the data."""
+        report_path = self.output_dir / filename
+        self.report.save(report_path)
+        print(f"Saved scrape report to {report_path}", flush=True)
 
     def save_to_markdown(self) -> None:
         """Save each post as markdown."""
         md_dir = self.output_dir / "markdown"
-        save_documents_markdown(self.blog_posts, md_dir)
-        print(f"Saved {len(self.blog_posts)} markdown files to {md_dir}", flush=True)
+        written = save_documents_markdown(self.blog_posts, md_dir)
+        print(
+            f"Saved markdown to {md_dir}: {written} of {len(self.blog_posts)} files changed",
+            flush=True,
+        )
 
 
 def main() -> None:
@@ -216,7 +642,7 @@ def main() -> None:
     print("Auto Finance Blog Scraper")
     print("=" * 60)
 
-    scraper.scrape_all()
+    scraper.scrape_all(full="--full" in sys.argv)
     scraper.save_to_json()
     scraper.save_to_markdown()
 
@@ -1,12 +1,23 @@
+import asyncio
+import os
+import sys
 import time
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
-import requests
 from bs4 import BeautifulSoup
 
+from crawl_checkpoint import CrawlCheckpoint
+from discovery import fetch_sitemap_urls, modified_since, same_site
+from gitbook_html import LXML_AVAILABLE, extract_page
+from http_cache import HttpCache
+from http_client import AsyncFetcher, create_session
 from scraper_common import (
+    CrawlFrontier,
+    DocumentStream,
+    ScrapeReport,
     ScrapedDocument,
     save_documents_json,
     save_documents_markdown,
@@ -16,18 +27,38 @@ from scraper_common import (
 class GitBookScraper:
     """Scraper for GitBook-based documentation."""
 
-    def __init__(self, base_url: str, output_dir: str = "scraped_data"):
+    def __init__(
+        self,
+        base_url: str,
+        output_dir: str = "scraped_data",
+        request_delay: float = 1.0,
+        use_cache: bool = True,
+    ):
         self.base_url = base_url.rstrip("/")
         self.domain = urlparse(base_url).netloc
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.request_delay = request_delay
+        self.session = create_session()
         self.visited_urls: set[str] = set()
         self.scraped_content: List[ScrapedDocument] = []
+        self.http_cache: Optional[HttpCache] = (
+            HttpCache(self.output_dir / "http_cache" / "gitbook.json") if use_cache else None
+        )
+        self.report = ScrapeReport(source="gitbook")
+        self.lastmod: Dict[str, datetime] = {}
+        self.modified_since: Optional[datetime] = None
+        self.checkpoint = CrawlCheckpoint(self.output_dir / "checkpoints", "gitbook")
+        self.stream = DocumentStream(self.output_dir, "gitbook")
+        self.use_lxml = LXML_AVAILABLE and os.getenv("GITBOOK_PARSER", "lxml") != "bs4"
+
+    def is_internal_url(self, url: str) -> bool:
+        """Check if URL belongs to the same GitBook site."""
+        return urlparse(url).netloc == self.domain
 
     def is_valid_url(self, url: str) -> bool:
-        """Check if URL belongs to the same GitBook site."""
-        parsed = urlparse(url)
-        return parsed.netloc == self.domain and url not in self.visited_urls
+        """Check if URL belongs to the same GitBook site and is not yet visited."""
+        return self.is_internal_url(url) and url not in self.visited_urls
 
     def extract_content(
         self, soup: BeautifulSoup, url: str
@@ -96,10 +127,14 @@ class GitBookScraper:
 
     def find_internal_links(self, soup: BeautifulSoup, current_url: str) -> set[str]:
         """Find all internal links on the page."""
-        links: set[str] = set()
-        for link in soup.find_all("a", href=True):
-            href = link["href"]
+        return self.internal_links(
+            (link["href"] for link in soup.find_all("a", href=True)), current_url
+        )
 
+    def internal_links(self, hrefs: Iterable[str], current_url: str) -> set[str]:
+        """Resolve hrefs against current_url and keep same-site page URLs."""
+        links: set[str] = set()
+        for href in hrefs:
             if href.startswith(("http://", "https://")) and self.base_url not in href:
                 continue
             if href.startswith(("mailto:", "tel:", "javascript:")):
@@ -108,11 +143,71 @@ class GitBookScraper:
             absolute_url = urljoin(current_url, href)
             absolute_url = absolute_url.split("#")[0].split("?")[0]
 
-            if self.is_valid_url(absolute_url):
+            if self.is_internal_url(absolute_url):
                 links.add(absolute_url)
 
         return links
 
+    def discover_urls(self) -> List[str]:
+        """List page URLs from the site's sitemap, recording their lastmod."""
+        entries = same_site(fetch_sitemap_urls(self.session, self.base_url), self.base_url)
+        urls: List[str] = []
+        for entry in entries:
+            url = entry.url.split("#")[0].split("?")[0]
+            if url.rstrip("/") == self.base_url:
+                url = self.base_url
+            if entry.lastmod:
+                self.lastmod[url] = entry.lastmod
+            urls.append(url)
+        return urls
+
+    def _build_frontier(self, since: Optional[datetime]) -> CrawlFrontier:
+        """Seed the crawl from the sitemap, falling back to link crawling alone."""
+        self.modified_since = since
+        seeds = [self.base_url]
+        sitemap_urls = self.discover_urls()
+        if sitemap_urls:
+            seeds.extend(sitemap_urls)
+            print(f"Sitemap: {len(sitemap_urls)} URLs discovered", flush=True)
+        else:
+            print("Sitemap: none found, discovering pages by link crawling", flush=True)
+
+        params = {"base_url": self.base_url, "since": since.isoformat() if since else None}
+        resumed = self.checkpoint.start(params, seeds)
+        if resumed is None:
+            return CrawlFrontier(seeds)
+
+        for document in resumed.documents:
+            self.scraped_content.append(document)
+            self.stream.write(document)
+            if resumed.statuses.get(document.url) == "unchanged":
+                self.report.mark_unchanged(document.url)
+            else:
+                self.report.mark_changed(document.url)
+        self.visited_urls.update(resumed.done)
+        return resumed.frontier(seeds)
+
+    def _keep_document(self, document: ScrapedDocument, status: str) -> None:
+        self.scraped_content.append(document)
+        self.stream.write(document)
+        self.checkpoint.record_document(document, status)
+
+    def _reuse_unmodified(self, url: str) -> Optional[List[str]]:
+        """Reuse the cached page when the sitemap says it has not changed.
+
+        Returns the cached links, or None when the page has to be fetched.
+        """
+        if not self.http_cache or modified_since(self.lastmod.get(url), self.modified_since):
+            return None
+        document = self.http_cache.document(url)
+        if document is None:
+            return None
+
+        self._keep_document(document, "unchanged")
+        self.report.mark_unchanged(url)
+        print(f"  [SKIP] Not modified since last run: {document.title[:50]}", flush=True)
+        return [link for link in self.http_cache.links(url) if self.is_valid_url(link)]
+
     def scrape_page(self, url: str) -> List[str]:
         """Scrape a single page."""
         if url in self.visited_urls:
@@ -121,54 +216,262 @@ class GitBookScraper:
         print(f"Scraping: {url}", flush=True)
         self.visited_urls.add(url)
 
-        try:
-            response = requests.get(url, timeout=60)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, "html.parser")
+        reused_links = self._reuse_unmodified(url)
+        if reused_links is not None:
+            return reused_links
 
-            document = self.extract_content(soup, url)
-            if document:
-                self.scraped_content.append(document)
-                print(f"  [OK] Extracted: {document.title[:50]}", flush=True)
+        try:
+            headers = self.http_cache.conditional_headers(url) if self.http_cache else {}
+            response = self.session.get(url, timeout=60, headers=headers)
+            if response.status_code != 304:
+                response.raise_for_status()
 
-            new_links = self.find_internal_links(soup, url)
-            time.sleep(1)
-            return list(new_links)
+            new_links = self.handle_response(
+                url, response.status_code, response.content, dict(response.headers)
+            )
+            if self.request_delay:
+                time.sleep(self.request_delay)
+            return new_links
         except Exception as exc:
+            self.report.mark_failed(url)
             print(f"  [ERROR] Error scraping {url}: {exc}", flush=True)
             return []
 
-    def scrape_all(self, max_pages: Optional[int] = None) -> None:
-        """Recursively scrape all pages starting from base_url."""
+    def parse_page(
+        self, url: str, html: bytes
+    ) -> Tuple[Optional[ScrapedDocument], List[str]]:
+        """Parse fetched HTML into a document and the page's internal links."""
+        if self.use_lxml:
+            return self.parse_page_lxml(url, html)
+        soup = BeautifulSoup(html, "html.parser")
+        document = self.extract_content(soup, url)
+        return document, sorted(self.find_internal_links(soup, url))
+
+    def parse_page_lxml(
+        self, url: str, html: bytes
+    ) -> Tuple[Optional[ScrapedDocument], List[str]]:
+        """Single-pass lxml equivalent of extract_content + find_internal_links.
+
+        Links are collected from the whole page, including navigation inside
+        the content container that the BeautifulSoup path decomposes first.
+        """
+        page = extract_page(html)
+        if page is None:
+            print(f"Error: Could not parse {url}", flush=True)
+            return None, []
+        if page.used_fallback:
+            print(f"Warning: Using fallback content extraction for {url}")
+
+        links = sorted(self.internal_links(page.hrefs, url))
+        if not page.content:
+            return None, links
+
+        metadata: Dict[str, Any] = {}
+        if page.description:
+            metadata["description"] = page.description
+        if page.headings:
+            metadata["headings"] = page.headings
+        document = ScrapedDocument(
+            title=page.title or url,
+            url=url,
+            content=page.content,
+            source="gitbook",
+            metadata=metadata,
+        )
+        return document, links
+
+    def handle_response(
+        self, url: str, status: int, body: bytes, headers: Dict[str, str]
+    ) -> List[str]:
+        """Record the document for a fetched page and return links to follow.
+
+        A 304, or a 200 whose body hash matches the cache, reuses the cached
+        document and links instead of parsing the page again.
+        """
+        cache = self.http_cache
+        if cache and url in cache.entries and (status == 304 or cache.is_unchanged(url, body)):
+            cache.touch(url, headers)
+            document = cache.document(url)
+            if document:
+                self._keep_document(document, "unchanged")
+                print(f"  [CACHED] Unchanged: {document.title[:50]}", flush=True)
+            self.report.mark_unchanged(url)
+            return [link for link in cache.links(url) if self.is_valid_url(link)]
+
+        if status == 304:
+            # Validators were sent without a usable cache entry; nothing to reuse.
+            self.report.mark_failed(url)
+            return []
+
+        document, links = self.parse_page(url, body)
+        if document:
+            self._keep_document(document, "changed")
+            print(f"  [OK] Extracted: {document.title[:50]}", flush=True)
+        if cache:
+            cache.store(url, headers, body, document, links)
+        self.report.mark_changed(url)
+        return [link for link in links if self.is_valid_url(link)]
+
+    def _finish_run(self) -> None:
+        """Persist the HTTP cache and close out the scrape report."""
+        self.checkpoint.close()
+        if self.http_cache:
+            self.http_cache.save()
+        self.report.finish()
+        print(
+            f"Changed pages: {len(self.report.changed)}, "
+            f"unchanged: {len(self.report.unchanged)}, "
+            f"failed: {len(self.report.failed)}",
+            flush=True,
+        )
+
+    def scrape_all(
+        self, max_pages: Optional[int] = None, since: Optional[datetime] = None
+    ) -> None:
+        """Scrape all pages from the sitemap and links starting at base_url.
+
+        With `since`, pages whose sitemap lastmod is not newer are served
+        from the HTTP cache instead of being fetched.
+        """
         print(f"Starting GitBook scrape: {self.base_url}", flush=True)
-        to_visit = [self.base_url]
-        pages_scraped = 0
+        frontier = self._build_frontier(since)
+        pages_scraped = len(self.visited_urls)
 
-        while to_visit and (max_pages is None or pages_scraped < max_pages):
-            current_url = to_visit.pop(0)
+        while frontier and (max_pages is None or pages_scraped < max_pages):
+            current_url = frontier.pop()
             new_links = self.scrape_page(current_url)
-            to_visit.extend(new_links)
+            self.checkpoint.record_done(current_url, new_links)
+            frontier.extend(new_links)
             pages_scraped += 1
 
             print(
-                f"Progress: {pages_scraped} pages scraped, {len(to_visit)} in queue",
+                f"Progress: {pages_scraped} pages scraped, {len(frontier)} in queue",
                 flush=True,
             )
 
+        self._finish_run()
         print(f"\nCompleted! Scraped {len(self.scraped_content)} pages", flush=True)
 
+    async def scrape_all_async(
+        self,
+        max_pages: Optional[int] = None,
+        concurrency: int = 8,
+        per_host_limit: int = 4,
+        per_host_delay: float = 0.1,
+        since: Optional[datetime] = None,
+    ) -> None:
+        """Crawl from base_url with a pool of concurrent workers.
+
+        Workers share one frontier; pages are fetched through a pooled
+        aiohttp client and parsed off the event loop. `since` behaves as in
+        `scrape_all`.
+        """
+        print(
+            f"Starting concurrent GitBook scrape: {self.base_url} "
+            f"(concurrency={concurrency}, per_host={per_host_limit})",
+            flush=True,
+        )
+        started = time.monotonic()
+        frontier = await asyncio.to_thread(self._build_frontier, since)
+        condition = asyncio.Condition()
+        in_flight = 0
+        pages_scraped = len(self.visited_urls)
+
+        async def worker(fetcher: AsyncFetcher) -> None:
+            nonlocal in_flight, pages_scraped
+            while True:
+                async with condition:
+                    while not frontier and in_flight:
+                        await condition.wait()
+                    budget_left = max_pages is None or pages_scraped < max_pages
+                    if not frontier or not budget_left:
+                        condition.notify_all()
+                        return
+                    url = frontier.pop()
+                    in_flight += 1
+                    pages_scraped += 1
+
+                new_links: List[str] = []
+                try:
+                    new_links = await self._fetch_and_process(fetcher, url)
+                    self.checkpoint.record_done(url, new_links)
+                finally:
+                    async with condition:
+                        in_flight -= 1
+                        frontier.extend(new_links)
+                        condition.notify_all()
+
+                print(
+                    f"Progress: {pages_scraped} pages scraped, {len(frontier)} in queue",
+                    flush=True,
+                )
+
+        async with AsyncFetcher(
+            concurrency=concurrency,
+            per_host_limit=per_host_limit,
+            per_host_delay=per_host_delay,
+        ) as fetcher:
+            await asyncio.gather(*(worker(fetcher) for _ in range(concurrency)))
+
+        self._finish_run()
+        print(
+            f"\nCompleted! Scraped {len(self.scraped_content)} pages "
+            f"in {time.monotonic() - started:.1f}s",
+            flush=True,
+        )
+
+    async def _fetch_and_process(self, fetcher: AsyncFetcher, url: str) -> List[str]:
+        """Fetch one page through the async pool and parse it in a worker thread."""
+        if url in self.visited_urls:
+            return []
+
+        print(f"Scraping: {url}", flush=True)
+        self.visited_urls.add(url)
+
+        reused_links = self._reuse_unmodified(url)
+        if reused_links is not None:
+            return reused_links
+
+        headers = self.http_cache.conditional_headers(url) if self.http_cache else {}
+        result = await fetcher.fetch(url, headers=headers)
+        if not (result.ok or result.status == 304):
+            self.report.mark_failed(url)
+            reason = result.error or f"HTTP {result.status}"
+            print(f"  [ERROR] Error scraping {url}: {reason}", flush=True)
+            return []
+
+        try:
+            return await asyncio.to_thread(
+                self.handle_response, url, result.status, result.body, result.headers
+            )
+        except Exception as exc:
+            self.report.mark_failed(url)
+            print(f"  [ERROR] Error parsing {url}: {exc}", flush=True)
+            return []
+
     def save_to_json(self, filename: str = "gitbook_data.json") -> None:
         """Save scraped content to JSON file."""
         output_path = self.output_dir / filename
         save_documents_json(self.scraped_content, output_path)
         print(f"Saved to {output_path}", flush=True)
+        print(f"Saved stream to {self.stream.finish()}", flush=True)
+        self.save_report()
+        self.checkpoint.clear()
+
+    def save_report(self, filename: str = "gitbook_report.json") -> None:
+        """Save the changed/unchanged page report next to the data."""
+        report_path = self.output_dir / filename
+        self.report.save(report_path)
+        print(f"Saved scrape report to {report_path}", flush=True)
 
     def save_to_markdown(self) -> None:
         """Save each page as a separate markdown file."""
         md_dir = self.output_dir / "markdown"
-        save_documents_markdown(self.scraped_content, md_dir)
-        print(f"Saved {len(self.scraped_content)} markdown files to {md_dir}", flush=True)
+        written = save_documents_markdown(self.scraped_content, md_dir)
+        print(
+            f"Saved markdown to {md_dir}: {written} of {len(self.scraped_content)} files changed",
+            flush=True,
+        )
 
 
 if __name__ == "__main__":
@@ -177,7 +480,10 @@ if __name__ == "__main__":
     scraper = GitBookScraper(GITBOOK_URL)
 
     print("Starting scrape of docs.auto.finance...", flush=True)
-    scraper.scrape_all()
+    if "--sequential" in sys.argv:
+        scraper.scrape_all()
+    else:
+        asyncio.run(scraper.scrape_all_async())
 
     scraper.save_to_json()
     scraper.save_to_markdown()
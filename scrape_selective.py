@@ -3,6 +3,7 @@ Selective Scraping System
 Allows updating specific data sources without re-scraping everything
 """
 
+import asyncio
 import json
 from pathlib import Path
 from datetime import datetime
@@ -49,6 +50,16 @@ class SelectiveScraper:
         self.config['last_updates'][source_type] = datetime.now().isoformat()
         self.save_config()
     
+    def last_update_time(self, source_type):
+        """Return the last successful update for a source as a datetime (or None)"""
+        value = self.config['last_updates'].get(source_type)
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    
     def quick_update(self):
         """Quick update - website only"""
         print("\n" + "="*70)
@@ -66,7 +77,7 @@ class SelectiveScraper:
             print("[1/2] Scraping website...")
             from scrape_website import WebsiteScraper
             scraper = WebsiteScraper()
-            scraper.scrape_all()
+            asyncio.run(scraper.scrape_all_async())
             scraper.save_to_json()
             scraper.save_to_markdown()
             
@@ -90,10 +101,10 @@ class SelectiveScraper:
         print(" BLOG UPDATE - Blog Posts Only")
         print("="*70)
         print("\nThis will:")
-        print("  • Scrape blog.tokemak.xyz")
+        print("  • Scrape new blog.tokemak.xyz posts")
         print("  • Merge with existing docs and website")
-        print("  • Rebuild index")
-        print("\nTime: ~3-5 minutes")
+        print("  • Rebuild index if anything changed")
+        print("\nTime: seconds when no new posts, ~1-3 minutes otherwise")
         print("="*70 + "\n")
         
         try:
@@ -101,13 +112,19 @@ class SelectiveScraper:
             print("[1/2] Scraping blog...")
             from scrape_blog import BlogScraper
             scraper = BlogScraper()
-            scraper.scrape_all()
+            scraper.scrape_all(since=self.last_update_time('blog'))
             scraper.save_to_json()
-            scraper.save_to_markdown()
             
             # Update timestamp
             self.update_timestamp('blog')
             
+            if not scraper.report.changed:
+                print("\n[2/2] No new or changed posts; index is up to date")
+                print("\n[OK] Blog update complete!")
+                return True
+            
+            scraper.save_to_markdown()
+            
             # Merge and rebuild
             print("\n[2/2] Merging and rebuilding index...")
             self._merge_blog_only()
@@ -136,7 +153,7 @@ class SelectiveScraper:
             print("[1/2] Scraping documentation...")
             from scrape_gitbook import GitBookScraper
             scraper = GitBookScraper("https://docs.auto.finance/")
-            scraper.scrape_all()
+            asyncio.run(scraper.scrape_all_async(since=self.last_update_time('docs')))
             scraper.save_to_json()
             scraper.save_to_markdown()
             
@@ -188,21 +205,21 @@ class SelectiveScraper:
         from build_complete_index import CompleteIndexBuilder
         builder = CompleteIndexBuilder()
         
-        # This will reload all data sources and rebuild
-        # Website data is fresh, docs and blog are existing
-        builder.build_index()
+        # Re-embed only the website pages the change feed reports;
+        # docs and blog chunks are left as they are
+        builder.update_source("website")
     
     def _merge_blog_only(self):
         """Merge new blog data with existing docs and website"""
         from build_complete_index import CompleteIndexBuilder
         builder = CompleteIndexBuilder()
-        builder.build_index()
+        builder.update_source("blog")
     
     def _merge_docs_only(self):
         """Merge new docs with existing website and blog"""
         from build_complete_index import CompleteIndexBuilder
         builder = CompleteIndexBuilder()
-        builder.build_index()
+        builder.update_source("gitbook")
     
     def get_last_update_info(self):
         """Get last update information"""
@@ -228,7 +245,7 @@ def main():
         print("\nOptions:")
         print("  quick - Website only (5-10 mins)")
         print("  full  - Everything (20 mins)")
-        print("  blog  - Blog posts only (3-5 mins)")
+        print("  blog  - New blog posts only (seconds if none)")
         print("  docs  - Documentation only (3-5 mins)")
         return
     
@@ -5,21 +5,60 @@ Handles JavaScript-heavy React app.
 
 from __future__ import annotations
 
+import asyncio
+import inspect
+import json
 import os
 import re
+import sqlite3
+import sys
 import time
+from collections import Counter
+from contextlib import AsyncExitStack, ExitStack, closing
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
 
+import requests
+from bs4 import BeautifulSoup
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError, sync_playwright
 
+from browser_manager import browser_manager_enabled, shared_browser
+from crawl_checkpoint import CrawlCheckpoint
+from fetch_strategy import (
+    BROWSER,
+    HTTP,
+    FetchFailed,
+    FetchPathMemory,
+    embedded_json_payloads,
+    http_first_enabled,
+    url_pattern,
+    visible_text,
+)
+from http_client import create_session
+from page_readiness import WEBSITE_RULES, wait_until_ready, wait_until_ready_async
+from pool_metrics import PoolMetricsStore
+from pool_responses import JsonResponseRecorder, pool_data_from_payloads
+from resource_blocking import ResourceBlocker
 from scraper_common import (
+    CrawlFrontier,
+    DocumentStream,
     ScrapedDocument,
     save_documents_json,
     save_documents_markdown,
 )
 
+BROWSER_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+]
+
+HREFS_JS = "elements => elements.map(element => element.getAttribute('href'))"
+
+MIN_HTTP_TEXT_CHARS = 200
+
 
 class WebsiteScraper:
     """Scrapes app.auto.finance with live data."""
@@ -38,40 +77,92 @@ class WebsiteScraper:
         self.page_timeout = int(
             os.getenv("PLAYWRIGHT_OPERATION_TIMEOUT_MS", "90000")
         )  # default 90 seconds
+        self.page_delay = float(os.getenv("SCRAPER_PAGE_DELAY_SECONDS", "0.5"))
+        self.readiness_rules = list(WEBSITE_RULES)
 
         self.visited_urls: Set[str] = set()
         self.scraped_pages: List[ScrapedDocument] = []
+        self.page_timings: List[Dict[str, Any]] = []
         self.skip_patterns = ["/portfolio"]
+        self.resource_blocker = ResourceBlocker.from_env()
+        self.response_recorder = JsonResponseRecorder()
+        self.session = create_session()
+        self.http_first = http_first_enabled()
+        self.fetch_paths = FetchPathMemory(self.output_dir / "fetch_paths.json")
+        self.fetch_counts: Counter = Counter()
+        self.checkpoint = CrawlCheckpoint(self.output_dir / "checkpoints", "website")
+        self.stream = DocumentStream(self.output_dir, "website")
+        # Called with every new browser context (fixture record/replay hooks in).
+        self.context_hook: Optional[Callable[[Any], Any]] = None
 
     def should_skip(self, url: str) -> bool:
         """Check if URL should be skipped."""
         return any(pattern in url for pattern in self.skip_patterns)
 
+    def default_start_urls(self) -> List[str]:
+        return [
+            self.base_url,
+            f"{self.base_url}/pools",
+            f"{self.base_url}/stoke",
+            f"{self.base_url}/tokelp",
+        ]
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        return url.split("#")[0].rstrip("/")
+
+    def _start_crawl(self, start_urls: List[str]) -> CrawlFrontier:
+        """Build the frontier, resuming from the checkpoint when one matches."""
+        seeds = [self.normalize_url(url) for url in start_urls]
+        resumed = self.checkpoint.start({"base_url": self.base_url}, seeds)
+        if resumed is None:
+            return CrawlFrontier(seeds)
+        for document in resumed.documents:
+            self.scraped_pages.append(document)
+            self.stream.write(document)
+        self.visited_urls.update(resumed.done)
+        return resumed.frontier(seeds)
+
+    def _keep_document(self, document: ScrapedDocument) -> None:
+        self.scraped_pages.append(document)
+        self.stream.write(document)
+        self.checkpoint.record_document(document)
+
+    @staticmethod
+    def has_pool_data(url: str) -> bool:
+        """Pages that carry live APY/TVL metrics."""
+        return (
+            "/pools/" in url
+            or "/stoke/" in url
+            or url.endswith("/pools")
+            or url.endswith("/stoke")
+            or url.endswith("/tokelp")
+        )
+
     def extract_page_data(self, page, url: str) -> Optional[ScrapedDocument]:
         """Extract all relevant data from a page."""
         print(f"Extracting data from: {url}", flush=True)
 
         try:
-            page.wait_for_load_state("networkidle", timeout=60000)
-            time.sleep(2)
+            wait_until_ready(page, url, self.readiness_rules)
 
             title = page.title()
             content = page.inner_text("body")
 
-            pool_data = None
-            if (
-                "/pools/" in url
-                or "/stoke/" in url
-                or url.endswith("/pools")
-                or url.endswith("/stoke")
-                or url.endswith("/tokelp")
-            ):
-                pool_data = self.extract_pool_data(page)
+            metadata: Dict[str, Any] = {}
+            if self.has_pool_data(url):
+                pool_data = self.pool_data_from_api(
+                    url, self.response_recorder.payloads(), content
+                )
+                source = "api"
+                if not pool_data:
+                    pool_data = self.extract_pool_data(page)
+                    source = "text"
+                if pool_data:
+                    metadata["pool_data"] = pool_data
+                    metadata["pool_data_source"] = source
 
             scraped_at = time.strftime("%Y-%m-%dT%H:%M:%SZ")
-            metadata: Dict[str, Any] = {}
-            if pool_data:
-                metadata["pool_data"] = pool_data
 
             return ScrapedDocument(
                 title=title or url,
@@ -85,14 +176,40 @@ class WebsiteScraper:
             print(f"  Error extracting data: {exc}", flush=True)
             return None
 
+    def pool_data_from_api(
+        self, url: str, payloads: List[Any], page_text: str = ""
+    ) -> Dict[str, Any]:
+        """Build pool metrics from JSON responses recorded while loading `url`.
+
+        The APY the page text shows (if any) settles whether the API reports
+        APY as a fraction or a percentage.
+        """
+        match = re.search(r"/pools/([\w-]+)", url)
+        if not match or not payloads:
+            return {}
+        shown_apy = None
+        if page_text:
+            shown = self.parse_pool_data(page_text, url).get("apy")
+            if shown:
+                try:
+                    shown_apy = float(shown.rstrip("%"))
+                except ValueError:
+                    shown_apy = None
+        return pool_data_from_payloads(payloads, match.group(1), shown_apy)
+
     def extract_pool_data(self, page) -> Dict[str, str]:
         """Extract structured data from pool/staking pages."""
+        try:
+            return self.parse_pool_data(page.inner_text("body"), page.url)
+        except Exception as exc:
+            print(f"  Error extracting pool data: {exc}", flush=True)
+            return {}
+
+    def parse_pool_data(self, page_text: str, current_url: str) -> Dict[str, str]:
+        """Pull pool metrics out of rendered page text."""
         pool_data: Dict[str, str] = {}
 
         try:
-            page_text = page.inner_text("body")
-            current_url = page.url
-
             if "/pools/" in current_url:
                 pool_name_match = re.search(r"/pools/([\w-]+)", current_url)
                 if pool_name_match:
@@ -198,6 +315,107 @@ class WebsiteScraper:
             print(f"  Error finding links: {exc}", flush=True)
         return links
 
+    def fetch_via_http(self, url: str) -> Optional[Tuple[ScrapedDocument, Set[str]]]:
+        """Fetch and parse `url` without a browser.
+
+        Raises FetchFailed on a network error or non-200 response, and
+        returns None when the server-rendered HTML fails the content check:
+        pool pages need metrics (from embedded JSON or text), other pages
+        need a non-trivial amount of text.
+        """
+        try:
+            response = self.session.get(url, timeout=30)
+        except requests.RequestException as exc:
+            print(f"  [HTTP] {url} failed: {exc}", flush=True)
+            raise FetchFailed(str(exc)) from exc
+        if response.status_code != 200:
+            print(f"  [HTTP] {url} returned {response.status_code}", flush=True)
+            raise FetchFailed(f"HTTP {response.status_code}")
+        if "html" not in response.headers.get("content-type", ""):
+            return None
+        return self.parse_http_page(url, response.content)
+
+    def parse_http_page(
+        self, url: str, html: bytes
+    ) -> Optional[Tuple[ScrapedDocument, Set[str]]]:
+        """Build the document and links from server-rendered HTML (see fetch_via_http)."""
+        soup = BeautifulSoup(html, "html.parser")
+        payloads = embedded_json_payloads(soup)
+        hrefs = [anchor.get("href") for anchor in soup.find_all("a", href=True)]
+        title = soup.title.get_text(strip=True) if soup.title else ""
+        content = visible_text(soup.body or soup)
+
+        metadata: Dict[str, Any] = {}
+        if self.has_pool_data(url):
+            pool_data = self.pool_data_from_api(url, payloads, content)
+            source = "embedded"
+            if not pool_data:
+                pool_data = self.parse_pool_data(content, url)
+                source = "text"
+            if not pool_data:
+                return None
+            metadata["pool_data"] = pool_data
+            metadata["pool_data_source"] = source
+        elif len(content) < MIN_HTTP_TEXT_CHARS:
+            return None
+
+        document = ScrapedDocument(
+            title=title or url,
+            url=url,
+            content=content,
+            source="website",
+            scraped_at=time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            metadata=metadata,
+        )
+        return document, self._filter_links(url, hrefs)
+
+    def scrape_page_http(self, url: str) -> Optional[List[str]]:
+        """Try the HTTP fast path for `url`.
+
+        Returns new links on success, or None when the page should be
+        rendered in the browser instead.
+        """
+        if url in self.visited_urls:
+            return []
+        pattern = url_pattern(url)
+        if not self.http_first or not self.fetch_paths.should_try_http(pattern):
+            return None
+
+        start = time.monotonic()
+        try:
+            result = self.fetch_via_http(url)
+        except FetchFailed:
+            return None
+        if result is None:
+            print(f"  [HTTP] Content check failed for {url}; escalating to browser", flush=True)
+            self.fetch_paths.record(pattern, BROWSER)
+            return None
+
+        document, links = result
+        self.visited_urls.add(url)
+        self.fetch_paths.record(pattern, HTTP)
+        self.fetch_counts[HTTP] += 1
+        self._keep_document(document)
+        self.page_timings.append(
+            {
+                "url": url,
+                "ok": True,
+                "path": HTTP,
+                "total_seconds": round(time.monotonic() - start, 3),
+            }
+        )
+        print(f"\nFetched over HTTP: {url}", flush=True)
+        print(f"  [OK] Extracted: {document.title[:60]}", flush=True)
+        return sorted(links)
+
+    def _print_fetch_summary(self) -> None:
+        self.fetch_paths.save()
+        print(
+            f"Fetch paths: {self.fetch_counts[HTTP]} pages over HTTP, "
+            f"{self.fetch_counts[BROWSER]} in the browser",
+            flush=True,
+        )
+
     def scrape_page(self, page, url: str) -> List[str]:
         """Visit a page, extract data, and return new links."""
         if url in self.visited_urls:
@@ -205,19 +423,22 @@ class WebsiteScraper:
 
         print(f"\nVisiting: {url}", flush=True)
         self.visited_urls.add(url)
+        self.fetch_counts[BROWSER] += 1
 
         try:
+            self.response_recorder.reset()
             page.goto(url, wait_until="domcontentloaded", timeout=self.page_timeout)
             document = self.extract_page_data(page, url)
             if document:
-                self.scraped_pages.append(document)
+                self._keep_document(document)
                 print(f"  [OK] Extracted: {document.title[:60]}", flush=True)
 
             new_links = self.find_links(page, url)
             if url.endswith("/pools"):
                 new_links.update(self.discover_pool_pages(page, url))
 
-            time.sleep(2.5)
+            if self.page_delay:
+                time.sleep(self.page_delay)
             return list(new_links)
 
         except PlaywrightTimeoutError as exc:
@@ -230,59 +451,334 @@ class WebsiteScraper:
     def scrape_all(self, start_urls: Optional[List[str]] = None, max_pages: int = 50) -> None:
         """Scrape all pages starting from provided URLs."""
         if start_urls is None:
-            start_urls = [
-                self.base_url,
-                f"{self.base_url}/pools",
-                f"{self.base_url}/stoke",
-                f"{self.base_url}/tokelp",
-            ]
+            start_urls = self.default_start_urls()
 
         print(f"Starting scrape of {self.base_url}", flush=True)
         print(f"Start URLs: {start_urls}", flush=True)
 
-        with sync_playwright() as playwright:
-            browser = playwright.chromium.launch(
-                headless=True,
-                timeout=self.launch_timeout,
-                args=[
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-gpu",
-                ],
-            )
-            page = browser.new_page()
-            page.set_default_timeout(self.page_timeout)
+        with sync_playwright() as playwright, ExitStack() as browser_stack:
+            page = None
+            browser_visits = self.fetch_counts[BROWSER]
+
+            def browser_page():
+                # Chromium is only needed once a page fails the HTTP fast path.
+                nonlocal page
+                if page is None:
+                    if browser_manager_enabled():
+                        session = browser_stack.enter_context(shared_browser().session(playwright))
+                        browser_stack.callback(
+                            lambda: session.count_page(self.fetch_counts[BROWSER] - browser_visits)
+                        )
+                        context = browser_stack.enter_context(closing(session.new_context()))
+                    else:
+                        browser = playwright.chromium.launch(
+                            headless=True,
+                            timeout=self.launch_timeout,
+                            args=BROWSER_ARGS,
+                        )
+                        browser_stack.callback(browser.close)
+                        context = browser.new_context()
+                    if self.context_hook:
+                        self.context_hook(context)
+                    page = context.new_page()
+                    page.set_default_timeout(self.page_timeout)
+                    self.resource_blocker.attach(page)
+                    self.response_recorder.attach(page)
+                return page
+
+            to_visit = self._start_crawl(start_urls)
+            visited_count = len(self.visited_urls)
+
+            try:
+                while to_visit and visited_count < max_pages:
+                    current_url = to_visit.pop()
+                    new_links = self.scrape_page_http(current_url)
+                    if new_links is None:
+                        new_links = self.scrape_page(browser_page(), current_url)
+                    self.checkpoint.record_done(current_url, new_links)
+                    to_visit.extend(self.normalize_url(link) for link in new_links)
+                    visited_count += 1
+
+                    print(
+                        f"Progress: {visited_count} pages scraped, {len(to_visit)} in queue",
+                        flush=True,
+                    )
+            finally:
+                self.checkpoint.close()
+
+        print(f"\n[OK] Completed! Scraped {len(self.scraped_pages)} pages", flush=True)
+        self._print_fetch_summary()
+        print(self.resource_blocker.summary(), flush=True)
+
+    # ------------------------------------------------------------------#
+    # Async page pool
+    # ------------------------------------------------------------------#
+
+    async def scrape_all_async(
+        self,
+        start_urls: Optional[List[str]] = None,
+        max_pages: int = 50,
+        concurrency: int = 4,
+    ) -> None:
+        """Scrape with a pool of browser contexts working from one frontier.
 
-            to_visit = list(start_urls)
-            visited_count = 0
+        Each worker owns an isolated context and page, so up to `concurrency`
+        pages load in parallel within a single Chromium process.
+        """
+        from playwright.async_api import async_playwright
 
-            while to_visit and visited_count < max_pages:
-                current_url = to_visit.pop(0).rstrip("/")
-                new_links = self.scrape_page(page, current_url)
-                to_visit.extend(link for link in new_links if link not in self.visited_urls)
-                visited_count += 1
+        if start_urls is None:
+            start_urls = self.default_start_urls()
+
+        print(
+            f"Starting concurrent scrape of {self.base_url} (concurrency={concurrency})",
+            flush=True,
+        )
+        started = time.monotonic()
+        frontier = self._start_crawl(start_urls)
+        condition = asyncio.Condition()
+        in_flight = 0
+        pages_started = len(self.visited_urls)
+
+        async def worker(get_browser) -> None:
+            nonlocal in_flight, pages_started
+            context = None
+            page = None
+            recorder = JsonResponseRecorder(self.response_recorder.patterns)
+            try:
+                while True:
+                    async with condition:
+                        while not frontier and in_flight:
+                            await condition.wait()
+                        if not frontier or pages_started >= max_pages:
+                            condition.notify_all()
+                            return
+                        url = frontier.pop()
+                        in_flight += 1
+                        pages_started += 1
+
+                    new_links: List[str] = []
+                    try:
+                        http_links = await asyncio.to_thread(self.scrape_page_http, url)
+                        if http_links is not None:
+                            new_links = http_links
+                        else:
+                            if page is None:
+                                browser = await get_browser()
+                                context = await browser.new_context()
+                                if self.context_hook:
+                                    hooked = self.context_hook(context)
+                                    if inspect.isawaitable(hooked):
+                                        await hooked
+                                await self.resource_blocker.attach_async(context)
+                                page = await context.new_page()
+                                page.set_default_timeout(self.page_timeout)
+                                recorder.attach(page)
+                            new_links = await self._scrape_page_async(page, url, recorder)
+                        self.checkpoint.record_done(url, new_links)
+                    finally:
+                        async with condition:
+                            in_flight -= 1
+                            frontier.extend(self.normalize_url(link) for link in new_links)
+                            condition.notify_all()
+
+                    print(
+                        f"Progress: {len(self.page_timings)} pages scraped, "
+                        f"{len(frontier)} in queue",
+                        flush=True,
+                    )
+            finally:
+                if context is not None:
+                    await context.close()
+
+        async with async_playwright() as playwright, AsyncExitStack() as browser_stack:
+            browser = None
+            launch_lock = asyncio.Lock()
+            browser_visits = self.fetch_counts[BROWSER]
+
+            async def get_browser():
+                # Chromium is only needed once some page fails the HTTP fast path.
+                nonlocal browser
+                async with launch_lock:
+                    if browser is None:
+                        if browser_manager_enabled():
+                            browser = await browser_stack.enter_async_context(
+                                shared_browser().async_session(playwright)
+                            )
+                            browser_stack.callback(
+                                lambda: browser.count_page(self.fetch_counts[BROWSER] - browser_visits)
+                            )
+                        else:
+                            browser = await playwright.chromium.launch(
+                                headless=True,
+                                timeout=self.launch_timeout,
+                                args=BROWSER_ARGS,
+                            )
+                            browser_stack.push_async_callback(browser.close)
+                return browser
+
+            try:
+                await asyncio.gather(*(worker(get_browser) for _ in range(concurrency)))
+            finally:
+                self.checkpoint.close()
+
+        elapsed = time.monotonic() - started
+        print(
+            f"\n[OK] Completed! Scraped {len(self.scraped_pages)} pages in {elapsed:.1f}s",
+            flush=True,
+        )
+        self._print_timing_summary()
+        self._print_fetch_summary()
+        print(self.resource_blocker.summary(), flush=True)
+
+    async def _scrape_page_async(
+        self, page, url: str, recorder: JsonResponseRecorder
+    ) -> List[str]:
+        """Async counterpart of scrape_page that also records per-page timing."""
+        if url in self.visited_urls:
+            return []
+
+        print(f"\nVisiting: {url}", flush=True)
+        self.visited_urls.add(url)
+        self.fetch_counts[BROWSER] += 1
+        timing: Dict[str, Any] = {"url": url, "ok": False, "path": BROWSER}
+        start = time.monotonic()
+
+        try:
+            recorder.reset()
+            await page.goto(url, wait_until="domcontentloaded", timeout=self.page_timeout)
+            timing["load_seconds"] = round(time.monotonic() - start, 3)
+
+            extract_start = time.monotonic()
+            document = await self._extract_page_data_async(page, url, recorder)
+            timing["extract_seconds"] = round(time.monotonic() - extract_start, 3)
+            if document:
+                self._keep_document(document)
+                timing["ok"] = True
+                print(f"  [OK] Extracted: {document.title[:60]}", flush=True)
+
+            hrefs = await page.eval_on_selector_all("a[href]", HREFS_JS)
+            return sorted(self._filter_links(url, hrefs))
+
+        except PlaywrightTimeoutError as exc:
+            timing["error"] = "timeout"
+            print(f"  [TIMEOUT] {url} ({exc})", flush=True)
+            return []
+        except Exception as exc:
+            timing["error"] = str(exc)[:200]
+            print(f"  [ERROR] {url} -> {exc}", flush=True)
+            return []
+        finally:
+            timing["total_seconds"] = round(time.monotonic() - start, 3)
+            self.page_timings.append(timing)
+            print(f"  [TIME] {url} took {timing['total_seconds']:.1f}s", flush=True)
+
+    async def _extract_page_data_async(
+        self, page, url: str, recorder: JsonResponseRecorder
+    ) -> Optional[ScrapedDocument]:
+        """Async counterpart of extract_page_data."""
+        print(f"Extracting data from: {url}", flush=True)
+
+        try:
+            await wait_until_ready_async(page, url, self.readiness_rules)
+
+            title = await page.title()
+            content = await page.inner_text("body")
 
-                print(
-                    f"Progress: {visited_count} pages scraped, {len(to_visit)} in queue",
-                    flush=True,
+            metadata: Dict[str, Any] = {}
+            if self.has_pool_data(url):
+                pool_data = self.pool_data_from_api(
+                    url, await recorder.payloads_async(), content
                 )
+                source = "api"
+                if not pool_data:
+                    pool_data = self.parse_pool_data(content, page.url)
+                    source = "text"
+                if pool_data:
+                    metadata["pool_data"] = pool_data
+                    metadata["pool_data_source"] = source
 
-            browser.close()
+            return ScrapedDocument(
+                title=title or url,
+                url=url,
+                content=content,
+                source="website",
+                scraped_at=time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                metadata=metadata,
+            )
+        except Exception as exc:
+            print(f"  Error extracting data: {exc}", flush=True)
+            return None
 
-        print(f"\n[OK] Completed! Scraped {len(self.scraped_pages)} pages", flush=True)
+    def _filter_links(self, url: str, hrefs: List[Optional[str]]) -> Set[str]:
+        """Resolve raw hrefs and keep unvisited, in-scope app links."""
+        links: Set[str] = set()
+        for href in hrefs:
+            if not href:
+                continue
+            absolute_url = urljoin(url, href).split("#")[0]
+            parsed = urlparse(absolute_url)
+            if (
+                absolute_url.startswith(self.base_url)
+                and parsed.scheme in ("http", "https")
+                and absolute_url not in self.visited_urls
+                and not self.should_skip(absolute_url)
+            ):
+                links.add(absolute_url)
+        return links
+
+    def _print_timing_summary(self) -> None:
+        if not self.page_timings:
+            return
+        totals = [timing["total_seconds"] for timing in self.page_timings]
+        print(
+            f"Page timing: {len(totals)} pages, "
+            f"avg {sum(totals) / len(totals):.1f}s, max {max(totals):.1f}s",
+            flush=True,
+        )
 
     def save_to_json(self, filename: str = "website_data.json") -> None:
         """Save to JSON."""
         output_path = self.output_dir / filename
         save_documents_json(self.scraped_pages, output_path)
         print(f"Saved to {output_path}", flush=True)
+        print(f"Saved stream to {self.stream.finish()}", flush=True)
+        if self.page_timings:
+            self.save_timings()
+        self.save_pool_metrics()
+        self.checkpoint.clear()
+
+    def save_pool_metrics(self) -> None:
+        """Append this run's pool APY/TVL samples to the metrics history."""
+        try:
+            store = PoolMetricsStore(os.getenv("POOL_METRICS_DB") or self.output_dir / "pool_metrics.db")
+            try:
+                recorded = store.record_documents(self.scraped_pages)
+                compacted = store.compact()
+            finally:
+                store.close()
+        except sqlite3.Error as exc:
+            print(f"[WARN] Could not record pool metrics: {exc}", flush=True)
+            return
+        print(f"Recorded metrics for {recorded} pools in {store.db_path}", flush=True)
+        if any(compacted.values()):
+            print(f"Compacted pool metrics: {compacted}", flush=True)
+
+    def save_timings(self, filename: str = "website_timings.json") -> None:
+        """Save per-page load/extract timings from the last async run."""
+        output_path = self.output_dir / filename
+        with output_path.open("w", encoding="utf-8") as handle:
+            json.dump(self.page_timings, handle, indent=2)
+        print(f"Saved page timings to {output_path}", flush=True)
 
     def save_to_markdown(self) -> None:
         """Save each page as markdown."""
         md_dir = self.output_dir / "markdown"
-        save_documents_markdown(self.scraped_pages, md_dir)
-        print(f"Saved {len(self.scraped_pages)} markdown files to {md_dir}", flush=True)
+        written = save_documents_markdown(self.scraped_pages, md_dir)
+        print(
+            f"Saved markdown to {md_dir}: {written} of {len(self.scraped_pages)} files changed",
+            flush=True,
+        )
 
 
 def main() -> None:
@@ -292,7 +788,10 @@ def main() -> None:
     print("Auto Finance Website Scraper")
     print("=" * 60)
 
-    scraper.scrape_all()
+    if "--sequential" in sys.argv:
+        scraper.scrape_all()
+    else:
+        asyncio.run(scraper.scrape_all_async())
     scraper.save_to_json()
     scraper.save_to_markdown()
 
@@ -7,11 +7,17 @@ consume the data without per-source adapters.
 
 from __future__ import annotations
 
+import gzip
+import hashlib
 import json
+import os
+import threading
+import time
+from collections import deque
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set
 
 
 def utc_now_iso() -> str:
@@ -37,6 +43,92 @@ class ScrapedDocument:
         # asdict handles nested structures and makes a shallow copy
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScrapedDocument":
+        """Rebuild a document from its JSON representation."""
+        return cls(
+            title=data.get("title") or "",
+            url=data.get("url") or "",
+            content=data.get("content") or "",
+            source=data.get("source") or "",
+            scraped_at=data.get("scraped_at") or utc_now_iso(),
+            metadata=dict(data.get("metadata") or {}),
+        )
+
+
+@dataclass
+class ScrapeReport:
+    """Per-run summary of which URLs changed, so indexing can skip the rest."""
+
+    source: str
+    started_at: str = field(default_factory=utc_now_iso)
+    finished_at: Optional[str] = None
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def mark_changed(self, url: str) -> None:
+        self.changed.append(url)
+
+    def mark_unchanged(self, url: str) -> None:
+        self.unchanged.append(url)
+
+    def mark_failed(self, url: str) -> None:
+        self.failed.append(url)
+
+    def mark_removed(self, url: str) -> None:
+        self.removed.append(url)
+
+    def finish(self) -> None:
+        self.finished_at = utc_now_iso()
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["counts"] = {
+            "changed": len(self.changed),
+            "unchanged": len(self.unchanged),
+            "failed": len(self.failed),
+            "removed": len(self.removed),
+        }
+        return data
+
+    def save(self, output_path: Path) -> None:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with output_path.open("w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle, indent=2, ensure_ascii=False)
+
+
+class CrawlFrontier:
+    """FIFO crawl queue that de-duplicates URLs at enqueue time."""
+
+    def __init__(self, seeds: Optional[Iterable[str]] = None):
+        self._queue: Deque[str] = deque()
+        self.seen: Set[str] = set()
+        if seeds:
+            self.extend(seeds)
+
+    def add(self, url: str) -> bool:
+        """Queue a URL unless it was queued before. Returns True if added."""
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        self._queue.append(url)
+        return True
+
+    def extend(self, urls: Iterable[str]) -> int:
+        """Queue several URLs and return how many were new."""
+        return sum(1 for url in urls if self.add(url))
+
+    def pop(self) -> str:
+        return self._queue.popleft()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __bool__(self) -> bool:
+        return bool(self._queue)
+
 
 def documents_to_dicts(documents: Iterable[ScrapedDocument]) -> List[Dict[str, Any]]:
     """Convert an iterable of ScrapedDocument instances into JSON-ready dicts."""
@@ -51,18 +143,167 @@ def save_documents_json(documents: Iterable[ScrapedDocument], output_path: Path)
         json.dump(data, handle, indent=2, ensure_ascii=False)
 
 
+def document_hash(doc: ScrapedDocument) -> str:
+    """Hash of a document's title, URL, content and metadata (not scraped_at)."""
+    payload = json.dumps(
+        [doc.title, doc.url, doc.content, doc.metadata], sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def jsonl_gzip_enabled() -> bool:
+    return os.getenv("SCRAPER_JSONL_GZIP", "0").lower() in ("1", "true", "yes")
+
+
+def stream_path(output_dir: Path, source: str) -> Optional[Path]:
+    """The most recent finished JSONL stream for `source`, gzip or plain."""
+    candidates = [
+        output_dir / f"{source}_documents.jsonl.gz",
+        output_dir / f"{source}_documents.jsonl",
+    ]
+    existing = [path for path in candidates if path.exists()]
+    if not existing:
+        return None
+    return max(existing, key=lambda path: path.stat().st_mtime)
+
+
+def iter_documents_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield document dicts from a JSONL stream, skipping unreadable lines."""
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict):
+                yield record
+
+
+class DocumentStream:
+    """Appends documents as compact JSONL lines while a scrape runs.
+
+    Lines go to `<source>_documents.jsonl[.gz].tmp`; `finish()` moves the
+    file into place and writes `<source>_manifest.json` with counts, content
+    hashes and timing, so readers never see a half-written stream. The
+    hashes are compared with the previous manifest to append the run's
+    added/modified/removed URLs to the source's change feed.
+    """
+
+    def __init__(self, output_dir: Path, source: str, compress: Optional[bool] = None):
+        self.output_dir = Path(output_dir)
+        self.source = source
+        self.compress = jsonl_gzip_enabled() if compress is None else compress
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        self.path = self.output_dir / f"{source}_documents{suffix}"
+        self.manifest_path = self.output_dir / f"{source}_manifest.json"
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._handle = None
+        self._lock = threading.Lock()
+        self.started_at = utc_now_iso()
+        self._started = time.monotonic()
+        self.hashes: Dict[str, str] = {}
+        self.bytes_written = 0
+        self.lines_written = 0
+
+    def _open(self) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.compress:
+            self._handle = gzip.open(self._tmp_path, "wt", encoding="utf-8")
+        else:
+            self._handle = self._tmp_path.open("w", encoding="utf-8")
+
+    def write(self, doc: ScrapedDocument) -> None:
+        line = json.dumps(doc.to_dict(), ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._handle is None:
+                self._open()
+            self._handle.write(line)
+            self._handle.flush()
+            self.hashes[doc.url] = document_hash(doc)
+            self.bytes_written += len(line.encode("utf-8"))
+            self.lines_written += 1
+
+    def _previous_hashes(self) -> Dict[str, str]:
+        try:
+            with self.manifest_path.open("r", encoding="utf-8") as handle:
+                return dict(json.load(handle).get("content_hashes") or {})
+        except (OSError, json.JSONDecodeError, AttributeError):
+            return {}
+
+    def finish(self) -> Path:
+        """Publish the stream, its change feed entry and manifest; returns the stream path."""
+        from change_feed import ChangeFeed
+
+        with self._lock:
+            if self._handle is None:
+                self._open()
+            self._handle.close()
+            self._handle = None
+            os.replace(self._tmp_path, self.path)
+            other = self.path.with_name(
+                f"{self.source}_documents" + (".jsonl" if self.compress else ".jsonl.gz")
+            )
+            if other.exists():
+                other.unlink()
+
+            feed = ChangeFeed(self.output_dir, self.source)
+            feed.append(self._previous_hashes(), self.hashes, iter_documents_jsonl(self.path))
+
+            manifest = {
+                "source": self.source,
+                "stream": self.path.name,
+                "compressed": self.compress,
+                "started_at": self.started_at,
+                "finished_at": utc_now_iso(),
+                "duration_seconds": round(time.monotonic() - self._started, 3),
+                "documents": len(self.hashes),
+                "lines": self.lines_written,
+                "bytes": self.bytes_written,
+                "stored_bytes": self.path.stat().st_size,
+                "content_hashes": dict(sorted(self.hashes.items())),
+                "change_seq": feed.latest_seq(),
+            }
+            with self.manifest_path.open("w", encoding="utf-8") as handle:
+                json.dump(manifest, handle, indent=2, ensure_ascii=False)
+        return self.path
+
+
 def save_documents_markdown(
     documents: Iterable[ScrapedDocument],
     output_dir: Path,
     *,
     include_metadata: bool = True,
-) -> None:
-    """Persist each document as a markdown file."""
+) -> int:
+    """Persist each document as a markdown file.
+
+    Files whose document hash matches the previous run are left untouched.
+    Returns the number of files written.
+    """
     output_dir.mkdir(parents=True, exist_ok=True)
+    hashes_path = output_dir / ".content_hashes.json"
+    try:
+        with hashes_path.open("r", encoding="utf-8") as handle:
+            previous_hashes: Dict[str, str] = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        previous_hashes = {}
+
+    hashes: Dict[str, str] = {}
+    written = 0
     for index, doc in enumerate(documents):
         safe_title = (doc.title or f"document_{index}").strip().replace("/", "-")
         filename = f"{safe_title[:80] or f'document_{index}'}.md"
         filepath = output_dir / filename
+        digest = document_hash(doc)
+        # Documents sharing a title share a file; the last one must win.
+        collides = filename in hashes
+        hashes[filename] = digest
+        if not collides and previous_hashes.get(filename) == digest and filepath.exists():
+            continue
+
         with filepath.open("w", encoding="utf-8") as handle:
             handle.write(f"# {doc.title}\n\n")
             handle.write(f"Source: {doc.url}\n")
@@ -79,4 +320,8 @@ def save_documents_markdown(
 
             handle.write("## Content\n\n")
             handle.write(doc.content)
+        written += 1
 
+    with hashes_path.open("w", encoding="utf-8") as handle:
+        json.dump(hashes, handle, indent=2, ensure_ascii=False)
+    return written
@@ -0,0 +1,131 @@
+"""
+Long-lived SQLite connections: one writer plus a small pool of readers.
+
+Opening a connection per call re-reads the schema, throws away the
+prepared-statement cache and, in rollback-journal mode, makes readers and
+the writer block each other. `SQLiteConnectionManager` keeps connections
+open for the life of the process instead:
+
+- the database runs in WAL mode, so readers never block the writer and
+  commits only append to the WAL (synchronous=NORMAL);
+- all writes go through one connection, serialized by a lock;
+- reads borrow one of up to SQLITE_READ_POOL_SIZE (default 4) read-only
+  connections and return it afterwards;
+- every connection keeps sqlite3's per-connection statement cache
+  (SQLITE_STATEMENT_CACHE, default 128), so repeating the same SQL text
+  reuses the prepared statement instead of compiling it again.
+
+Connections are opened with check_same_thread=False and are only ever used
+by one thread at a time, so the manager can be shared across threads.
+
+Tuning (environment):
+  SQLITE_CACHE_SIZE_KB     page cache per connection (default 16384)
+  SQLITE_MMAP_SIZE_MB      memory-mapped I/O size (default 256)
+  SQLITE_BUSY_TIMEOUT_MS   wait for locks held by other processes (default 5000)
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+
+class SQLiteConnectionManager:
+    """Writer connection + read pool for one WAL-mode database file."""
+
+    def __init__(self, db_path: str, read_pool_size: Optional[int] = None):
+        self.db_path = str(db_path)
+        self.read_pool_size = max(
+            1, read_pool_size if read_pool_size is not None else int(os.getenv("SQLITE_READ_POOL_SIZE", "4"))
+        )
+        self.statement_cache = int(os.getenv("SQLITE_STATEMENT_CACHE", "128"))
+        self.cache_size_kb = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+        self.mmap_size = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256")) * 1024 * 1024
+        self.busy_timeout = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")) / 1000
+
+        self._write_lock = threading.RLock()
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
+
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all_readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            cached_statements=self.statement_cache,
+        )
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_kb}")
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """The writer connection; commits on success, rolls back on error."""
+        with self._write_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+            try:
+                yield self._writer
+                self._writer.commit()
+            except BaseException:
+                self._writer.rollback()
+                raise
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """A pooled read-only connection (blocks while all are in use)."""
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            if len(self._all_readers) < self.read_pool_size:
+                conn = self._connect(read_only=True)
+                self._all_readers.append(conn)
+                return conn
+        return self._readers.get()
+
+    def checkpoint(self) -> None:
+        """Fold the WAL back into the main file (before copying the .db file)."""
+        with self._write_lock:
+            self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self) -> None:
+        """Checkpoint and close every connection. Idempotent."""
+        with self._write_lock:
+            if self._closed:
+                return
+            self._closed = True
+            try:
+                self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error:
+                pass
+            self._writer.close()
+        with self._readers_lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers.clear()
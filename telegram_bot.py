@@ -114,6 +114,7 @@ Let's get started! Ask me anything about Auto Finance! 🚀
     async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stats command"""
         conv_stats = self.conversation_manager.get_stats()
+        write_stats = self.storage.write_queue_stats()
         
         stats_message = f"""
 📊 *Bot Statistics*
@@ -121,6 +122,7 @@ Let's get started! Ask me anything about Auto Finance! 🚀
 Questions answered: {self.questions_answered}
 Documents indexed: {self.agent.collection.count()}
 Active conversations: {conv_stats['active_conversations']}
+Write queue: {write_stats['queue_depth']} pending, {write_stats['avg_commit_ms']} ms avg commit
 Model: {self.model}
 
 Bot is running smoothly! 🎯
@@ -220,10 +222,10 @@ Bot is running smoothly! 🎯
             self.conversation_manager.add_message(user.id, 'user', question, chat.id)
             self.conversation_manager.add_message(user.id, 'assistant', answer, chat.id)
             
-            # Save to persistent storage
+            # Save to persistent storage (committed in the background)
             try:
                 tokens_used = response.get('usage', {}).get('total_tokens', 0) if 'usage' in response else 0
-                self.storage.save_conversation(
+                self.storage.queue_conversation(
                     user_id=str(user.id),
                     username=user.username or user.first_name or f"User{user.id}",
                     chat_id=str(chat.id),
@@ -271,7 +273,11 @@ Bot is running smoothly! 🎯
         
         # Start bot
         logger.info("Bot is running! Press Ctrl+C to stop.")
-        self.application.run_polling(allowed_updates=Update.ALL_TYPES)
+        try:
+            self.application.run_polling(allowed_updates=Update.ALL_TYPES)
+        finally:
+            # Commit conversations still waiting in the write queue
+            self.storage.close()
     
     def stop(self):
         """Stop the bot gracefully"""
@@ -0,0 +1,94 @@
+"""
+pool_data_from_api against recorded pool API responses served by the
+replay harness's local fixture server.
+"""
+
+import json
+
+import pytest
+
+from replay_harness import Replayer, har_entry, write_har
+from scrape_website import WebsiteScraper
+
+POOL_URL = "https://app.auto.finance/pools/autoETH"
+API_URL = "https://api.auto.finance/api/autopools"
+POOL_PAGE_TEXT = "Pools\nautoETH\nAPY 0.50%\nTVL $12.5M\n"
+
+RECORDED_POOLS = {
+    "autopools": [
+        {
+            "symbol": "autoETH",
+            "apy": 0.005,
+            "tvlUsd": 12_500_000,
+            "dailyRewardsUsd": 1830.5,
+            "totalAutomatedVolumeUsd": 2_400_000_000,
+            "tokens": [{"symbol": "WETH"}, {"symbol": "stETH"}],
+        },
+        {"symbol": "autoUSD", "apyPercent": 0.5, "tvlUsd": 3_000_000},
+        {"symbol": "autoLRT", "apy": 7.34},
+    ]
+}
+
+
+def recorded_payloads(tmp_path, scraper):
+    fixtures = tmp_path / "fixtures"
+    body = json.dumps(RECORDED_POOLS).encode("utf-8")
+    write_har(
+        fixtures / "http.har",
+        [har_entry("GET", API_URL, 200, "OK", {"Content-Type": "application/json"}, body)],
+    )
+    with Replayer(fixtures, mode="server") as replayer:
+        replayer.install(scraper)
+        response = scraper.session.get(API_URL, timeout=10)
+        assert replayer.stats.hits == 1 and replayer.stats.misses == 0
+    return [response.json()]
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    monkeypatch.delenv("WEBSITE_POOL_APY_UNIT", raising=False)
+    return WebsiteScraper(output_dir=str(tmp_path / "website"))
+
+
+def test_pool_data_from_recorded_api(tmp_path, scraper):
+    payloads = recorded_payloads(tmp_path, scraper)
+
+    assert scraper.pool_data_from_api(POOL_URL, payloads, POOL_PAGE_TEXT) == {
+        "apy": "0.50%",
+        "tvl": "$12.5M",
+        "daily_returns": "$1.83K",
+        "volume": "$2.4B",
+        "tokens": ["WETH", "stETH"],
+    }
+
+
+def test_percent_key_is_not_rescaled(tmp_path, scraper):
+    payloads = recorded_payloads(tmp_path, scraper)
+
+    pool_data = scraper.pool_data_from_api("https://app.auto.finance/pools/autoUSD", payloads)
+
+    assert pool_data["apy"] == "0.50%"
+
+
+def test_page_apy_settles_unit(tmp_path, scraper):
+    payloads = recorded_payloads(tmp_path, scraper)
+    url = "https://app.auto.finance/pools/autoLRT"
+
+    assert scraper.pool_data_from_api(url, payloads, "Pools\nautoLRT\nAPY 7.34%\n")["apy"] == "7.34%"
+    # Without page text a value above 1 is not read as a fraction.
+    assert scraper.pool_data_from_api(url, payloads)["apy"] == "7.34%"
+
+
+def test_configured_percent_unit(tmp_path, scraper, monkeypatch):
+    payloads = recorded_payloads(tmp_path, scraper)
+    monkeypatch.setenv("WEBSITE_POOL_APY_UNIT", "percent")
+
+    pool_data = scraper.pool_data_from_api("https://app.auto.finance/pools/autoLRT", payloads)
+
+    assert pool_data["apy"] == "7.34%"
+
+
+def test_unknown_pool_falls_back(tmp_path, scraper):
+    payloads = recorded_payloads(tmp_path, scraper)
+
+    assert scraper.pool_data_from_api("https://app.auto.finance/pools/autoDOLA", payloads) == {}